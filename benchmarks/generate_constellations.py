@@ -0,0 +1,99 @@
+import argparse
+import json
+import math
+import random
+import sys
+from array import array
+
+GENERATOR_VERSION = 2  # cambia si el mismo (estrellas, grado, semilla) pasa a generar otro archivo
+STARS_PER_CONSTELLATION = 20
+LINK_WINDOW = 40  # las conexiones van a estrellas con id cercano (misma constelación o la vecina)
+SPACING = 60      # separación entre centros de constelación (coordenadas del archivo)
+
+
+def generate(file_path, n_stars, degree=4, seed=0, per_constellation=STARS_PER_CONSTELLATION):
+    """
+    Escribe un archivo de constelaciones sintético con el esquema de assets/constellations.json
+    (constellations[].starts[] con linkedTo, coordenates, timeToEat, ...).
+
+    Es reproducible (misma semilla, mismo archivo) y se escribe constelación por constelación,
+    así que la memoria no depende de n_stars más allá de las coordenadas. Cada estrella se une
+    con la siguiente (el grafo queda conexo), con una de la constelación de abajo en la grilla y
+    con otras cercanas por id hasta un grado medio cercano a 'degree'; las distancias son las
+    euclídeas entre coordenadas, así que el mapa es coherente con la geometría.
+    """
+    rnd = random.Random(seed)
+    n_consts = max(1, math.ceil(n_stars / per_constellation))
+    side = math.ceil(math.sqrt(n_consts))
+
+    # Coordenadas de todas las estrellas: alrededor del centro de su constelación
+    xs, ys = array('d'), array('d')
+    for i in range(n_stars):
+        c = i // per_constellation
+        cx, cy = (c % side) * SPACING, (c // side) * SPACING
+        xs.append(round(cx + rnd.uniform(-SPACING / 3, SPACING / 3), 1))
+        ys.append(round(cy + rnd.uniform(-SPACING / 3, SPACING / 3), 1))
+
+    def distance(i, j):
+        return max(1.0, round(math.hypot(xs[i] - xs[j], ys[i] - ys[j]), 1))
+
+    # Conexiones hacia adelante (i -> j > i) generadas al escribir i; las inversas esperan en
+    # 'pending' hasta que se escriba j (a lo sumo una fila de la grilla por delante)
+    pending = {}
+    extra_links = max(0, degree // 2 - 1)
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write('{\n  "constellations": [\n')
+        for c in range(n_consts):
+            starts = []
+            for i in range(c * per_constellation, min(n_stars, (c + 1) * per_constellation)):
+                links = pending.pop(i, {})
+                forward = set()
+                if i + 1 < n_stars:
+                    forward.add(i + 1)
+                for k in range(extra_links):
+                    if k == 0:
+                        # Constelación de abajo en la grilla (misma columna, fila siguiente)
+                        j = (c + side) * per_constellation + rnd.randrange(per_constellation)
+                    else:
+                        j = i + rnd.randint(2, LINK_WINDOW)
+                    if j < n_stars:
+                        forward.add(j)
+                for j in sorted(forward):
+                    d = distance(i, j)
+                    links[j] = d
+                    pending.setdefault(j, {})[i] = d
+                starts.append({
+                    "id": i + 1,
+                    "label": f"S{i + 1}",
+                    "linkedTo": [{"starId": j + 1, "distance": d} for j, d in links.items()],
+                    "radius": round(rnd.uniform(0.3, 1.0), 2),
+                    "timeToEat": rnd.randint(1, 4),
+                    "amountOfEnergy": rnd.randint(1, 5),
+                    "coordenates": {"x": xs[i], "y": ys[i]},
+                    "hypergiant": rnd.random() < 0.05,
+                    "healthEffect": rnd.choice([0, 0, 0, 1, -1]),
+                    "lifeEffect": rnd.choice([0, 0, 10, -10]),
+                })
+            const = {"name": f"Constelación {c + 1}", "starts": starts}
+            f.write("    " + json.dumps(const, ensure_ascii=False))
+            f.write(",\n" if c < n_consts - 1 else "\n")
+        f.write('  ],\n')
+        f.write('  "burroenergiaInicial": 100,\n  "estadoSalud": "Excelente",\n  "pasto": 300,\n')
+        f.write('  "startAge": 12,\n  "deathAge": 3567\n}\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un archivo de constelaciones sintético y reproducible.")
+    parser.add_argument("stars", type=int, help="Cantidad de estrellas (p. ej. 1000, 10000, 100000, 1000000)")
+    parser.add_argument("output", help="Archivo JSON de salida")
+    parser.add_argument("-d", "--degree", type=int, default=4, help="Grado medio aproximado (por defecto 4)")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("--per-constellation", type=int, default=STARS_PER_CONSTELLATION)
+    args = parser.parse_args(argv)
+    generate(args.output, args.stars, args.degree, args.seed, args.per_constellation)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
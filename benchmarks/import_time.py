@@ -0,0 +1,60 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Se ejecuta en un intérprete nuevo para medir el import "en frío" de los módulos del núcleo
+PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import core.graph_manager, core.route_calculator, core.donkey
+elapsed = time.perf_counter() - t0
+print(json.dumps({"seconds": elapsed, "qt_loaded": any(m.split('.')[0] == 'PyQt6' for m in sys.modules)}))
+"""
+
+
+def measure(repeats):
+    """Importa el núcleo 'repeats' veces en procesos nuevos y devuelve las mediciones."""
+    samples = []
+    for _ in range(repeats):
+        proc = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT,
+                              capture_output=True, text=True, check=True)
+        samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el tiempo de importación del núcleo (sin Qt).")
+    parser.add_argument("-n", "--repeats", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=50.0,
+                        help="Falla si la mediana supera este tiempo (ms)")
+    args = parser.parse_args(argv)
+
+    samples = measure(args.repeats)
+    times_ms = [s["seconds"] * 1000 for s in samples]
+    median_ms = statistics.median(times_ms)
+    qt_loaded = any(s["qt_loaded"] for s in samples)
+    print(json.dumps({
+        "benchmark": "core_import",
+        "repeats": args.repeats,
+        "median_ms": round(median_ms, 3),
+        "min_ms": round(min(times_ms), 3),
+        "max_ms": round(max(times_ms), 3),
+        "qt_loaded": qt_loaded,
+    }))
+
+    if qt_loaded:
+        print("ERROR: importar el núcleo cargó PyQt6.", file=sys.stderr)
+        return 1
+    if median_ms > args.budget_ms:
+        print(f"ERROR: mediana {median_ms:.1f} ms supera el presupuesto de {args.budget_ms:.1f} ms.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.generate_constellations import GENERATOR_VERSION, generate  # noqa: E402
+from core.constellation_routing import ConstellationRouter  # noqa: E402
+from core.contraction_hierarchy import ContractionHierarchy  # noqa: E402
+from core.donkey import Donkey  # noqa: E402
+from core.graph_manager import GraphManager  # noqa: E402
+from core.max_stars_solver import RouteCancelled  # noqa: E402
+from core.point_to_point import PointToPointSearch  # noqa: E402
+from core.route_calculator import RouteCalculator  # noqa: E402
+
+DEFAULT_SIZES = (1000, 10000)
+BENCH_DONKEY = ("excelente", 12, 100, 300)
+
+
+def timed(fn, repeats):
+    """Ejecuta fn 'repeats' veces y devuelve (tiempos en ms, último resultado)."""
+    times, result = [], None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return times, result
+
+
+def record(name, params, times_ms, **extra):
+    rec = {"benchmark": name, **params,
+           "repeats": len(times_ms),
+           "median_ms": round(statistics.median(times_ms), 3),
+           "min_ms": round(min(times_ms), 3),
+           "max_ms": round(max(times_ms), 3)}
+    rec.update(extra)
+    return rec
+
+
+def dataset(data_dir, stars, degree, seed):
+    """Ruta del archivo sintético; se genera sólo la primera vez (el generador es determinista)."""
+    path = Path(data_dir) / f"constellations_{stars}_d{degree}_s{seed}_v{GENERATOR_VERSION}.json"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        print(f"Generando {path.name}...", file=sys.stderr)
+        generate(str(path), stars, degree, seed)
+    return path
+
+
+def bench_load(path, params, repeats):
+    def load():
+        graph_manager = GraphManager()
+        with contextlib.redirect_stdout(io.StringIO()):
+            graph_manager.load_from_json(str(path))
+        return graph_manager
+    times, graph_manager = timed(load, repeats)
+    return record("load_from_json", params, times), graph_manager
+
+
+def bench_neighbors(graph_manager, params, repeats):
+    labels = graph_manager.get_all_star_labels()
+    get_neighbors = graph_manager.get_neighbors
+
+    def scan():
+        for label in labels:
+            get_neighbors(label)
+    times, _ = timed(scan, repeats)
+    per_call_us = statistics.median(times) * 1000 / max(1, len(labels))
+    return record("get_neighbors", params, times, calls=len(labels), per_call_us=round(per_call_us, 4))
+
+
+def bench_routes(graph_manager, params, starts, seed, timeout):
+    """
+    Ambos modos de RouteCalculator desde 'starts' estrellas elegidas con la semilla. Cada ruta
+    usa un calculador nuevo (caché frío) y se corta a los 'timeout' segundos.
+    """
+    labels = graph_manager.get_all_star_labels()
+    start_stars = random.Random(seed).sample(labels, min(starts, len(labels)))
+    records = []
+    for mode in ("calculate_max_stars_route", "calculate_economical_route"):
+        times, visited, timed_out = [], [], 0
+        for start in start_stars:
+            calculate = getattr(RouteCalculator(graph_manager), mode)
+            deadline = time.monotonic() + timeout
+            t0 = time.perf_counter()
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = calculate(start, Donkey(*BENCH_DONKEY),
+                                       cancelled=lambda: time.monotonic() > deadline)
+                visited.append(result[1])
+            except RouteCancelled:
+                timed_out += 1
+            times.append((time.perf_counter() - t0) * 1000)
+        records.append(record(mode, params, times, timed_out=timed_out,
+                              stars_visited=round(statistics.mean(visited), 1) if visited else None))
+    return records
+
+
+def bench_point_to_point(graph_manager, params, queries, seed, methods=PointToPointSearch.METHODS):
+    """Caminos entre pares de estrellas elegidos con la semilla: tiempo y estrellas expandidas por método."""
+    labels = graph_manager.get_all_star_labels()
+    rnd = random.Random(seed)
+    pairs = [(rnd.choice(labels), rnd.choice(labels)) for _ in range(queries)]
+    route_calculator = RouteCalculator(graph_manager)
+    records = []
+    for method in methods:
+        times, expanded = [], []
+        for start, target in pairs:
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                _, _, count = route_calculator.shortest_route(start, target, method)
+            times.append((time.perf_counter() - t0) * 1000)
+            expanded.append(count)
+        records.append(record(f"shortest_route_{method}", params, times,
+                              expanded_mean=round(statistics.mean(expanded), 1)))
+    return records
+
+
+def bench_contraction_hierarchy(graph_manager, params, queries, seed):
+    """Construcción de la jerarquía de contracción (sin usar el .ch guardado) y consultas con method="ch"."""
+    times, hierarchy = timed(lambda: ContractionHierarchy(graph_manager).build(), 1)
+    shortcuts = sum(1 for middle in hierarchy.up_middle if middle >= 0)
+    graph_manager.contraction_hierarchy = hierarchy
+    try:
+        records = [record("contraction_hierarchy_build", params, times, shortcuts=shortcuts)]
+        records += bench_point_to_point(graph_manager, params, queries, seed, methods=("ch",))
+    finally:
+        graph_manager.contraction_hierarchy = None
+    return records
+
+
+def bench_constellation_routing(graph_manager, params, queries, seed):
+    """Construcción del índice por constelaciones y consultas con method="constellation"."""
+    times, router = timed(lambda: ConstellationRouter(graph_manager).build(), 1)
+    boundary = sum(len(stars) for stars in router.boundary.values())
+    graph_manager.constellation_router = router
+    try:
+        records = [record("constellation_routing_build", params, times, boundary_stars=boundary)]
+        records += bench_point_to_point(graph_manager, params, queries, seed, methods=("constellation",))
+    finally:
+        graph_manager.constellation_router = None
+    return records
+
+
+def bench_render(graph_manager, params, repeats):
+    """Dibujo completo de GraphWidget sin pantalla (QT_QPA_PLATFORM=offscreen): en frío y con caché."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from ui.graph_widget import GraphWidget
+
+    app = QApplication.instance() or QApplication([])
+    with contextlib.redirect_stdout(sys.stderr):
+        widget = GraphWidget(graph_manager)
+    widget.resize(1100, 760)
+
+    def cold():
+        widget.invalidate_static_layer()
+        return widget.grab()
+    cold_times, _ = timed(cold, repeats)
+    warm_times, _ = timed(widget.grab, repeats)
+    widget.deleteLater()
+    app.processEvents()
+    return [record("render_cold", params, cold_times), record("render_warm", params, warm_times)]
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"python": platform.python_version(), "platform": platform.platform(), "commit": commit}
+
+
+def compare(results, baseline_path, tolerance):
+    """Devuelve los benchmarks cuya mediana empeoró más que 'tolerance' respecto a la línea base."""
+    key = lambda r: (r["benchmark"], r["stars"], r["degree"], r["seed"])
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {key(r): r for r in map(json.loads, f) if "benchmark" in r}
+    regressions = []
+    for rec in results:
+        base = baseline.get(key(rec))
+        if base and base["median_ms"] > 0 and rec["median_ms"] > base["median_ms"] * (1 + tolerance):
+            regressions.append((rec, base))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmarks de carga, vecinos, rutas y dibujo sobre constelaciones sintéticas (salida JSON Lines)."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Cantidades de estrellas (p. ej. 1000 10000 100000 1000000)")
+    parser.add_argument("-d", "--degree", type=int, default=4, help="Grado medio de los mapas generados")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-n", "--repeats", type=int, default=3)
+    parser.add_argument("--routes", type=int, default=3, help="Estrellas de inicio por modo de ruta")
+    parser.add_argument("--queries", type=int, default=20,
+                        help="Pares inicio -> destino para los caminos punto a punto")
+    parser.add_argument("--route-timeout", type=float, default=30.0,
+                        help="Segundos máximos por ruta (las cortadas se cuentan en 'timed_out')")
+    parser.add_argument("--data-dir", default=str(ROOT / "benchmarks" / "data"),
+                        help="Carpeta para los archivos generados (se reutilizan entre corridas)")
+    parser.add_argument("--no-render", action="store_true", help="No medir el dibujo de GraphWidget")
+    parser.add_argument("--no-ch", action="store_true",
+                        help="No construir ni medir la jerarquía de contracción (lenta en mapas grandes)")
+    parser.add_argument("-o", "--output", help="Archivo de resultados (por defecto, salida estándar)")
+    parser.add_argument("--baseline", help="Resultados previos (JSON Lines) con los que comparar")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Empeoramiento relativo tolerado frente a --baseline (por defecto 0.25)")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    results = []
+    try:
+        out.write(json.dumps({"environment": environment()}) + "\n")
+        for stars in args.sizes:
+            params = {"stars": stars, "degree": args.degree, "seed": args.seed}
+            path = dataset(args.data_dir, stars, args.degree, args.seed)
+            print(f"Midiendo {path.name}...", file=sys.stderr)
+
+            load_record, graph_manager = bench_load(path, params, args.repeats)
+            batch = [load_record, bench_neighbors(graph_manager, params, args.repeats)]
+            batch += bench_routes(graph_manager, params, args.routes, args.seed, args.route_timeout)
+            batch += bench_point_to_point(graph_manager, params, args.queries, args.seed)
+            batch += bench_constellation_routing(graph_manager, params, args.queries, args.seed)
+            if not args.no_ch:
+                batch += bench_contraction_hierarchy(graph_manager, params, args.queries, args.seed)
+            if not args.no_render:
+                batch += bench_render(graph_manager, params, args.repeats)
+            for rec in batch:
+                out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                out.flush()
+            results += batch
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for rec, base in regressions:
+            print(f"REGRESIÓN: {rec['benchmark']} ({rec['stars']} estrellas): "
+                  f"{base['median_ms']:.1f} ms -> {rec['median_ms']:.1f} ms", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sin él se usa siempre Dijkstra repetido
+    np = None
+
+# Adyacencia abierta en los procesos trabajadores (se inicializa una sola vez en _init_worker)
+_worker_adjacency = None
+
+
+def dijkstra_row(source, get_neighbors):
+    """
+    Dijkstra desde source. Devuelve (dist, prev) con el mismo orden de inserción y el mismo
+    desempate que los Dijkstra de RouteCalculator, para que las rutas no cambien al usar la matriz.
+    """
+    dist = {source: 0.0}
+    prev = {source: None}
+    pq = [(0.0, source)]
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        for v, weight in get_neighbors(u):
+            nd = d + weight
+            if nd < dist.get(v, float('inf')):
+                dist[v] = nd
+                prev[v] = u
+                heapq.heappush(pq, (nd, v))
+    return dist, prev
+
+
+def _init_worker(adjacency):
+    global _worker_adjacency
+    _worker_adjacency = adjacency
+
+
+def _worker_rows(sources):
+    get_neighbors = lambda u: _worker_adjacency.get(u, ())
+    return [(source,) + dijkstra_row(source, get_neighbors) for source in sources]
+
+
+class AllPairsShortestPaths:
+    """
+    Matriz de caminos mínimos entre todas las estrellas (distancias y predecesores), sobre las
+    conexiones no bloqueadas. Se construye con Dijkstra desde cada estrella (opcionalmente en
+    varios procesos) o con Floyd-Warshall vectorizado si numpy está disponible y el mapa es denso.
+
+    Las filas son pares de dicts ({destino: distancia}, {destino: predecesor}); con la matriz, las
+    consultas de RouteCalculator son búsquedas en vez de un Dijkstra por cada estrella a la que se
+    llega. Bloquear o desbloquear una conexión reemplaza sólo las filas afectadas (ver
+    edge_blocked y edge_unblocked). Una fila publicada nunca se modifica: se cambia por una nueva,
+    así que quien la esté leyendo en otro hilo (RouteWorker) sigue viendo una fila consistente.
+    """
+
+    DENSE_RATIO = 0.25     # conexiones / pares posibles a partir de la cual se usa Floyd-Warshall
+    FLOYD_MAX_STARS = 3000  # por encima, la matriz densa ocuparía demasiada memoria
+
+    def __init__(self, graph_manager):
+        self.graph_manager = graph_manager
+        self.rows = {}     # estrella -> (dist, prev)
+        self._sorted = {}  # estrella -> (dist, prev, [(distancia, destino)] ordenado); ver sorted_row
+
+    def build(self, workers=1, method="auto"):
+        """
+        Calcula la matriz completa. method: "dijkstra", "floyd" (requiere numpy) o "auto".
+        Con workers > 1 los Dijkstra se reparten entre procesos.
+        """
+        labels = self.graph_manager.get_all_star_labels()
+        self._sorted = {}
+        if method == "auto":
+            method = "floyd" if self._prefers_floyd(labels) else "dijkstra"
+        if method == "floyd":
+            if np is None:
+                raise RuntimeError("Floyd-Warshall vectorizado requiere numpy.")
+            self._build_floyd(labels)
+        elif workers and workers > 1 and len(labels) > 1:
+            self._build_parallel(labels, workers)
+        else:
+            get_neighbors = self.graph_manager.get_neighbors
+            self.rows = {source: dijkstra_row(source, get_neighbors) for source in labels}
+        return self
+
+    def _prefers_floyd(self, labels):
+        n = len(labels)
+        if np is None or n < 2 or n > self.FLOYD_MAX_STARS:
+            return False
+        edges = sum(len(self.graph_manager.get_neighbors(label)) for label in labels) / 2
+        return edges >= self.DENSE_RATIO * n * (n - 1) / 2
+
+    def _build_parallel(self, labels, workers):
+        adjacency = {label: self.graph_manager.get_neighbors(label) for label in labels}
+        workers = min(workers, os.cpu_count() or 1, len(labels))
+        chunk = max(1, len(labels) // (workers * 4))
+        chunks = [labels[i:i + chunk] for i in range(0, len(labels), chunk)]
+        self.rows = {}
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(adjacency,)) as executor:
+            for rows in executor.map(_worker_rows, chunks):
+                for source, dist, prev in rows:
+                    self.rows[source] = (dist, prev)
+
+    def _build_floyd(self, labels):
+        """Floyd-Warshall con numpy: una actualización vectorizada (n x n) por cada estrella intermedia."""
+        n = len(labels)
+        index = {label: i for i, label in enumerate(labels)}
+        inf = float('inf')
+        d = np.full((n, n), inf)
+        np.fill_diagonal(d, 0.0)
+        pred = np.full((n, n), -1, dtype=np.int64)
+        for label in labels:
+            i = index[label]
+            for other, weight in self.graph_manager.get_neighbors(label):
+                j = index[other]
+                if weight < d[i, j]:
+                    d[i, j] = weight
+                    pred[i, j] = i
+        for k in range(n):
+            via = d[:, k, None] + d[None, k, :]
+            better = via < d
+            d = np.where(better, via, d)
+            pred = np.where(better, pred[k][None, :], pred)
+
+        # Filas en el formato de dijkstra_row (destinos alcanzables ordenados por distancia)
+        self.rows = {}
+        for i, source in enumerate(labels):
+            reachable = np.flatnonzero(np.isfinite(d[i]))
+            order = reachable[np.lexsort((reachable, d[i, reachable]))]
+            self.rows[source] = ({labels[j]: float(d[i, j]) for j in order},
+                                 {labels[j]: (labels[pred[i, j]] if j != i else None) for j in order})
+
+    def row(self, source):
+        """(dist, prev) desde source; las filas se comparten, no modificarlas."""
+        row = self.rows.get(source)
+        if row is None:
+            row = self.rows[source] = dijkstra_row(source, self.graph_manager.get_neighbors)
+        return row
+
+    def sorted_row(self, source):
+        """
+        (dist, prev, asentadas) desde source, donde asentadas es la lista (distancia, destino) en
+        orden de distancia. El orden se calcula una vez por fila y se guarda hasta que la fila se
+        reemplaza.
+        """
+        dist, prev = self.row(source)
+        cached = self._sorted.get(source)
+        if cached is None or cached[0] is not dist:
+            cached = (dist, prev, sorted((d, label) for label, d in dist.items()))
+            self._sorted[source] = cached
+        return cached
+
+    def distance(self, a, b):
+        return self.row(a)[0].get(b, float('inf'))
+
+    def path(self, a, b):
+        """Camino mínimo de a a b (lista de etiquetas) o None si no hay."""
+        prev = self.row(a)[1]
+        if b not in prev:
+            return None
+        path = []
+        node = b
+        while node is not None:
+            path.append(node)
+            node = prev[node]
+        path.reverse()
+        return path
+
+    # ----------------------------------------------------
+    #        ACTUALIZACIONES INCREMENTALES
+    # ----------------------------------------------------
+    def edge_blocked(self, a, b):
+        """
+        La conexión a-b dejó de estar disponible. Sólo cambian las filas cuyo árbol de caminos
+        mínimos la usa (prev[b] == a o prev[a] == b); el resto sigue siendo válido porque quitar
+        una arista nunca acorta caminos. Devuelve cuántas filas se recalcularon.
+        """
+        affected = [source for source, (_, prev) in self.rows.items()
+                    if prev.get(b, False) == a or prev.get(a, False) == b]
+        get_neighbors = self.graph_manager.get_neighbors
+        for source in affected:
+            self.rows[source] = dijkstra_row(source, get_neighbors)
+            self._sorted.pop(source, None)
+        return len(affected)
+
+    def edge_unblocked(self, a, b, weight):
+        """
+        La conexión a-b (de largo weight) volvió a estar disponible. Una distancia sólo puede
+        mejorar pasando por la arista: d(s, t) = min(d(s, t), d(s, a) + weight + d(b, t)) (y en el
+        sentido b -> a), así que cada fila afectada se corrige en O(n) sin Dijkstra (sobre una
+        copia que luego reemplaza a la fila). Devuelve cuántas filas cambiaron.
+        """
+        inf = float('inf')
+        # Filas de a y b antes del cambio: son las que se combinan con las demás
+        ends = {label: self.row(label) for label in (a, b)}
+        changed = 0
+        for source, (dist, prev) in list(self.rows.items()):
+            for u, v in ((a, b), (b, a)):
+                base = dist.get(u, inf) + weight
+                if base >= dist.get(v, inf):
+                    continue
+                # El camino pasa por u -> v y sigue por el árbol de v
+                dist, prev = dict(dist), dict(prev)
+                v_dist, v_prev = ends[v]
+                for target, d_vt in v_dist.items():
+                    nd = base + d_vt
+                    if nd < dist.get(target, inf):
+                        dist[target] = nd
+                        prev[target] = u if target == v else v_prev[target]
+                self.rows[source] = (dist, prev)
+                self._sorted.pop(source, None)
+                changed += 1
+                break  # si mejora en un sentido, en el otro no puede
+        return changed
@@ -0,0 +1,138 @@
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import sys
+
+from core.donkey import Donkey
+from core.graph_manager import GraphManager
+from core.route_calculator import RouteCalculator
+
+MODES = ("max_stars", "economical", "max_stars_optimal")
+DEFAULT_MODES = ("max_stars", "economical")
+
+
+def load_scenarios(file_path, graph_manager):
+    """
+    Lee el archivo de escenarios y devuelve la lista de (estrella_inicio, config_burro, modo).
+
+    Formato esperado (JSON):
+        {
+          "donkeys": [{"salud": "excelente", "edad": 12, "energia": 100, "pasto": 300}, ...],
+          "start_stars": ["Burro-A", ...],      # opcional; "*" o ausente = todas las estrellas
+          "modes": ["max_stars", "economical"]  # opcional; por defecto estos dos
+                                                # ("max_stars_optimal": solver exacto)
+        }
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    donkeys = config.get("donkeys", [])
+    start_stars = config.get("start_stars", "*")
+    if start_stars == "*":
+        start_stars = graph_manager.get_all_star_labels()
+    modes = config.get("modes", list(DEFAULT_MODES))
+    for mode in modes:
+        if mode not in MODES:
+            raise ValueError(f"Modo de ruta desconocido: '{mode}'. Use uno de {MODES}.")
+
+    return list(itertools.product(start_stars, donkeys, modes))
+
+
+def run_scenario(route_calculator, start_star, donkey_config, mode):
+    """Calcula una ruta para un escenario y devuelve un dict serializable a JSON."""
+    result = {"start_star": start_star, "donkey": donkey_config, "mode": mode}
+    if start_star not in route_calculator.graph_manager.stars:
+        result["error"] = f"La estrella '{start_star}' no existe."
+        return result
+
+    donkey = Donkey(
+        salud=donkey_config.get("salud", "regular"),
+        edad=donkey_config.get("edad", 10),
+        energia=donkey_config.get("energia", 100),
+        pasto=donkey_config.get("pasto", 100)
+    )
+    if mode == "max_stars":
+        route, stars_visited = route_calculator.calculate_max_stars_route(start_star, donkey)
+        result.update(route=route, stars_visited=stars_visited)
+    elif mode == "max_stars_optimal":
+        route, stars_visited, optimal = route_calculator.calculate_optimal_max_stars_route(start_star, donkey)
+        result.update(route=route, stars_visited=stars_visited, optimal=optimal)
+    else:
+        route, stars_visited, food_log, research_log = route_calculator.calculate_economical_route(start_star, donkey)
+        result.update(route=route, stars_visited=stars_visited, food_log=food_log, research_log=research_log)
+    return result
+
+
+def run_batch(graph_manager, scenarios, out, verbose=False, workers=1, chunksize=16):
+    """
+    Ejecuta los escenarios y escribe un resultado JSON por línea en 'out', en el orden de entrada.
+    Con workers > 1 los escenarios se reparten entre procesos (ver core.parallel).
+    """
+    if workers and workers > 1:
+        from core.parallel import ParallelScenarioExecutor
+        results = ParallelScenarioExecutor(graph_manager, workers, chunksize).map(scenarios)
+    else:
+        results = _run_sequential(graph_manager, scenarios, verbose)
+    for result in results:
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        out.flush()
+
+
+def _run_sequential(graph_manager, scenarios, verbose):
+    route_calculator = RouteCalculator(graph_manager)
+    for start_star, donkey_config, mode in scenarios:
+        # Los calculadores imprimen su progreso; no debe mezclarse con la salida JSON Lines
+        sink = sys.stderr if verbose else io.StringIO()
+        with contextlib.redirect_stdout(sink):
+            result = run_scenario(route_calculator, start_star, donkey_config, mode)
+        yield result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m core.batch",
+        description="Calcula rutas sin interfaz gráfica para muchos burros y estrellas de inicio (salida JSON Lines)."
+    )
+    parser.add_argument("constellations", help="Archivo JSON de constelaciones")
+    parser.add_argument("scenarios", help="Archivo JSON con burros, estrellas de inicio y modos")
+    parser.add_argument("-o", "--output", help="Archivo de salida (por defecto, salida estándar)")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="Mostrar el progreso de los calculadores por la salida de error")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Cargar las constelaciones en streaming (catálogos muy grandes)")
+    parser.add_argument("--cache", action="store_true",
+                        help="Usar/regenerar el grafo compilado en la carpeta de cachés del usuario")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="Procesos trabajadores (0 = todos los núcleos; por defecto 1, sin paralelismo)")
+    parser.add_argument("--chunksize", type=int, default=16,
+                        help="Escenarios enviados a cada trabajador por lote (con --workers)")
+    parser.add_argument("--all-pairs", action="store_true",
+                        help="Precalcular la matriz de caminos mínimos entre todas las estrellas")
+    args = parser.parse_args(argv)
+
+    graph_manager = GraphManager()
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.cache:
+            graph_manager.load_cached(args.constellations)
+        elif args.streaming:
+            graph_manager.load_from_json_streaming(args.constellations)
+        else:
+            graph_manager.load_from_json(args.constellations)
+    scenarios = load_scenarios(args.scenarios, graph_manager)
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    if args.all_pairs:
+        graph_manager.enable_all_pairs(workers=workers)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as out:
+            run_batch(graph_manager, scenarios, out, args.verbose, workers, args.chunksize)
+    else:
+        run_batch(graph_manager, scenarios, sys.stdout, args.verbose, workers, args.chunksize)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
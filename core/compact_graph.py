@@ -0,0 +1,418 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, MutableMapping
+
+from core.graph_manager import GraphManager
+from core.spatial_index import SpatialIndex
+from core.star_effects import StarEffectTable
+
+
+class _StarRecord(MutableMapping):
+    """Vista tipo dict de una estrella almacenada en los arreglos de CompactGraphManager."""
+
+    __slots__ = ("_graph", "_idx")
+
+    _NUMERIC_FIELDS = {
+        "radius": "radius",
+        "tiempo_para_comer": "time_to_eat",
+        "costo_energia_invest": "energy_cost",
+        "health_effect": "health_effect",
+        "life_effect": "life_effect",
+    }
+    _KEYS = ("id", "pos", "um_pos", "radius", "tiempo_para_comer", "costo_energia_invest",
+             "hypergiant", "health_effect", "life_effect", "constellation", "overlap")
+
+    def __init__(self, graph, idx):
+        self._graph = graph
+        self._idx = idx
+
+    def __getitem__(self, key):
+        g, i = self._graph, self._idx
+        if key in self._NUMERIC_FIELDS:
+            return getattr(g, self._NUMERIC_FIELDS[key])[i]
+        if key == "pos":
+            return (g.pos_x[i], g.pos_y[i])
+        if key == "um_pos":
+            return (g.um_x[i], g.um_y[i])
+        if key == "id":
+            return g.star_ids[i]
+        if key == "hypergiant":
+            return bool(g.flags[i] & CompactGraphManager.FLAG_HYPERGIANT)
+        if key == "overlap":
+            return bool(g.flags[i] & CompactGraphManager.FLAG_OVERLAP)
+        if key == "constellation":
+            return g.constellation_names[g.constellation_idx[i]]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        # Solo los campos numéricos son editables (p.ej. desde "Modificar Efectos de Estrella")
+        if key not in self._NUMERIC_FIELDS:
+            raise KeyError(f"El campo '{key}' no es modificable en el grafo compacto.")
+        # health_effect es entero; el resto son float (las vistas mmap no convierten tipos solas)
+        value = int(value) if key == "health_effect" else float(value)
+        getattr(self._graph, self._NUMERIC_FIELDS[key])[self._idx] = value
+
+    def __delitem__(self, key):
+        raise KeyError(f"No se pueden eliminar campos de una estrella compacta: '{key}'.")
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+
+class _StarTable(Mapping):
+    """Vista label -> registro de estrella, compatible con GraphManager.stars."""
+
+    __slots__ = ("_graph",)
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __getitem__(self, label):
+        return _StarRecord(self._graph, self._graph.label_to_id[label])
+
+    def __contains__(self, label):
+        return label in self._graph.label_to_id
+
+    def __iter__(self):
+        return iter(self._graph.labels)
+
+    def __len__(self):
+        return len(self._graph.labels)
+
+
+class _ConnectionView:
+    """Iterable de tuplas (a, b, distancia) con cada conexión no dirigida una sola vez."""
+
+    __slots__ = ("_graph",)
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __iter__(self):
+        g = self._graph
+        labels, offsets, targets, weights = g.labels, g.offsets, g.targets, g.weights
+        for u in range(len(labels)):
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                if u <= v:
+                    a, b = labels[u], labels[v]
+                    yield (a, b, weights[e]) if a <= b else (b, a, weights[e])
+
+    def __len__(self):
+        return self._graph.edge_count
+
+
+class _BlockedView:
+    """Conjunto (solo lectura) de claves ordenadas de conexiones bloqueadas."""
+
+    __slots__ = ("_graph",)
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __contains__(self, key):
+        try:
+            a, b = key
+        except (TypeError, ValueError):
+            return False
+        return self._graph.is_connection_blocked(a, b)
+
+    def __iter__(self):
+        for a, b, _ in self._graph.connections:
+            if (a, b) in self:
+                yield (a, b)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class CompactGraphManager:
+    """
+    Motor de almacenamiento alternativo con la misma API pública que GraphManager.
+    Las etiquetas se internan a IDs enteros densos, los atributos de las estrellas viven
+    en arreglos tipados y las conexiones en formato CSR (offsets/targets/weights) con una
+    máscara de bloqueo por arista. RouteCalculator y GraphWidget funcionan sin cambios.
+    """
+
+    FLAG_HYPERGIANT = 1
+    FLAG_OVERLAP = 2
+
+    def __init__(self):
+        self.generation = 0  # ver GraphManager.generation
+        self.effects_generation = 0  # ver GraphManager.effects_generation
+        self.reset()
+        # parámetros del tablero / mapeo (mismos valores por defecto que GraphManager)
+        self.um_min_x = 0
+        self.um_min_y = 0
+        self.um_range_x = 1
+        self.um_range_y = 1
+        self.um_scale = 1.0
+        self.um_padding = 40
+        self.um_target_w = 800
+        self.um_target_h = 600
+
+    def reset(self):
+        """Limpia todos los datos del grafo."""
+        self.labels = []
+        self.label_to_id = {}
+        self.star_ids = []
+        self.pos_x = array('d')
+        self.pos_y = array('d')
+        self.um_x = array('d')
+        self.um_y = array('d')
+        self.radius = array('d')
+        self.time_to_eat = array('d')
+        self.energy_cost = array('d')
+        self.health_effect = array('q')
+        self.life_effect = array('d')
+        self.flags = bytearray()
+        self.constellation_idx = array('q')
+        self.constellation_names = []
+        # CSR: vecinos de u en targets[offsets[u]:offsets[u+1]]
+        self.offsets = array('q', [0])
+        self.targets = array('q')
+        self.weights = array('d')
+        # Las mismas posiciones de cada fila ordenadas por destino, para buscar una arista con
+        # búsqueda binaria sin cambiar el orden de vecinos (que decide los empates de Dijkstra)
+        self.slot_order = array('q')
+        self.blocked = bytearray()
+        self.edge_count = 0
+        self.constellation_colors = {}
+        self.initial_donkey_data = {}
+        self.spatial_index = SpatialIndex()
+        self.source_path = None  # ver GraphManager.source_path
+        self.star_effects = StarEffectTable(self)
+        self.all_pairs = None
+        self.contraction_hierarchy = None
+        self.constellation_router = None
+        self._heuristic_scale = None
+        self.generation += 1
+
+        self.stars = _StarTable(self)
+        self.connections = _ConnectionView(self)
+        self.blocked_connections = _BlockedView(self)
+
+    def load_from_json(self, file_path):
+        """Carga el JSON con el cargador estándar y lo compacta en arreglos."""
+        source = GraphManager()
+        source.load_from_json(file_path)
+        self._build_from(source)
+        self.source_path = source.source_path
+
+    def save_compiled(self, path, source_path=None):
+        """Guarda el grafo en el formato binario de core.compiled_graph."""
+        from core.compiled_graph import file_sha256, save_compiled
+        save_compiled(self, path, file_sha256(source_path) if source_path else None)
+
+    def load_compiled(self, path, source_path=None):
+        """
+        Carga un grafo compilado usando los arreglos directamente sobre el mmap (sin copia).
+        Si se indica source_path y su hash no coincide, devuelve False sin cargar.
+        """
+        from core.compiled_graph import CompiledGraphError, file_sha256, open_compiled, populate_compact
+        try:
+            source_sha256 = file_sha256(source_path) if source_path else None
+            header, views, mm = open_compiled(path, source_sha256)
+        except (CompiledGraphError, OSError) as e:
+            print(f"Grafo compilado no utilizable ({path}): {e}")
+            return False
+        populate_compact(self, header, views, mm)
+        self.source_path = source_path
+        return True
+
+    enable_all_pairs = GraphManager.enable_all_pairs
+    enable_contraction_hierarchy = GraphManager.enable_contraction_hierarchy
+    rebuild_contraction_hierarchy = GraphManager.rebuild_contraction_hierarchy
+    set_star_effects = GraphManager.set_star_effects
+    enable_constellation_routing = GraphManager.enable_constellation_routing
+    heuristic_scale = GraphManager.heuristic_scale
+
+    @classmethod
+    def from_graph_manager(cls, graph_manager):
+        """Construye un grafo compacto a partir de un GraphManager ya cargado."""
+        compact = cls()
+        compact._build_from(graph_manager)
+        return compact
+
+    def _build_from(self, gm):
+        self.reset()
+        for attr in ("um_min_x", "um_min_y", "um_range_x", "um_range_y",
+                     "um_scale", "um_padding", "um_target_w", "um_target_h"):
+            setattr(self, attr, getattr(gm, attr))
+        self.constellation_colors = dict(gm.constellation_colors)
+        self.initial_donkey_data = dict(gm.initial_donkey_data)
+
+        const_to_idx = {}
+        for label, data in gm.stars.items():
+            self.label_to_id[label] = len(self.labels)
+            self.labels.append(label)
+            self.star_ids.append(data.get("id"))
+            px, py = data.get("pos", (0, 0))
+            ux, uy = data.get("um_pos", (0, 0))
+            self.pos_x.append(px)
+            self.pos_y.append(py)
+            self.um_x.append(ux)
+            self.um_y.append(uy)
+            self.radius.append(data.get("radius", 0.5))
+            self.time_to_eat.append(data.get("tiempo_para_comer", 1))
+            self.energy_cost.append(data.get("costo_energia_invest", 1))
+            self.health_effect.append(int(data.get("health_effect", 0)))
+            self.life_effect.append(data.get("life_effect", 0))
+            flags = 0
+            if data.get("hypergiant"):
+                flags |= self.FLAG_HYPERGIANT
+            if data.get("overlap"):
+                flags |= self.FLAG_OVERLAP
+            self.flags.append(flags)
+            const_name = data.get("constellation", "SinNombre")
+            if const_name not in const_to_idx:
+                const_to_idx[const_name] = len(self.constellation_names)
+                self.constellation_names.append(const_name)
+            self.constellation_idx.append(const_to_idx[const_name])
+
+        # Intentar guardar los IDs originales en un arreglo tipado; si no son enteros, dejar la lista
+        try:
+            self.star_ids = array('q', self.star_ids)
+        except (TypeError, OverflowError):
+            pass
+
+        # Aristas en CSR, respetando el orden de vecinos del índice de adyacencia
+        label_to_id = self.label_to_id
+        for label in self.labels:
+            for other, dist in gm.adjacency.get(label, {}).items():
+                self.targets.append(label_to_id[other])
+                self.weights.append(dist)
+            self.offsets.append(len(self.targets))
+        self.slot_order = sorted_slots(self.offsets, self.targets)
+        self.blocked = bytearray(len(self.targets))
+        self.edge_count = sum(1 for u in range(len(self.labels))
+                              for e in range(self.offsets[u], self.offsets[u + 1])
+                              if u <= self.targets[e])
+
+        for a, b in gm.blocked_connections:
+            self._set_blocked(label_to_id[a], label_to_id[b], 1)
+        self.spatial_index = SpatialIndex.from_graph(self)
+
+    def _edge_slot(self, u, v):
+        """Índice de la arista u -> v dentro de targets, o -1 si no existe (búsqueda binaria)."""
+        order, targets = self.slot_order, self.targets
+        hi = self.offsets[u + 1]
+        i = bisect_left(order, v, self.offsets[u], hi, key=targets.__getitem__)
+        if i < hi and targets[order[i]] == v:
+            return order[i]
+        return -1
+
+    def _set_blocked(self, u, v, value):
+        for x, y in ((u, v), (v, u)):
+            e = self._edge_slot(x, y)
+            if e >= 0:
+                self.blocked[e] = value
+
+    def _get_connection_key(self, star1_label, star2_label):
+        """Helper para obtener una clave consistente para una conexión (tupla ordenada)."""
+        if star1_label not in self.label_to_id or star2_label not in self.label_to_id:
+            return None
+        return tuple(sorted((star1_label, star2_label)))
+
+    def is_connection_blocked(self, star1_label, star2_label):
+        """Verifica si una conexión entre dos estrellas está bloqueada."""
+        u = self.label_to_id.get(star1_label)
+        v = self.label_to_id.get(star2_label)
+        if u is None or v is None:
+            return False
+        e = self._edge_slot(u, v)
+        return e >= 0 and bool(self.blocked[e])
+
+    def block_connection(self, star1_label, star2_label):
+        """Bloquea una conexión entre dos estrellas."""
+        key = self._get_connection_key(star1_label, star2_label)
+        if not key:
+            return False, "Una o ambas estrellas no existen."
+
+        u, v = self.label_to_id[star1_label], self.label_to_id[star2_label]
+        e = self._edge_slot(u, v)
+        if e < 0:
+            return False, f"No se encontró una conexión directa entre {star1_label} y {star2_label}."
+
+        if self.blocked[e]:
+            return False, f"La conexión entre {star1_label} y {star2_label} ya está bloqueada."
+
+        self._set_blocked(u, v, 1)
+        self.generation += 1
+        if self.all_pairs is not None:
+            self.all_pairs.edge_blocked(*key)
+        if self.contraction_hierarchy is not None:
+            self.contraction_hierarchy.edge_blocked(*key)
+        if self.constellation_router is not None:
+            self.constellation_router.edge_blocked(*key)
+        return True, f"Conexión entre {star1_label} y {star2_label} bloqueada exitosamente."
+
+    def unblock_connection(self, star1_label, star2_label):
+        """Desbloquea una conexión entre dos estrellas."""
+        key = self._get_connection_key(star1_label, star2_label)
+        if not key:
+            return False, "Una o ambas estrellas no existen."
+
+        u, v = self.label_to_id[star1_label], self.label_to_id[star2_label]
+        e = self._edge_slot(u, v)
+        if e < 0 or not self.blocked[e]:
+            return False, f"La conexión entre {star1_label} y {star2_label} no está bloqueada."
+
+        self._set_blocked(u, v, 0)
+        self.generation += 1
+        if self.all_pairs is not None:
+            self.all_pairs.edge_unblocked(key[0], key[1], self.weights[e])
+        if self.contraction_hierarchy is not None:
+            self.contraction_hierarchy.edge_unblocked(*key)
+        if self.constellation_router is not None:
+            self.constellation_router.edge_unblocked(*key)
+        return True, f"Conexión entre {star1_label} y {star2_label} desbloqueada exitosamente."
+
+    def get_distance(self, star1_label, star2_label):
+        """Devuelve la distancia entre dos estrellas si existe la conexión; inf si no existe."""
+        if star1_label == star2_label:
+            return 0.0
+        u = self.label_to_id.get(star1_label)
+        v = self.label_to_id.get(star2_label)
+        if u is None or v is None:
+            return float('inf')
+        e = self._edge_slot(u, v)
+        if e < 0 or self.blocked[e]:
+            return float('inf')
+        return self.weights[e]
+
+    def get_neighbors(self, star_label, include_blocked=False):
+        """
+        Devuelve lista de tuplas (neighbor_label, distance) para la estrella dada.
+        Si include_blocked es False, las conexiones bloqueadas no se incluirán.
+        """
+        u = self.label_to_id.get(star_label)
+        if u is None:
+            return []
+        labels, targets, weights, blocked = self.labels, self.targets, self.weights, self.blocked
+        return [(labels[targets[e]], weights[e])
+                for e in range(self.offsets[u], self.offsets[u + 1])
+                if include_blocked or not blocked[e]]
+
+    def get_star_pos(self, star_label):
+        """Devuelve la posición (x,y) en pixeles de la estrella o (0,0) si no existe."""
+        u = self.label_to_id.get(star_label)
+        if u is None:
+            return (0, 0)
+        return (self.pos_x[u], self.pos_y[u])
+
+    def get_all_star_labels(self):
+        """Devuelve una lista ordenada de todas las etiquetas de estrellas."""
+        return sorted(self.labels)
+
+
+def sorted_slots(offsets, targets):
+    """Posiciones de cada fila CSR ordenadas por destino (ver CompactGraphManager.slot_order)."""
+    order = array('q')
+    key = targets.__getitem__
+    for u in range(len(offsets) - 1):
+        order.extend(sorted(range(offsets[u], offsets[u + 1]), key=key))
+    return order
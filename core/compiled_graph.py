@@ -0,0 +1,219 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+from core.compact_graph import CompactGraphManager
+from core.spatial_index import SpatialIndex
+
+MAGIC = b"BURROGC\0"
+VERSION = 2
+_PREAMBLE = struct.Struct("<8sII")  # magic, versión, largo del encabezado JSON
+_ALIGN = 8
+
+# Arreglos guardados en el archivo (nombre del atributo en CompactGraphManager, tipo)
+ARRAY_FIELDS = (
+    ("pos_x", "d"), ("pos_y", "d"), ("um_x", "d"), ("um_y", "d"),
+    ("radius", "d"), ("time_to_eat", "d"), ("energy_cost", "d"),
+    ("health_effect", "q"), ("life_effect", "d"),
+    ("flags", "B"), ("constellation_idx", "q"),
+    ("offsets", "q"), ("targets", "q"), ("weights", "d"), ("slot_order", "q"),
+)
+SCALE_FIELDS = ("um_min_x", "um_min_y", "um_range_x", "um_range_y",
+                "um_scale", "um_padding", "um_target_w", "um_target_h")
+
+
+class CompiledGraphError(ValueError):
+    """El archivo compilado no existe, está corrupto o no corresponde a esta versión/JSON."""
+
+
+def file_sha256(file_path):
+    h = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def user_cache_dir():
+    """Carpeta de cachés del usuario: $XDG_CACHE_HOME (o ~/.cache; %LOCALAPPDATA% en Windows)/burro."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA")
+    return Path(base or Path.home() / ".cache") / "burro"
+
+
+def user_cache_path(source_path, suffix):
+    """
+    Archivo de caché para source_path dentro de user_cache_dir(). El nombre lleva un hash de la
+    ruta absoluta, así dos JSON con el mismo nombre en carpetas distintas no comparten caché.
+    """
+    source = Path(source_path).resolve()
+    digest = hashlib.sha256(str(source).encode("utf-8")).hexdigest()[:16]
+    return user_cache_dir() / f"{source.stem}-{digest}{suffix}"
+
+
+def _pad(n):
+    return (-n) % _ALIGN
+
+
+def save_compiled(graph, path, source_sha256=None):
+    """
+    Escribe el grafo (GraphManager o CompactGraphManager) en formato binario versionado:
+    preámbulo, encabezado JSON (etiquetas, constelaciones, escalado, metadatos) y los arreglos
+    de estrellas y aristas (CSR) alineados a 8 bytes para poder mapearlos sin copia.
+    """
+    compact = graph if isinstance(graph, CompactGraphManager) else CompactGraphManager.from_graph_manager(graph)
+
+    arrays = []
+    layout = {}
+    offset = 0
+    for name, typecode in ARRAY_FIELDS:
+        data = getattr(compact, name)
+        if not (isinstance(data, array) and data.typecode == typecode):
+            data = array(typecode, data)
+        layout[name] = [typecode, offset, len(data)]
+        arrays.append(data)
+        offset += len(data) * data.itemsize
+        offset += _pad(offset)
+
+    star_ids = compact.star_ids
+    header = {
+        "byteorder": sys.byteorder,
+        "source_sha256": source_sha256,
+        "labels": compact.labels,
+        "star_ids": star_ids.tolist() if isinstance(star_ids, array) else list(star_ids),
+        "constellation_names": compact.constellation_names,
+        "constellation_colors": [[name, list(color)] for name, color in compact.constellation_colors.items()],
+        "blocked": sorted(compact.blocked_connections),
+        "initial_donkey_data": compact.initial_donkey_data,
+        "scale": {field: getattr(compact, field) for field in SCALE_FIELDS},
+        "arrays": layout,
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    data_start = _PREAMBLE.size + len(header_bytes)
+    data_start += _pad(data_start)
+
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * (data_start - _PREAMBLE.size - len(header_bytes)))
+        for data in arrays:
+            raw = data.tobytes()
+            f.write(raw)
+            f.write(b"\0" * _pad(len(raw)))
+
+
+def open_compiled(path, source_sha256=None):
+    """
+    Mapea el archivo en memoria y devuelve (encabezado, vistas, mmap). Las vistas son
+    memoryview tipadas sobre el mmap (sin copia). Si se indica source_sha256 y no coincide
+    con el del archivo, el caché se considera obsoleto y se lanza CompiledGraphError.
+    """
+    try:
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    except (OSError, ValueError) as e:
+        raise CompiledGraphError(f"No se pudo abrir el grafo compilado '{path}': {e}")
+
+    if len(mm) < _PREAMBLE.size:
+        raise CompiledGraphError("Archivo compilado truncado.")
+    magic, version, header_len = _PREAMBLE.unpack_from(mm, 0)
+    if magic != MAGIC:
+        raise CompiledGraphError("El archivo no es un grafo compilado.")
+    if version != VERSION:
+        raise CompiledGraphError(f"Versión de grafo compilado {version} no soportada (se esperaba {VERSION}).")
+    header = json.loads(mm[_PREAMBLE.size:_PREAMBLE.size + header_len].decode("utf-8"))
+    if header.get("byteorder") != sys.byteorder:
+        raise CompiledGraphError("El grafo compilado se generó con otro orden de bytes.")
+    if source_sha256 is not None and header.get("source_sha256") != source_sha256:
+        raise CompiledGraphError("El JSON de origen cambió desde que se compiló el grafo.")
+
+    data_start = _PREAMBLE.size + header_len
+    data_start += _pad(data_start)
+    buf = memoryview(mm)
+    views = {}
+    for name, (typecode, offset, count) in header["arrays"].items():
+        start = data_start + offset
+        end = start + count * array(typecode).itemsize
+        if end > len(mm):
+            raise CompiledGraphError("Archivo compilado truncado.")
+        views[name] = buf[start:end].cast(typecode)
+    return header, views, mm
+
+
+def _num(value):
+    """Devuelve enteros como int (los spinbox de la UI no aceptan float)."""
+    return int(value) if float(value).is_integer() else value
+
+
+def populate_compact(compact, header, views, mm):
+    """Configura un CompactGraphManager para que use directamente las vistas del mmap."""
+    compact.reset()
+    for name, _ in ARRAY_FIELDS:
+        setattr(compact, name, views[name])
+    compact._mmap = mm
+    compact.labels = header["labels"]
+    compact.label_to_id = {label: i for i, label in enumerate(compact.labels)}
+    compact.star_ids = header["star_ids"]
+    compact.constellation_names = header["constellation_names"]
+    compact.constellation_colors = {name: tuple(color) for name, color in header["constellation_colors"]}
+    compact.initial_donkey_data = header["initial_donkey_data"]
+    for field, value in header["scale"].items():
+        setattr(compact, field, value)
+    compact.blocked = bytearray(len(compact.targets))
+    compact.edge_count = sum(1 for u in range(len(compact.labels))
+                             for e in range(compact.offsets[u], compact.offsets[u + 1])
+                             if u <= compact.targets[e])
+    for a, b in header["blocked"]:
+        compact._set_blocked(compact.label_to_id[a], compact.label_to_id[b], 1)
+    compact.spatial_index = SpatialIndex.from_graph(compact)
+
+
+def populate_graph_manager(graph, header, views):
+    """Reconstruye las estructuras de GraphManager (dicts) desde las vistas del archivo compilado."""
+    graph.reset()
+    labels = header["labels"]
+    star_ids = header["star_ids"]
+    names = header["constellation_names"]
+    v = views
+    for i, label in enumerate(labels):
+        flags = v["flags"][i]
+        graph.stars[label] = {
+            "id": star_ids[i],
+            "pos": (v["pos_x"][i], v["pos_y"][i]),
+            "um_pos": (_num(v["um_x"][i]), _num(v["um_y"][i])),
+            "radius": v["radius"][i],
+            "tiempo_para_comer": _num(v["time_to_eat"][i]),
+            "costo_energia_invest": _num(v["energy_cost"][i]),
+            "hypergiant": bool(flags & CompactGraphManager.FLAG_HYPERGIANT),
+            "health_effect": v["health_effect"][i],
+            "life_effect": _num(v["life_effect"][i]),
+            "constellation": names[v["constellation_idx"][i]],
+            "overlap": bool(flags & CompactGraphManager.FLAG_OVERLAP),
+        }
+
+    offsets, targets, weights = v["offsets"], v["targets"], v["weights"]
+    for u, label in enumerate(labels):
+        neigh = {}
+        for e in range(offsets[u], offsets[u + 1]):
+            other = labels[targets[e]]
+            neigh[other] = weights[e]
+            if label <= other:
+                graph.connections.add((label, other, _num(weights[e])))
+        if neigh:
+            graph.adjacency[label] = neigh
+
+    graph.open_adjacency = {label: dict(neigh) for label, neigh in graph.adjacency.items()}
+    for a, b in header["blocked"]:
+        graph.blocked_connections.add((a, b))
+        graph.open_adjacency[a].pop(b, None)
+        graph.open_adjacency[b].pop(a, None)
+
+    graph.constellation_colors.update((name, tuple(color)) for name, color in header["constellation_colors"])
+    graph.initial_donkey_data = header["initial_donkey_data"]
+    for field, value in header["scale"].items():
+        setattr(graph, field, value)
+    graph.spatial_index = SpatialIndex.from_graph(graph)
@@ -0,0 +1,196 @@
+import heapq
+
+from core.all_pairs import dijkstra_row
+
+
+class ConstellationRouter:
+    """
+    Índice de dos niveles para caminos mínimos entre dos estrellas, armado sobre las
+    constelaciones del mapa.
+
+    - Nivel local: por cada constelación, un Dijkstra limitado a sus estrellas desde cada estrella
+      frontera (las que tienen alguna conexión con otra constelación). Esas tablas dan la distancia
+      y el camino entre una frontera y cualquier estrella de su constelación.
+    - Nivel superior: un grafo chico entre estrellas frontera, con las conexiones entre
+      constelaciones (puentes) y un atajo entre dos fronteras de la misma constelación cuando su
+      camino interno no pasa por otra frontera (si pasa, ya lo cubren los atajos intermedios).
+
+    Una consulta de larga distancia sale del inicio a las fronteras de su constelación con las
+    tablas, recorre el grafo de fronteras y entra a la constelación del destino también con las
+    tablas. Bloquear o desbloquear una conexión interna reconstruye sólo esa constelación; los
+    puentes se leen del grafo en cada consulta, así que no requieren reconstruir nada.
+    """
+
+    def __init__(self, graph_manager):
+        self.graph_manager = graph_manager
+        self.constellation_of = {}  # estrella -> constelación
+        self.members = {}           # constelación -> estrellas
+        self.boundary = {}          # constelación -> estrellas frontera
+        self.tables = {}            # estrella frontera -> (dist, prev) dentro de su constelación
+        self.shortcuts = {}         # estrella frontera -> {frontera de la misma constelación: distancia}
+        self.rebuilds = 0
+
+    # ----------------------------------------------------
+    #        CONSTRUCCIÓN
+    # ----------------------------------------------------
+    def build(self):
+        gm = self.graph_manager
+        self.constellation_of = {}
+        self.members = {}
+        for label in gm.get_all_star_labels():
+            name = gm.stars[label].get("constellation", "SinNombre")
+            self.constellation_of[label] = name
+            self.members.setdefault(name, []).append(label)
+
+        # La frontera se define con todas las conexiones (bloqueadas incluidas), así no cambia al
+        # bloquear o desbloquear un puente
+        self.boundary = {name: [] for name in self.members}
+        for label, name in self.constellation_of.items():
+            if any(self.constellation_of[other] != name
+                   for other, _ in gm.get_neighbors(label, include_blocked=True)):
+                self.boundary[name].append(label)
+
+        self.tables = {}
+        self.shortcuts = {}
+        for name in self.members:
+            self.rebuild_constellation(name)
+        self.rebuilds = 0
+        return self
+
+    def rebuild_constellation(self, name):
+        """Recalcula las tablas y los atajos de una constelación (p. ej. tras editar sus conexiones)."""
+        boundary = self.boundary.get(name, [])
+        is_boundary = set(boundary)
+        local_neighbors = self._local_neighbors(name)
+        for b in boundary:
+            dist, prev = dijkstra_row(b, local_neighbors)
+            self.tables[b] = (dist, prev)
+            shortcuts = {}
+            for other in boundary:
+                if other == b or other not in dist:
+                    continue
+                node = prev[other]
+                while node != b and node not in is_boundary:
+                    node = prev[node]
+                if node == b:
+                    shortcuts[other] = dist[other]
+            self.shortcuts[b] = shortcuts
+        self.rebuilds += 1
+
+    def _local_neighbors(self, name):
+        """get_neighbors restringido a las estrellas de la constelación 'name'."""
+        get_neighbors = self.graph_manager.get_neighbors
+        constellation_of = self.constellation_of
+        return lambda label: [(other, weight) for other, weight in get_neighbors(label)
+                              if constellation_of[other] == name]
+
+    # ----------------------------------------------------
+    #        CONSULTAS
+    # ----------------------------------------------------
+    def query(self, start, target):
+        """(camino, distancia, estrellas_expandidas), como PointToPointSearch.search."""
+        if start not in self.constellation_of or target not in self.constellation_of:
+            return None, float('inf'), 0
+        if start == target:
+            return [start], 0.0, 0
+        inf = float('inf')
+        source_name = self.constellation_of[start]
+        target_name = self.constellation_of[target]
+        mu, best, expanded = inf, None, 0
+
+        if source_name == target_name:
+            # Candidato que no sale de la constelación
+            dist, prev = dijkstra_row(start, self._local_neighbors(source_name))
+            expanded += len(dist)
+            if target in dist:
+                mu, best = dist[target], _walk(prev, target)[::-1]
+
+        exits = {}
+        for b in self.boundary[target_name]:
+            d = self.tables[b][0].get(target)
+            if d is not None:
+                exits[b] = d
+
+        # Dijkstra sobre las fronteras: prev[b] es (frontera anterior, es_puente), o None si se
+        # llegó a b directamente desde start por dentro de su constelación
+        g, prev = {}, {}
+        pq = []
+        for b in self.boundary[source_name]:
+            d = self.tables[b][0].get(start)
+            if d is not None and d < g.get(b, inf):
+                g[b], prev[b] = d, None
+                heapq.heappush(pq, (d, b))
+        meeting = None
+        get_neighbors = self.graph_manager.get_neighbors
+        constellation_of = self.constellation_of
+        closed = set()
+        while pq:
+            d, u = heapq.heappop(pq)
+            if d >= mu:
+                break
+            if u in closed:
+                continue
+            closed.add(u)
+            if u in exits and d + exits[u] < mu:
+                mu, meeting = d + exits[u], u
+            name = constellation_of[u]
+            for v, weight in self.shortcuts[u].items():
+                if d + weight < g.get(v, inf):
+                    g[v], prev[v] = d + weight, (u, False)
+                    heapq.heappush(pq, (d + weight, v))
+            for v, weight in get_neighbors(u):
+                if constellation_of[v] != name and d + weight < g.get(v, inf):
+                    g[v], prev[v] = d + weight, (u, True)
+                    heapq.heappush(pq, (d + weight, v))
+        expanded += len(closed)
+
+        if meeting is not None:
+            best = self._overlay_path(start, target, prev, meeting)
+        if best is None:
+            return None, inf, expanded
+        return best, mu, expanded
+
+    def distance(self, start, target):
+        return self.query(start, target)[1]
+
+    def path(self, start, target):
+        return self.query(start, target)[0]
+
+    def _overlay_path(self, start, target, prev, meeting):
+        """Desarma el camino entre fronteras usando las tablas de cada constelación."""
+        # Tramo final: de 'meeting' al destino, dentro de la constelación del destino
+        path = _walk(self.tables[meeting][1], target)[::-1]
+        node = meeting
+        while prev[node] is not None:
+            previous, bridge = prev[node]
+            if bridge:
+                path = [previous] + path
+            else:
+                # Camino interno previous -> node (el árbol de 'node' lo da de previous hacia node)
+                path = _walk(self.tables[node][1], previous)[:-1] + path
+            node = previous
+        # Tramo inicial: de start a la primera frontera
+        return _walk(self.tables[node][1], start)[:-1] + path
+
+    # ----------------------------------------------------
+    #        CAMBIOS DEL GRAFO
+    # ----------------------------------------------------
+    def edge_blocked(self, a, b):
+        self._edge_changed(a, b)
+
+    def edge_unblocked(self, a, b):
+        self._edge_changed(a, b)
+
+    def _edge_changed(self, a, b):
+        name = self.constellation_of.get(a)
+        if name is not None and name == self.constellation_of.get(b):
+            self.rebuild_constellation(name)
+
+
+def _walk(prev, node):
+    """Estrellas desde node hasta la raíz siguiendo prev."""
+    path = []
+    while node is not None:
+        path.append(node)
+        node = prev[node]
+    return path
@@ -0,0 +1,373 @@
+import heapq
+import json
+import struct
+import sys
+from array import array
+
+from core.point_to_point import PointToPointSearch
+
+MAGIC = b"BURROCH\0"
+VERSION = 1
+_PREAMBLE = struct.Struct("<8sII")  # magic, versión, largo del encabezado JSON
+
+# Arreglos guardados en el archivo: rango de cada estrella y aristas hacia arriba en CSR
+ARRAY_FIELDS = (("rank", "q"), ("up_offsets", "q"), ("up_targets", "q"),
+                ("up_weights", "d"), ("up_middle", "q"))
+
+
+class ContractionHierarchyError(ValueError):
+    """El índice guardado no existe, está corrupto o no corresponde a este grafo."""
+
+
+class ContractionHierarchy:
+    """
+    Índice de jerarquía de contracción para caminos mínimos entre dos estrellas.
+
+    Se contraen las estrellas una a una (las menos importantes primero) agregando atajos entre sus
+    vecinas cuando el camino que pasaba por ella era el único mínimo. Una consulta es entonces una
+    búsqueda bidireccional que sólo sube de rango desde ambos extremos: visita unas pocas decenas
+    de estrellas en lugar de todo el mapa. Los atajos se desarman al final para dar el camino real.
+
+    El índice se arma con las conexiones abiertas al momento de construirlo. Bloquear después una
+    conexión sólo afecta a las consultas cuyo camino la usa: esas (y todas, si se desbloqueó algo
+    que estaba bloqueado al construir) se responden con A* bidireccional. Tras REBUILD_AFTER
+    consultas de respaldo needs_rebuild pasa a True; la consulta nunca reconstruye por su cuenta
+    (tardaría todo el preprocesamiento): hay que llamar a GraphManager.rebuild_contraction_hierarchy,
+    por ejemplo desde un hilo de fondo.
+    """
+
+    WITNESS_SETTLE_LIMIT = 60  # estrellas asentadas como máximo por búsqueda de testigo
+    REBUILD_AFTER = 32         # consultas de respaldo antes de sugerir la reconstrucción
+
+    def __init__(self, graph_manager):
+        self.graph_manager = graph_manager
+        self.labels = []
+        self.index = {}
+        self.rank = array('q')
+        self.up_offsets = array('q', [0])
+        self.up_targets = array('q')
+        self.up_weights = array('d')
+        self.up_middle = array('q')
+        self._middle = {}  # (menor, mayor) -> estrella intermedia del atajo
+        self._built_blocked = set()
+        self._blocked_since_build = set()
+        self._opened_since_build = set()
+        self.fallbacks = 0
+
+    # ----------------------------------------------------
+    #        CONSTRUCCIÓN
+    # ----------------------------------------------------
+    def build(self):
+        gm = self.graph_manager
+        self.labels = gm.get_all_star_labels()
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        n = len(self.labels)
+        index = self.index
+        adj = [{} for _ in range(n)]
+        for i, label in enumerate(self.labels):
+            for other, weight in gm.get_neighbors(label):
+                j = index[other]
+                if weight < adj[i].get(j, float('inf')):
+                    adj[i][j] = weight
+
+        middle = {}
+        deleted_neighbors = [0] * n
+        level = [0] * n
+        rank = [0] * n
+        up = [None] * n
+
+        def priority(v):
+            shortcuts = self._shortcuts(adj, v)
+            # Diferencia de aristas, vecinas ya contraídas y nivel: reparte la contracción por el mapa
+            return 2 * len(shortcuts) - len(adj[v]) + deleted_neighbors[v] + level[v], shortcuts
+
+        pq = [(priority(v)[0], v) for v in range(n)]
+        heapq.heapify(pq)
+        order = 0
+        while pq:
+            _, v = heapq.heappop(pq)
+            # Actualización perezosa: si la prioridad empeoró, volver a la cola
+            current, shortcuts = priority(v)
+            if pq and current > pq[0][0]:
+                heapq.heappush(pq, (current, v))
+                continue
+
+            for u, w, weight in shortcuts:
+                if weight < adj[u].get(w, float('inf')):
+                    adj[u][w] = adj[w][u] = weight
+                    middle[(min(u, w), max(u, w))] = v
+            rank[v] = order
+            order += 1
+            up[v] = sorted(adj[v].items())
+            for u in adj[v]:
+                del adj[u][v]
+                deleted_neighbors[u] += 1
+                level[u] = max(level[u], level[v] + 1)
+            adj[v] = {}
+
+        self.rank = array('q', rank)
+        self.up_offsets = array('q', [0])
+        self.up_targets, self.up_weights, self.up_middle = array('q'), array('d'), array('q')
+        for v in range(n):
+            for u, weight in up[v]:
+                self.up_targets.append(u)
+                self.up_weights.append(weight)
+                self.up_middle.append(middle.get((min(u, v), max(u, v)), -1))
+            self.up_offsets.append(len(self.up_targets))
+        self._index_middles()
+        self._built_blocked = set(gm.blocked_connections)
+        self._blocked_since_build.clear()
+        self._opened_since_build.clear()
+        self.fallbacks = 0
+        return self
+
+    def _witness_distances(self, adj, source, skip, limit):
+        """Dijkstra acotado desde source sin pasar por skip (la estrella que se contrae)."""
+        dist = {source: 0.0}
+        pq = [(0.0, source)]
+        settled = 0
+        while pq and settled < self.WITNESS_SETTLE_LIMIT:
+            d, u = heapq.heappop(pq)
+            if d > limit:
+                break
+            if d > dist[u]:
+                continue
+            settled += 1
+            for v, weight in adj[u].items():
+                nd = d + weight
+                if v != skip and nd < dist.get(v, float('inf')):
+                    dist[v] = nd
+                    heapq.heappush(pq, (nd, v))
+        return dist
+
+    def _shortcuts(self, adj, v):
+        """Atajos (u, w, largo) necesarios al contraer v: los que ningún testigo evita."""
+        neighbors = sorted(adj[v].items())
+        shortcuts = []
+        for i, (u, wu) in enumerate(neighbors):
+            targets = neighbors[i + 1:]
+            if not targets:
+                break
+            limit = wu + max(ww for _, ww in targets)
+            dist = self._witness_distances(adj, u, v, limit)
+            for w, ww in targets:
+                if dist.get(w, float('inf')) > wu + ww:
+                    shortcuts.append((u, w, wu + ww))
+        return shortcuts
+
+    def _index_middles(self):
+        self._middle = {}
+        for v in range(len(self.up_offsets) - 1):
+            for e in range(self.up_offsets[v], self.up_offsets[v + 1]):
+                if self.up_middle[e] >= 0:
+                    u = self.up_targets[e]
+                    self._middle[(min(u, v), max(u, v))] = self.up_middle[e]
+
+    # ----------------------------------------------------
+    #        CONSULTAS
+    # ----------------------------------------------------
+    def query(self, start, target):
+        """(camino, distancia, estrellas_expandidas), como PointToPointSearch.search."""
+        if start not in self.index or target not in self.index:
+            return None, float('inf'), 0
+        if start == target:
+            return [start], 0.0, 0
+        if self._opened_since_build:
+            return self._fallback(start, target)
+        distance, meeting, prev, expanded = self._upward_search(self.index[start], self.index[target])
+        path = self._unpacked_path(prev, meeting) if meeting >= 0 else None
+        if path is not None and self._blocked_since_build and self._uses_blocked(path):
+            return self._fallback(start, target)
+        # Si el camino no usa conexiones bloqueadas después, sigue siendo mínimo: bloquear nunca
+        # acorta caminos. Y si no había camino, con menos conexiones tampoco lo hay.
+        return path, distance, expanded
+
+    def distance(self, start, target):
+        """Sólo la distancia: sin cambios desde la construcción no hace falta desarmar los atajos."""
+        if self.stale or start not in self.index or target not in self.index:
+            return self.query(start, target)[1]
+        return self._upward_search(self.index[start], self.index[target])[0]
+
+    def path(self, start, target):
+        return self.query(start, target)[0]
+
+    def _upward_search(self, s, t):
+        offsets, targets, weights = self.up_offsets, self.up_targets, self.up_weights
+        inf = float('inf')
+        dist = ({s: 0.0}, {t: 0.0})
+        prev = ({s: -1}, {t: -1})
+        pq = ([(0.0, s)], [(0.0, t)])
+        settled = (set(), set())
+        mu, meeting = inf, -1
+        side = 0
+        while pq[0] or pq[1]:
+            if not pq[side] or pq[side][0][0] >= mu:
+                pq[side].clear()
+                side = 1 - side
+                continue
+            d, u = heapq.heappop(pq[side])
+            if u in settled[side] or d > dist[side][u]:
+                side = 1 - side
+                continue
+            settled[side].add(u)
+            other = dist[1 - side].get(u)
+            if other is not None and d + other < mu:
+                mu, meeting = d + other, u
+            edges = range(offsets[u], offsets[u + 1])
+            # Stall-on-demand: si una vecina de mayor rango ya ofrece un camino más corto a u,
+            # d no es su distancia real y no vale la pena expandirla
+            if any(dist[side].get(targets[e], inf) + weights[e] < d for e in edges):
+                side = 1 - side
+                continue
+            for e in edges:
+                v = targets[e]
+                nd = d + weights[e]
+                if nd < dist[side].get(v, inf):
+                    dist[side][v] = nd
+                    prev[side][v] = u
+                    heapq.heappush(pq[side], (nd, v))
+            side = 1 - side
+
+        return mu, meeting, prev, len(settled[0]) + len(settled[1])
+
+    def _unpacked_path(self, prev, meeting):
+        """Camino (etiquetas) de la búsqueda hacia arriba, con los atajos desarmados."""
+        up_path = self._walk(prev[0], meeting)[::-1] + self._walk(prev[1], meeting)[1:]
+        path = [up_path[0]]
+        for a, b in zip(up_path, up_path[1:]):
+            path.extend(self._unpack(a, b))
+        return [self.labels[i] for i in path]
+
+    @staticmethod
+    def _walk(prev, node):
+        nodes = []
+        while node >= 0:
+            nodes.append(node)
+            node = prev[node]
+        return nodes
+
+    def _unpack(self, a, b):
+        """Estrellas originales de a (excluida) a b (incluida) detrás de la arista a-b."""
+        out = []
+        stack = [(a, b)]
+        while stack:
+            u, v = stack.pop()
+            m = self._middle.get((min(u, v), max(u, v)))
+            if m is None:
+                out.append(v)
+            else:
+                stack.append((m, v))
+                stack.append((u, m))
+        return out
+
+    def _uses_blocked(self, path):
+        blocked = self._blocked_since_build
+        return any(tuple(sorted(pair)) in blocked for pair in zip(path, path[1:]))
+
+    def _fallback(self, start, target):
+        self.fallbacks += 1
+        if self.fallbacks == self.REBUILD_AFTER:
+            print("Jerarquía de contracción desactualizada: conviene reconstruirla "
+                  "(GraphManager.rebuild_contraction_hierarchy).")
+        return PointToPointSearch(self.graph_manager).search(start, target, "bidirectional")
+
+    # ----------------------------------------------------
+    #        CAMBIOS DEL GRAFO
+    # ----------------------------------------------------
+    def edge_blocked(self, a, b):
+        key = tuple(sorted((a, b)))
+        if key in self._opened_since_build:
+            self._opened_since_build.discard(key)
+        else:
+            self._blocked_since_build.add(key)
+
+    def edge_unblocked(self, a, b):
+        key = tuple(sorted((a, b)))
+        if key in self._blocked_since_build:
+            self._blocked_since_build.discard(key)
+        else:
+            self._opened_since_build.add(key)
+
+    @property
+    def needs_rebuild(self):
+        """True tras REBUILD_AFTER consultas de respaldo."""
+        return self.fallbacks >= self.REBUILD_AFTER
+
+    @property
+    def stale(self):
+        """True si alguna consulta puede necesitar el respaldo (el grafo cambió desde la construcción)."""
+        return bool(self._blocked_since_build or self._opened_since_build)
+
+    # ----------------------------------------------------
+    #        ARCHIVO
+    # ----------------------------------------------------
+    def save(self, path, source_sha256=None):
+        """Guarda el índice (encabezado JSON + arreglos) para no reconstruirlo en la próxima carga."""
+        layout, blobs, offset = {}, [], 0
+        for name, typecode in ARRAY_FIELDS:
+            raw = getattr(self, name).tobytes()
+            layout[name] = [typecode, offset, len(getattr(self, name))]
+            blobs.append(raw)
+            offset += len(raw)
+        header = {
+            "byteorder": sys.byteorder,
+            "source_sha256": source_sha256,
+            "labels": self.labels,
+            "blocked": sorted(self._built_blocked),
+            "arrays": layout,
+        }
+        header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        with open(path, 'wb') as f:
+            f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            for raw in blobs:
+                f.write(raw)
+
+    def load(self, path, source_sha256=None):
+        """
+        Carga un índice guardado con save. Lanza ContractionHierarchyError si no corresponde a
+        este grafo: otras estrellas, otro JSON de origen, o sin hash de origen con el que
+        comprobarlo (un índice con las mismas estrellas pero otras distancias daría caminos
+        erróneos). Las conexiones bloqueadas o desbloqueadas respecto del guardado se tratan como
+        cambios posteriores a la construcción.
+        """
+        if source_sha256 is None:
+            raise ContractionHierarchyError("Sin el hash del JSON de origen no se puede validar el índice.")
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            raise ContractionHierarchyError(f"No se pudo abrir el índice '{path}': {e}")
+        if len(data) < _PREAMBLE.size:
+            raise ContractionHierarchyError("Índice truncado.")
+        magic, version, header_len = _PREAMBLE.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ContractionHierarchyError("El archivo no es una jerarquía de contracción.")
+        if version != VERSION:
+            raise ContractionHierarchyError(f"Versión de índice {version} no soportada (se esperaba {VERSION}).")
+        header = json.loads(data[_PREAMBLE.size:_PREAMBLE.size + header_len].decode("utf-8"))
+        if header.get("byteorder") != sys.byteorder:
+            raise ContractionHierarchyError("El índice se generó con otro orden de bytes.")
+        if header.get("source_sha256") != source_sha256:
+            raise ContractionHierarchyError("El JSON de origen cambió desde que se construyó el índice.")
+        if header["labels"] != self.graph_manager.get_all_star_labels():
+            raise ContractionHierarchyError("El índice corresponde a otro conjunto de estrellas.")
+
+        start = _PREAMBLE.size + header_len
+        for name, (typecode, offset, count) in header["arrays"].items():
+            values = array(typecode)
+            end = start + offset + count * values.itemsize
+            if end > len(data):
+                raise ContractionHierarchyError("Índice truncado.")
+            values.frombytes(data[start + offset:end])
+            setattr(self, name, values)
+
+        self.labels = header["labels"]
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        self._index_middles()
+        self._built_blocked = {tuple(key) for key in header["blocked"]}
+        current = set(self.graph_manager.blocked_connections)
+        self._blocked_since_build = current - self._built_blocked
+        self._opened_since_build = self._built_blocked - current
+        self.fallbacks = 0
+        return self
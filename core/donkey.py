@@ -1,8 +1,151 @@
-class Donkey:
-    def __init__(self, salud, edad, energia, pasto):
-        self.salud_map = {"excelente": 4, "buena": 3, "regular": 2, "mala": 1, "moribundo": 0}
-        self.salud_str_map = {v: k for k, v in self.salud_map.items()}
+SALUD_MAP = {"excelente": 4, "buena": 3, "regular": 2, "mala": 1, "moribundo": 0}
+SALUD_STR_MAP = {v: k for k, v in SALUD_MAP.items()}
+# Energía que da cada kg de pasto según la salud; con otra salud el burro no come
+ENERGIA_POR_KG = {SALUD_MAP["excelente"]: 5, SALUD_MAP["regular"]: 3, SALUD_MAP["mala"]: 2}
+TIEMPO_PARA_COMER = 10       # de las 20 unidades de tiempo en una estrella, 10 para comer
+TIEMPO_PARA_INVESTIGAR = 10  # y 10 para investigar
+
+
+class StarEffect:
+    """
+    Lo que una estrella le hace al burro, calculado una sola vez a partir de sus datos
+    (tiempo_para_comer, costo_energia_invest, health_effect, life_effect): el tope de kg que
+    alcanza a comer, las unidades investigadas y su costo de energía, y los efectos sobre salud y
+    vida. Ver StarEffectTable (core.star_effects) para la tabla por estrella del grafo.
+
+    No se memorizan resultados: la energía y el pasto son continuos y casi nunca se repiten, así
+    que una tabla de resultados costaría más que las pocas operaciones que se ahorra.
+    """
+
+    __slots__ = ("kg_por_tiempo", "unidades_investigadas", "costo_energia",
+                 "health_effect", "life_effect")
+
+    def __init__(self, tiempo_para_comer=1, costo_energia_invest=1, health_effect=0, life_effect=0):
+        self.kg_por_tiempo = TIEMPO_PARA_COMER / tiempo_para_comer
+        self.unidades_investigadas = TIEMPO_PARA_INVESTIGAR / tiempo_para_comer
+        self.costo_energia = self.unidades_investigadas * costo_energia_invest
+        self.health_effect = health_effect
+        self.life_effect = life_effect
+
+    @classmethod
+    def desde_datos(cls, estrella_data):
+        """Efecto a partir de un dict de estrella (GraphManager.stars[label] o equivalente)."""
+        return cls(estrella_data.get('tiempo_para_comer', 1), estrella_data.get('costo_energia_invest', 1),
+                   estrella_data.get('health_effect', 0), estrella_data.get('life_effect', 0))
+
+    def resultado(self, salud, energia, pasto):
+        """(salud, energía, pasto, kg_comidos) después de comer e investigar en la estrella."""
+        # Asegurar que la salud se mantenga en el rango válido (0-4)
+        salud_final = max(SALUD_MAP["moribundo"], min(SALUD_MAP["excelente"], salud + self.health_effect))
+
+        # Comer si la energía es menor al 50% y la salud permite aprovechar el pasto
+        if energia < 50 and pasto > 0 and salud in ENERGIA_POR_KG:
+            return (salud_final,) + self._comer(energia, pasto, ENERGIA_POR_KG[salud])
+        return salud_final, energia - self.costo_energia, pasto, 0
+
+    def _comer(self, energia, pasto, energia_por_kg):
+        """(energía, pasto, kg_comidos) tras comer e investigar."""
+        # El burro intenta comer para llegar al 100% de energía, limitado por el pasto
+        # disponible y por el tiempo para comer.
+        kg_a_comer = min((100 - energia) / energia_por_kg, pasto)
+        kg_a_comer = min(kg_a_comer, self.kg_por_tiempo)
+        pasto -= kg_a_comer
+        energia += kg_a_comer * energia_por_kg
+        if energia > 100: energia = 100
+        return energia - self.costo_energia, pasto, kg_a_comer
+
+
+class DonkeyState:
+    """
+    Estado compacto del burro (salud, edad, energía, pasto y vida restante), sin logs.
+    Las reglas de comer, investigar y viajar viven aquí; el registro de acciones es opcional
+    y se delega a un 'recorder' con los métodos registrar_consumo/registrar_investigacion.
+    """
+
+    __slots__ = ("salud", "edad", "energia", "pasto", "vida_restante")
+
+    # Tablas de consulta compartidas por todas las instancias
+    salud_map = SALUD_MAP
+    salud_str_map = SALUD_STR_MAP
+
+    def __init__(self, salud, edad, energia, pasto, vida_restante):
+        self.salud = salud
+        self.edad = edad
+        self.energia = energia
+        self.pasto = pasto
+        self.vida_restante = vida_restante
+
+    def clonar(self):
+        """Devuelve una copia independiente del estado (sin pasar por copy.deepcopy)."""
+        estado = DonkeyState.__new__(DonkeyState)
+        estado.salud = self.salud
+        estado.edad = self.edad
+        estado.energia = self.energia
+        estado.pasto = self.pasto
+        estado.vida_restante = self.vida_restante
+        return estado
+
+    def obtener_estado(self):
+        return self.clonar()
+
+    def __eq__(self, other):
+        if not isinstance(other, DonkeyState):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in DonkeyState.__slots__)
+
+    def __repr__(self):
+        campos = ", ".join(f"{f}={getattr(self, f)!r}" for f in DonkeyState.__slots__)
+        return f"{type(self).__name__}({campos})"
+
+    def get_salud_str(self):
+        return self.salud_str_map.get(self.salud, "desconocido")
+
+    def procesar_estrella(self, star_label, estrella_data, recorder=None):
+        """
+        Simula las acciones del burro en una estrella: comer e investigar. estrella_data es un
+        StarEffect (p. ej. de GraphManager.star_effects) o un dict con los datos de la estrella.
+        """
+        efecto = estrella_data if isinstance(estrella_data, StarEffect) else StarEffect.desde_datos(estrella_data)
+        self.salud, self.energia, self.pasto, kg_comidos = efecto.resultado(self.salud, self.energia, self.pasto)
+        self.vida_restante += efecto.life_effect
 
+        if recorder is not None:
+            # Registrar el consumo de pasto si fue significativo
+            if kg_comidos > 0.01:
+                recorder.registrar_consumo(star_label, kg_comidos)
+            # Registrar la investigación si hubo algún efecto
+            if efecto.unidades_investigadas > 0.01 or efecto.health_effect != 0 or efecto.life_effect != 0:
+                recorder.registrar_investigacion(star_label, efecto.unidades_investigadas,
+                                                 efecto.health_effect, efecto.life_effect)
+
+    def puede_recorrer(self, tramos, considerar_energia=True):
+        """
+        Indica si el burro sobrevive a recorrer los tramos dados sin modificar su estado.
+        Como viajar() es lineal en la distancia, basta con restar sobre copias locales de
+        vida y energía (en el mismo orden que viajar) en lugar de clonar el burro.
+        """
+        vida = self.vida_restante
+        energia = self.energia
+        for distancia in tramos:
+            vida -= distancia
+            energia -= distancia * 0.1
+        if vida <= 0:
+            return False
+        return not considerar_energia or energia > 0
+
+    def viajar(self, distancia):
+        self.vida_restante -= distancia
+        # El viaje también consume energía
+        self.energia -= distancia * 0.1 # Ejemplo: 0.1 de energía por unidad de distancia
+        if self.energia < 0: self.energia = 0
+
+
+class Donkey(DonkeyState):
+    # El burro es una entidad (con logs), no un valor: igualdad y hash por identidad
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __init__(self, salud, edad, energia, pasto):
         self.salud = self.salud_map.get(salud.lower(), 2) # Default a 'regular' si no se encuentra
         self.edad = edad
         self.energia = energia
@@ -11,6 +154,32 @@ class Donkey:
         # Logs para el reporte de acciones del burro
         self.food_consumption_log = []
         self.research_log = []
+
+    @classmethod
+    def desde_estado(cls, estado, food_consumption_log=None, research_log=None):
+        """Crea un burro a partir de un DonkeyState (y, opcionalmente, logs previos)."""
+        donkey = cls.__new__(cls)
+        donkey.restaurar_estado(estado)
+        donkey.food_consumption_log = list(food_consumption_log or [])
+        donkey.research_log = list(research_log or [])
+        return donkey
+
+    def obtener_estado(self):
+        """Devuelve un DonkeyState con los valores actuales del burro (sin logs)."""
+        return DonkeyState.clonar(self)
+
+    def restaurar_estado(self, estado):
+        """Copia los valores de un DonkeyState sobre este burro; los logs no se tocan."""
+        self.salud = estado.salud
+        self.edad = estado.edad
+        self.energia = estado.energia
+        self.pasto = estado.pasto
+        self.vida_restante = estado.vida_restante
+
+    def clonar(self):
+        """Copia del burro con sus logs (las entradas de log no se modifican, basta copia superficial)."""
+        return Donkey.desde_estado(self, self.food_consumption_log, self.research_log)
+
     def calcular_vida_inicial(self):
         # Lógica de ejemplo para calcular la vida inicial.
         # La vida es una combinación de edad y salud.
@@ -19,79 +188,16 @@ class Donkey:
         salud_modificador = (self.salud + 1) * 1.5 # La salud da un bonus
         return base_vida * salud_modificador
 
-    def get_salud_str(self):
-        return self.salud_str_map.get(self.salud, "desconocido")
-
-    def procesar_estrella(self, star_label, estrella_data):
-        """
-        Simula las acciones del burro en una estrella: comer e investigar.
-        """
-        # 1. Comer si la energía es menor al 50%
-        if self.energia < 50 and self.pasto > 0:
-            energia_por_kg = 0
-            if self.salud == self.salud_map["excelente"]:
-                energia_por_kg = 5
-            elif self.salud == self.salud_map["regular"]:
-                energia_por_kg = 3
-            elif self.salud == self.salud_map["mala"]:
-                energia_por_kg = 2
-
-            if energia_por_kg > 0:
-                # El burro intenta comer para llegar al 100% de energía.
-                energia_necesaria = 100 - self.energia
-                kg_necesarios = energia_necesaria / energia_por_kg
-
-                # Limita los kg a comer por el pasto disponible.
-                kg_a_comer = min(kg_necesarios, self.pasto)
-
-                # El tiempo total en la estrella es 20 (valor asumido). 50% para comer.
-                tiempo_para_comer = 10
-                tiempo_por_kg = estrella_data.get('tiempo_para_comer', 1)
-                
-                # Limita los kg a comer por el tiempo disponible.
-                kg_posibles_por_tiempo = tiempo_para_comer / tiempo_por_kg
-                kg_a_comer = min(kg_a_comer, kg_posibles_por_tiempo)
-
-                # Actualizar valores
-                self.pasto -= kg_a_comer
-                self.energia += kg_a_comer * energia_por_kg
-                if self.energia > 100: self.energia = 100
-
-                # Registrar el consumo de pasto si fue significativo
-                if kg_a_comer > 0.01:
-                    self.food_consumption_log.append({
-                        "star": star_label, "amount_kg": kg_a_comer
-                    })
-
-        # 2. Investigar con el tiempo restante
-        # Asumimos 10 unidades de tiempo para investigar.
-        tiempo_para_investigar = 10
-        tiempo_por_unidad_invest = estrella_data.get('tiempo_para_comer', 1) # "X" tiempo
-        costo_energia_invest = estrella_data.get('costo_energia_invest', 1) # "Y" cantidad
-
-        # Calcular cuántas veces se puede aplicar el costo de energía
-        unidades_investigadas = tiempo_para_investigar / tiempo_por_unidad_invest
-        self.energia -= unidades_investigadas * costo_energia_invest
-
-        # Aplicar efectos de la investigación sobre salud y vida
-        health_effect = estrella_data.get('health_effect', 0)
-        life_effect = estrella_data.get('life_effect', 0)
-
-        self.salud += health_effect
-        # Asegurar que la salud se mantenga en el rango válido (0-4)
-        self.salud = max(self.salud_map["moribundo"], min(self.salud_map["excelente"], self.salud))
-
-        self.vida_restante += life_effect
+    def procesar_estrella(self, star_label, estrella_data, recorder=None):
+        super().procesar_estrella(star_label, estrella_data, recorder if recorder is not None else self)
 
-        # Registrar la investigación si hubo algún efecto
-        if unidades_investigadas > 0.01 or health_effect != 0 or life_effect != 0:
-            self.research_log.append({
-                "star": star_label, "units_investigated": unidades_investigadas,
-                "health_change": health_effect, "life_change": life_effect
-            })
+    def registrar_consumo(self, star_label, kg):
+        self.food_consumption_log.append({
+            "star": star_label, "amount_kg": kg
+        })
 
-    def viajar(self, distancia):
-        self.vida_restante -= distancia
-        # El viaje también consume energía
-        self.energia -= distancia * 0.1 # Ejemplo: 0.1 de energía por unidad de distancia
-        if self.energia < 0: self.energia = 0
\ No newline at end of file
+    def registrar_investigacion(self, star_label, unidades, health_change, life_change):
+        self.research_log.append({
+            "star": star_label, "units_investigated": unidades,
+            "health_change": health_change, "life_change": life_change
+        })
@@ -0,0 +1,132 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: sólo lo necesita la simulación por lotes
+    np = None
+
+from core.donkey import ENERGIA_POR_KG, SALUD_MAP, DonkeyState
+
+
+class DonkeyPopulation:
+    """
+    Muchos burros como arreglos de numpy (una posición por burro): salud, edad, energía, pasto y
+    vida restante. Es el equivalente por lotes de DonkeyState, pensado para barridos de
+    sensibilidad sobre los parámetros iniciales.
+    """
+
+    def __init__(self, salud, edad, energia, pasto, vida_restante=None):
+        if np is None:
+            raise RuntimeError("La simulación por lotes requiere numpy.")
+        self.salud = np.array(salud, dtype=np.float64)
+        self.edad = np.array(edad, dtype=np.float64)
+        self.energia = np.array(energia, dtype=np.float64)
+        self.pasto = np.array(pasto, dtype=np.float64)
+        if vida_restante is None:
+            # Misma fórmula y orden de operaciones que Donkey.calcular_vida_inicial
+            vida_restante = ((100 - self.edad) * 5) * ((self.salud + 1) * 1.5)
+        self.vida_restante = np.array(vida_restante, dtype=np.float64)
+
+    @classmethod
+    def from_donkeys(cls, donkeys):
+        """Población a partir de burros (o DonkeyState) ya creados, con su estado actual."""
+        return cls([d.salud for d in donkeys], [d.edad for d in donkeys], [d.energia for d in donkeys],
+                   [d.pasto for d in donkeys], [d.vida_restante for d in donkeys])
+
+    @classmethod
+    def from_grid(cls, saludes, edades, energias, pastos):
+        """
+        Todas las combinaciones de los valores dados (producto cartesiano, en el orden de
+        itertools.product). saludes acepta nombres ("excelente", ...) o códigos numéricos.
+        """
+        saludes = [SALUD_MAP.get(s.lower(), 2) if isinstance(s, str) else s for s in saludes]
+        grid = np.meshgrid(saludes, edades, energias, pastos, indexing="ij")
+        return cls(*(axis.ravel() for axis in grid))
+
+    def __len__(self):
+        return len(self.salud)
+
+    def copy(self):
+        return DonkeyPopulation(self.salud.copy(), self.edad.copy(), self.energia.copy(),
+                                self.pasto.copy(), self.vida_restante.copy())
+
+    def estado(self, i):
+        """DonkeyState del burro i (valores como float de Python)."""
+        return DonkeyState(float(self.salud[i]), float(self.edad[i]), float(self.energia[i]),
+                           float(self.pasto[i]), float(self.vida_restante[i]))
+
+
+class BatchDonkeySimulator:
+    """
+    Simula una población completa de burros a lo largo de una ruta, con las mismas reglas que la
+    animación de MainWindow: por cada tramo, viajar (DonkeyState.viajar), procesar la estrella de
+    llegada (comer, investigar, ajustar salud y vida) y morir si la vida o la energía llegan a 0.
+
+    Cada regla se aplica con operaciones vectorizadas y máscaras sobre los burros vivos, en el
+    mismo orden que la versión escalar, así que los resultados coinciden exactamente con los de
+    Donkey burro por burro.
+    """
+
+    def __init__(self, graph_manager):
+        if np is None:
+            raise RuntimeError("La simulación por lotes requiere numpy.")
+        self.graph_manager = graph_manager
+
+    def _tramos(self, route):
+        """(distancia, StarEffect de la estrella de llegada) por cada tramo de la ruta."""
+        tramos = []
+        for a, b in zip(route, route[1:]):
+            distancia = self.graph_manager.get_distance(a, b)
+            if distancia == float('inf'):
+                # Mismo respaldo que la animación: distancia euclídea / 4
+                pa = self.graph_manager.get_star_pos(a)
+                pb = self.graph_manager.get_star_pos(b)
+                distancia = math.sqrt((pa[0] - pb[0]) ** 2 + (pa[1] - pb[1]) ** 2) / 4.0
+            tramos.append((distancia, self.graph_manager.star_effects.effect(b)))
+        return tramos
+
+    def simulate(self, population, route):
+        """
+        Devuelve (paso_de_muerte, poblacion_final). paso_de_muerte[i] es el índice en route de la
+        estrella donde murió el burro i, o -1 si completó la ruta; el estado final de un burro
+        muerto queda congelado en ese paso. La población de entrada no se modifica.
+        """
+        pop = population.copy()
+        death_step = np.full(len(pop), -1, dtype=np.int64)
+        alive = np.ones(len(pop), dtype=bool)
+
+        for step, (distancia, efecto) in enumerate(self._tramos(route), start=1):
+            if not alive.any():
+                break
+            self._viajar(pop, alive, distancia)
+            self._procesar_estrella(pop, alive, efecto)
+            died = alive & ((pop.vida_restante <= 0) | (pop.energia <= 0))
+            death_step[died] = step
+            alive &= ~died
+        return death_step, pop
+
+    def _viajar(self, pop, alive, distancia):
+        pop.vida_restante[alive] -= distancia
+        energia = pop.energia[alive] - distancia * 0.1
+        pop.energia[alive] = np.where(energia < 0, 0, energia)
+
+    def _procesar_estrella(self, pop, alive, efecto):
+        # 1. Comer (energía < 50, con pasto y una salud que aproveche el pasto)
+        energia_por_kg = np.zeros(len(pop))
+        for salud, valor in ENERGIA_POR_KG.items():
+            energia_por_kg[pop.salud == salud] = valor
+        eat = alive & (pop.energia < 50) & (pop.pasto > 0) & (energia_por_kg > 0)
+        if eat.any():
+            epk = energia_por_kg[eat]
+            energia = pop.energia[eat]
+            kg = np.minimum((100 - energia) / epk, pop.pasto[eat])
+            kg = np.minimum(kg, efecto.kg_por_tiempo)
+            pop.pasto[eat] -= kg
+            energia = energia + kg * epk
+            pop.energia[eat] = np.where(energia > 100, 100, energia)
+
+        # 2. Investigar y aplicar los efectos de la estrella
+        pop.energia[alive] -= efecto.costo_energia
+        salud = pop.salud[alive] + efecto.health_effect
+        pop.salud[alive] = np.clip(salud, SALUD_MAP["moribundo"], SALUD_MAP["excelente"])
+        pop.vida_restante[alive] += efecto.life_effect
@@ -1,16 +1,36 @@
-from PyQt6.QtGui import QColor
 import random
 import json
 import math
 from pathlib import Path
 
+from core.json_stream import JsonStreamReader
+from core.spatial_index import SpatialIndex
+from core.star_effects import StarEffectTable
+
 class GraphManager:
     def __init__(self):
         self.stars = {}
         self.connections = set()
         self.blocked_connections = set()
+        # Índice de adyacencia: label -> {vecino: distancia}
+        # 'adjacency' incluye todas las conexiones; 'open_adjacency' solo las no bloqueadas.
+        self.adjacency = {}
+        self.open_adjacency = {}
         self.constellation_colors = {}
         self.initial_donkey_data = {}
+        self.source_path = None  # JSON del que se cargó el grafo (para invalidar el caché compilado)
+        self.spatial_index = SpatialIndex()  # grilla sobre posiciones en píxeles (culling / clics)
+        self.star_effects = StarEffectTable(self)  # efectos de cada estrella sobre el burro
+        self.all_pairs = None  # matriz de caminos mínimos opcional (ver enable_all_pairs)
+        self.contraction_hierarchy = None  # índice opcional (ver enable_contraction_hierarchy)
+        self.constellation_router = None  # índice opcional (ver enable_constellation_routing)
+        self._heuristic_scale = None  # calibración de la heurística de A* (ver heuristic_scale)
+        # Se incrementa con cada cambio de la topología (carga, bloqueo, desbloqueo) para
+        # invalidar cachés de caminos calculados sobre una versión anterior del grafo
+        self.generation = 0
+        # Se incrementa con cada cambio de efectos de una estrella: no toca caminos ni topología,
+        # pero deja obsoletas las rutas calculadas con los efectos anteriores
+        self.effects_generation = 0
         # parámetros del tablero / mapeo (ahora en cm)
         self.um_min_x = 0
         self.um_min_y = 0
@@ -22,16 +42,25 @@ class GraphManager:
         self.um_target_h = 600
 
     def _generate_random_color(self):
-        """Genera un color aleatorio brillante."""
-        return QColor(random.randint(100, 255), random.randint(100, 255), random.randint(100, 255))
+        """Genera un color aleatorio brillante como tupla (r, g, b); la UI lo convierte a QColor."""
+        return (random.randint(100, 255), random.randint(100, 255), random.randint(100, 255))
 
     def reset(self):
         """Limpia todos los datos del grafo."""
         self.stars.clear()
         self.connections.clear()
         self.blocked_connections.clear()
+        self.adjacency.clear()
+        self.open_adjacency.clear()
         self.constellation_colors.clear()
         self.initial_donkey_data.clear()
+        self.spatial_index = SpatialIndex()
+        self.star_effects.refresh()
+        self.all_pairs = None
+        self.contraction_hierarchy = None
+        self.constellation_router = None
+        self._heuristic_scale = None
+        self.generation += 1
 
     def load_from_json(self, file_path):
         self.reset()
@@ -40,35 +69,407 @@ class GraphManager:
         with open(file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
 
-        # Mapear id -> label para resolver conexiones
-        id_to_label = {}
-        for const in data.get("constellations", []):
-            const_name = const.get("name", "SinNombre")
-            if const_name not in self.constellation_colors:
-                self.constellation_colors[const_name] = self._generate_random_color()
-            for s in const.get("starts", []):
-                sid = s.get("id")
-                label = s.get("label")
-                if sid is not None and label:
-                    id_to_label[sid] = label
-
-        # Recolectar posiciones crudas (cm) para normalizar/escalar
-        raw_positions = []
-        stars_raw = []
+        loader = _GraphLoader(self)
         for const in data.get("constellations", []):
-            for s in const.get("starts", []):
-                coord = s.get("coordenates", {})
-                raw_x = coord.get("x", 0)
-                raw_y = coord.get("y", 0)
-                raw_positions.append((raw_x, raw_y))
-                stars_raw.append((const.get("name", "SinNombre"), s, raw_x, raw_y))
+            loader.add_constellation(const.get("name", "SinNombre"), const.get("starts", []))
+        loader.finish(data)
+        self.source_path = file_path
+
+    def load_from_json_streaming(self, file_path):
+        """
+        Variante de load_from_json para catálogos muy grandes: recorre el archivo una sola vez
+        decodificando las estrellas de a una (sin cargar el documento completo) y se las pasa al
+        cargador a medida que aparecen. Sólo se acumulan las estrellas de una constelación cuyo
+        "name" llega después de "starts", y los enlaces hacia ids que todavía no aparecieron.
+        """
+        self.reset()
+        loader = _GraphLoader(self)
+        root = {}
+
+        with open(file_path, 'r', encoding='utf-8') as f:
+            reader = JsonStreamReader(f)
+            for key in reader.iter_object():
+                if key == "constellations":
+                    for _ in reader.iter_array():
+                        # Con "name" antes de "starts" (lo habitual) cada estrella va directo al
+                        # cargador; si "name" aparece después, se guardan hasta cerrar el objeto
+                        const_name = None
+                        starts = []
+                        streamed = False
+                        for const_key in reader.iter_object():
+                            if const_key == "name" and not streamed:
+                                const_name = reader.read_value()
+                            elif const_key == "starts" and const_name is not None and not streamed:
+                                loader.begin_constellation(const_name)
+                                streamed = True
+                                for _ in reader.iter_array():
+                                    loader.add_star(const_name, reader.read_value())
+                            elif const_key == "starts":
+                                starts.extend(reader.read_value() for _ in reader.iter_array())
+                            else:
+                                reader.skip_value()
+                        if not streamed:
+                            loader.add_constellation(const_name or "SinNombre", starts)
+                elif key in _GraphLoader.ROOT_FIELDS:
+                    root[key] = reader.read_value()
+                else:
+                    reader.skip_value()
+
+        loader.finish(root)
+        self.source_path = file_path
+
+    def save_compiled(self, path):
+        """
+        Guarda el grafo ya construido en un archivo binario versionado (ver core.compiled_graph),
+        junto con el hash del JSON de origen para invalidarlo si éste cambia.
+        """
+        from core.compiled_graph import file_sha256, save_compiled
+        source_sha256 = file_sha256(self.source_path) if self.source_path else None
+        save_compiled(self, path, source_sha256)
+
+    def load_compiled(self, path, source_path=None):
+        """
+        Carga un grafo compilado con save_compiled, sin reparsear JSON ni recalcular el escalado.
+        Los arreglos del archivo se copian a los dicts de GraphManager (la carga sin copia, sobre
+        el mmap, es la de CompactGraphManager.load_compiled). Si se indica source_path y su hash
+        no coincide, devuelve False sin cargar.
+        """
+        from core.compiled_graph import CompiledGraphError, file_sha256, open_compiled, populate_graph_manager
+        try:
+            source_sha256 = file_sha256(source_path) if source_path else None
+            header, views, mm = open_compiled(path, source_sha256)
+        except (CompiledGraphError, OSError) as e:
+            print(f"Grafo compilado no utilizable ({path}): {e}")
+            return False
+        try:
+            populate_graph_manager(self, header, views)
+        finally:
+            for view in views.values():
+                view.release()
+            mm.close()
+        self.source_path = source_path
+        return True
+
+    def load_cached(self, file_path, cache_path=None):
+        """
+        Carga el JSON usando un caché compilado. Por defecto el caché va en la carpeta de cachés
+        del usuario (ver core.compiled_graph.user_cache_path), nunca junto al JSON. Si el caché no
+        existe o el JSON cambió, carga el JSON y regenera el caché; si no se puede escribir, se
+        avisa y se sigue sin caché. Devuelve True si usó el caché.
+        """
+        from core.compiled_graph import user_cache_path
+        cache_path = Path(cache_path or user_cache_path(file_path, ".graphc"))
+        if cache_path.exists() and self.load_compiled(cache_path, source_path=file_path):
+            return True
+        self.load_from_json(file_path)
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self.save_compiled(cache_path)
+        except OSError as e:
+            print(f"No se pudo guardar el grafo compilado en {cache_path}: {e}")
+        return False
+
+    def enable_all_pairs(self, workers=1, method="auto"):
+        """
+        Precalcula la matriz de caminos mínimos entre todas las estrellas (core.all_pairs), que
+        RouteCalculator usa en lugar de correr Dijkstra en cada paso. Se mantiene al bloquear o
+        desbloquear conexiones y se descarta al cargar otro grafo.
+        """
+        from core.all_pairs import AllPairsShortestPaths
+        self.all_pairs = AllPairsShortestPaths(self).build(workers=workers, method=method)
+        return self.all_pairs
+
+    def enable_contraction_hierarchy(self, cache_path=None):
+        """
+        Prepara la jerarquía de contracción (core.contraction_hierarchy) para consultas de camino
+        mínimo entre dos estrellas. El índice se guarda en la carpeta de cachés del usuario (o en
+        cache_path) junto con el hash del JSON de origen, y sólo se reutiliza si ese hash coincide;
+        sin JSON de origen (source_path) siempre se construye y no se guarda. Se avisa de cada
+        bloqueo o desbloqueo y se descarta al cargar otro grafo.
+        """
+        from core.compiled_graph import file_sha256, user_cache_path
+        from core.contraction_hierarchy import ContractionHierarchy, ContractionHierarchyError
+        index = ContractionHierarchy(self)
+        if not self.source_path:
+            self.contraction_hierarchy = index.build()
+            return self.contraction_hierarchy
+        cache_path = Path(cache_path or user_cache_path(self.source_path, ".ch"))
+        source_sha256 = file_sha256(self.source_path)
+        if cache_path.exists():
+            try:
+                self.contraction_hierarchy = index.load(cache_path, source_sha256)
+                return self.contraction_hierarchy
+            except ContractionHierarchyError as e:
+                print(f"Índice de jerarquía de contracción descartado: {e}")
+        self.contraction_hierarchy = index.build()
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            index.save(cache_path, source_sha256)
+        except OSError as e:
+            print(f"No se pudo guardar el índice en {cache_path}: {e}")
+        return self.contraction_hierarchy
+
+    def rebuild_contraction_hierarchy(self):
+        """
+        Reconstruye la jerarquía de contracción (p. ej. cuando needs_rebuild es True) en un índice
+        nuevo y lo reemplaza al terminar: mientras tanto las consultas siguen con el anterior, así
+        que se puede llamar desde un hilo de fondo. Si el grafo cambia durante la construcción,
+        el índice nuevo se descarta y se conserva el anterior. Devuelve True si lo reemplazó.
+        """
+        from core.contraction_hierarchy import ContractionHierarchy
+        if self.contraction_hierarchy is None:
+            return False
+        generation = self.generation
+        index = ContractionHierarchy(self).build()
+        if generation != self.generation or self.contraction_hierarchy is None:
+            print("El grafo cambió durante la reconstrucción de la jerarquía de contracción; se descarta.")
+            return False
+        self.contraction_hierarchy = index
+        return True
+
+    def enable_constellation_routing(self):
+        """
+        Prepara el índice por constelaciones (core.constellation_routing): tablas de distancias
+        dentro de cada constelación y un grafo entre sus estrellas frontera. Bloquear o desbloquear
+        una conexión interna reconstruye sólo esa constelación; se descarta al cargar otro grafo.
+        """
+        from core.constellation_routing import ConstellationRouter
+        self.constellation_router = ConstellationRouter(self).build()
+        return self.constellation_router
+
+    def heuristic_scale(self):
+        """
+        Factor k tal que k * (distancia euclídea entre um_pos) nunca supera el largo de una
+        conexión. Así k * |estrella - destino| es una cota inferior (admisible y consistente) del
+        camino mínimo, útil para A*. Se calibra con todas las conexiones, bloqueadas incluidas,
+        por lo que sigue valiendo tras bloquear o desbloquear; se recalcula al recargar el grafo.
+        """
+        if self._heuristic_scale is None:
+            scale = float('inf')
+            for label in self.stars:
+                x, y = self.stars[label]["um_pos"]
+                for other, dist in self.get_neighbors(label, include_blocked=True):
+                    ox, oy = self.stars[other]["um_pos"]
+                    length = math.hypot(x - ox, y - oy)
+                    if length > 0:
+                        scale = min(scale, dist / length)
+            # Margen para que el redondeo no vuelva la cota (apenas) mayor que la distancia real
+            self._heuristic_scale = 0.0 if scale == float('inf') else scale * (1 - 1e-9)
+        return self._heuristic_scale
+
+    def _index_connection(self, a, b, dist):
+        """Registra la conexión (a, b) en el índice de adyacencia, conservando la distancia mínima."""
+        dist = float(dist)
+        for u, v in ((a, b), (b, a)):
+            neigh = self.adjacency.setdefault(u, {})
+            if dist < neigh.get(v, float('inf')):
+                neigh[v] = dist
+
+    def _get_connection_key(self, star1_label, star2_label):
+        """Helper para obtener una clave consistente para una conexión (tupla ordenada)."""
+        if star1_label not in self.stars or star2_label not in self.stars:
+            return None
+        return tuple(sorted((star1_label, star2_label)))
+
+    def is_connection_blocked(self, star1_label, star2_label):
+        """Verifica si una conexión entre dos estrellas está bloqueada."""
+        key = self._get_connection_key(star1_label, star2_label)
+        if key:
+            return key in self.blocked_connections
+        return False
+
+    def set_star_effects(self, star_label, health_effect, life_effect):
+        """
+        Cambia los efectos de una estrella sobre el burro. Incrementa effects_generation (no
+        generation, porque los caminos no cambian): una ruta que se estaba calculando con los
+        efectos anteriores queda obsoleta. Devuelve False si la estrella no existe.
+        """
+        star_data = self.stars.get(star_label)
+        if not star_data:
+            return False
+        star_data['health_effect'] = health_effect
+        star_data['life_effect'] = life_effect
+        self.star_effects.refresh(star_label)
+        self.effects_generation += 1
+        return True
+
+    def block_connection(self, star1_label, star2_label):
+        """Bloquea una conexión entre dos estrellas."""
+        key = self._get_connection_key(star1_label, star2_label)
+        if not key:
+            return False, "Una o ambas estrellas no existen."
+
+        # Verificar si la conexión realmente existe en el grafo
+        if key[1] not in self.adjacency.get(key[0], {}):
+            return False, f"No se encontró una conexión directa entre {star1_label} y {star2_label}."
+
+        if key in self.blocked_connections:
+            return False, f"La conexión entre {star1_label} y {star2_label} ya está bloqueada."
+
+        self.blocked_connections.add(key)
+        a, b = key
+        self.open_adjacency[a].pop(b, None)
+        self.open_adjacency[b].pop(a, None)
+        self.generation += 1
+        if self.all_pairs is not None:
+            self.all_pairs.edge_blocked(a, b)
+        if self.contraction_hierarchy is not None:
+            self.contraction_hierarchy.edge_blocked(a, b)
+        if self.constellation_router is not None:
+            self.constellation_router.edge_blocked(a, b)
+        return True, f"Conexión entre {star1_label} y {star2_label} bloqueada exitosamente."
+
+    def unblock_connection(self, star1_label, star2_label):
+        """Desbloquea una conexión entre dos estrellas."""
+        key = self._get_connection_key(star1_label, star2_label)
+        if not key:
+            return False, "Una o ambas estrellas no existen."
+
+        if key not in self.blocked_connections:
+            return False, f"La conexión entre {star1_label} y {star2_label} no está bloqueada."
+
+        self.blocked_connections.remove(key)
+        a, b = key
+        dist = self.adjacency[a][b]
+        self.open_adjacency[a][b] = dist
+        self.open_adjacency[b][a] = dist
+        self.generation += 1
+        if self.all_pairs is not None:
+            self.all_pairs.edge_unblocked(a, b, dist)
+        if self.contraction_hierarchy is not None:
+            self.contraction_hierarchy.edge_unblocked(a, b)
+        if self.constellation_router is not None:
+            self.constellation_router.edge_unblocked(a, b)
+        return True, f"Conexión entre {star1_label} y {star2_label} desbloqueada exitosamente."
+
+    def get_distance(self, star1_label, star2_label):
+        """Devuelve la distancia entre dos estrellas si existe la conexión; inf si no existe."""
+        if star1_label == star2_label:
+            return 0.0
+        return self.open_adjacency.get(star1_label, {}).get(star2_label, float('inf'))
+
+    def get_neighbors(self, star_label, include_blocked=False):
+        """
+        Devuelve lista de tuplas (neighbor_label, distance) para la estrella dada.
+        Si include_blocked es False, las conexiones bloqueadas no se incluirán.
+        """
+        index = self.adjacency if include_blocked else self.open_adjacency
+        return list(index.get(star_label, {}).items())
+
+    def get_star_pos(self, star_label):
+        """Devuelve la posición (x,y) en pixeles de la estrella o (0,0) si no existe."""
+        data = self.stars.get(star_label)
+        if not data:
+            return (0, 0)
+        return data.get("pos", (0, 0))
+
+    def get_all_star_labels(self):
+        """Devuelve una lista ordenada de todas las etiquetas de estrellas."""
+        return sorted(list(self.stars.keys()))
+
+
+# Marca de las claves que reservan, durante la carga, el lugar de un vecino aún no visto
+_PENDING = object()
+
+
+class _GraphLoader:
+    """
+    Recibe las estrellas de a una (add_star), registra cada enlace en cuanto se conocen sus dos
+    extremos y al final (finish) calcula el escalado y las posiciones. Compartido por la carga
+    completa (json.load) y la carga en streaming.
+    """
+
+    ROOT_FIELDS = ("burroenergiaInicial", "estadoSalud", "pasto", "startAge", "deathAge")
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.id_to_label = {}
+        # (constelación, label, id, x, y, radius, timeToEat, amountOfEnergy, hypergiant, healthEffect, lifeEffect)
+        self.records = []
+        # Enlaces hacia un starId que todavía no apareció: starId -> [(label, distance)]
+        self.waiting_links = {}
+        self.star_count = 0
+        self.min_x = self.max_x = self.min_y = self.max_y = None
+
+    def add_constellation(self, const_name, starts):
+        self.begin_constellation(const_name)
+        for s in starts:
+            self.add_star(const_name, s)
+
+    def begin_constellation(self, const_name):
+        graph = self.graph
+        if const_name not in graph.constellation_colors:
+            graph.constellation_colors[const_name] = graph._generate_random_color()
+
+    def add_star(self, const_name, s):
+        sid = s.get("id")
+        label = s.get("label")
+
+        # Rangos en cm (incluye estrellas sin label, como la carga original)
+        coord = s.get("coordenates", {})
+        raw_x = coord.get("x", 0)
+        raw_y = coord.get("y", 0)
+        if self.star_count == 0:
+            self.min_x = self.max_x = raw_x
+            self.min_y = self.max_y = raw_y
+        else:
+            self.min_x = min(self.min_x, raw_x)
+            self.max_x = max(self.max_x, raw_x)
+            self.min_y = min(self.min_y, raw_y)
+            self.max_y = max(self.max_y, raw_y)
+        self.star_count += 1
+
+        if not label:
+            return
+        self.records.append((
+            const_name, label, sid, raw_x, raw_y,
+            s.get("radius", 0.5),
+            s.get("timeToEat", 1),
+            s.get("amountOfEnergy", 1),
+            s.get("hypergiant", False),
+            s.get("healthEffect", 0),
+            s.get("lifeEffect", 0),
+        ))
+
+        # Enlaces que esperaban a esta estrella y luego los suyos: los que apuntan a una estrella
+        # ya vista se registran ahora, el resto espera a que aparezca su destino
+        if sid is not None:
+            self.id_to_label[sid] = label
+            for other_label, dist in self.waiting_links.pop(sid, ()):
+                self._resolve(other_label, sid, label, dist)
+        for link in s.get("linkedTo", []):
+            star_id = link.get("starId")
+            dist = link.get("distance", 0)
+            other_label = self.id_to_label.get(star_id)
+            if other_label:
+                self._connect(label, other_label, dist)
+            else:
+                # Se reserva el lugar del vecino en la adyacencia de esta estrella, para que el
+                # orden de vecinos (y con él los desempates de Dijkstra) sea el de la declaración
+                self.graph.adjacency.setdefault(label, {}).setdefault((_PENDING, star_id), float('inf'))
+                self.waiting_links.setdefault(star_id, []).append((label, dist))
+
+    def _connect(self, label, other_label, dist):
+        a, b = tuple(sorted((label, other_label)))
+        self.graph.connections.add((a, b, dist))
+        self.graph._index_connection(a, b, dist)
+
+    def _resolve(self, label, star_id, other_label, dist):
+        """Registra un enlace de 'label' que esperaba a star_id, ocupando el lugar reservado."""
+        adjacency = self.graph.adjacency
+        slot = (_PENDING, star_id)
+        neigh = adjacency[label]
+        if slot in neigh:
+            adjacency[label] = {(other_label if k == slot else k): v for k, v in neigh.items()}
+        self._connect(label, other_label, dist)
+
+    def finish(self, root):
+        graph = self.graph
 
         # Determinar rangos en cm; asegurar mínimo 200 cm en cada eje
-        if raw_positions:
-            xs = [p[0] for p in raw_positions]
-            ys = [p[1] for p in raw_positions]
-            min_x, max_x = min(xs), max(xs)
-            min_y, max_y = min(ys), max(ys)
+        if self.star_count:
+            min_x, max_x = self.min_x, self.max_x
+            min_y, max_y = self.min_y, self.max_y
         else:
             min_x = min_y = 0
             max_x = max_y = 1
@@ -82,13 +483,13 @@ class GraphManager:
             max_y = min_y + 200
             range_y = 200
 
-        self.um_min_x = min_x
-        self.um_min_y = min_y
-        self.um_range_x = range_x
-        self.um_range_y = range_y
+        graph.um_min_x = min_x
+        graph.um_min_y = min_y
+        graph.um_range_x = range_x
+        graph.um_range_y = range_y
 
-        padding = self.um_padding
-        target_w, target_h = self.um_target_w, self.um_target_h
+        padding = graph.um_padding
+        target_w, target_h = graph.um_target_w, graph.um_target_h
         range_x = range_x if range_x != 0 else 1
         range_y = range_y if range_y != 0 else 1
         scale_x = (target_w - 2 * padding) / range_x
@@ -98,8 +499,8 @@ class GraphManager:
         # Factor deseado para separar visualmente las estrellas (gráfico solamente).
         desired_separation_factor = 1.6
 
-        self.um_scale = scale
-        self.um_padding = padding
+        graph.um_scale = scale
+        graph.um_padding = padding
 
         # Construir estrellas y conexiones
         pos_map = {}  # key -> list of labels (para detectar overlaps)
@@ -112,22 +513,17 @@ class GraphManager:
 
         # Primero calcular las posiciones base (sin factor) para evaluar límites
         base_positions = []
-        for _, s, raw_x, raw_y in stars_raw:
-            if not s.get("label"):
-                base_positions.append(None)
-                continue
+        for record in self.records:
+            label, raw_x, raw_y = record[1], record[3], record[4]
             norm_x = (raw_x - min_x) / (range_x if range_x != 0 else 1)
             norm_y = (raw_y - min_y) / (range_y if range_y != 0 else 1)
             base_px = padding + norm_x * useful_w
             base_py = padding + norm_y * useful_h
-            base_positions.append((s.get("label"), base_px, base_py))
+            base_positions.append((label, base_px, base_py))
 
         # Determinar el factor máximo admisible para que ninguna estrella salga del área útil
         allowed_max = float('inf')
-        for entry in base_positions:
-            if entry is None:
-                continue
-            _, base_px, base_py = entry
+        for _, base_px, base_py in base_positions:
             # para X: si base > center, max_f = (right - center)/(base - center)
             #         si base < center, max_f = (center - left)/(center - base)
             if base_px != center_px:
@@ -151,10 +547,8 @@ class GraphManager:
         separation_factor = min(desired_separation_factor, allowed_max)
 
         # Construir posiciones finales aplicando separation_factor y clamp de seguridad
-        for const_name, s, raw_x, raw_y in stars_raw:
-            label = s.get("label")
-            if not label:
-                continue
+        for (const_name, label, sid, raw_x, raw_y, radius, time_to_eat, energy,
+             hypergiant, health_effect, life_effect) in self.records:
             # posición base en píxeles dentro del área útil (sin separación extra)
             norm_x = (raw_x - min_x) / (range_x if range_x != 0 else 1)
             norm_y = (raw_y - min_y) / (range_y if range_y != 0 else 1)
@@ -169,16 +563,16 @@ class GraphManager:
             px = max(padding, min(padding + useful_w, px))
             py = max(padding, min(padding + useful_h, py))
 
-            self.stars[label] = {
-                "id": s.get("id"),
+            graph.stars[label] = {
+                "id": sid,
                 "pos": (px, py),
                 "um_pos": (raw_x, raw_y),
-                "radius": s.get("radius", 0.5),
-                "tiempo_para_comer": s.get("timeToEat", 1),
-                "costo_energia_invest": s.get("amountOfEnergy", 1),
-                "hypergiant": s.get("hypergiant", False),
-                "health_effect": s.get("healthEffect", 0), # Nuevo: efecto en salud
-                "life_effect": s.get("lifeEffect", 0),     # Nuevo: efecto en vida
+                "radius": radius,
+                "tiempo_para_comer": time_to_eat,
+                "costo_energia_invest": energy,
+                "hypergiant": hypergiant,
+                "health_effect": health_effect, # Nuevo: efecto en salud
+                "life_effect": life_effect,     # Nuevo: efecto en vida
                 "constellation": const_name,
                 "overlap": False
             }
@@ -190,115 +584,23 @@ class GraphManager:
         for key, labels in pos_map.items():
             if len(labels) > 1:
                 for lab in labels:
-                    if lab in self.stars:
-                        self.stars[lab]['overlap'] = True
-
-        # Añadir conexiones (undirected)
-        for const in data.get("constellations", []):
-            for s in const.get("starts", []):
-                label = s.get("label")
-                if not label:
-                    continue
-                for link in s.get("linkedTo", []):
-                    other_label = id_to_label.get(link.get("starId"))
-                    if other_label:
-                        a, b = tuple(sorted((label, other_label)))
-                        dist = link.get("distance", 0)
-                        self.connections.add((a, b, dist))
+                    if lab in graph.stars:
+                        graph.stars[lab]['overlap'] = True
+
+        # Los enlaces que siguen esperando apuntan a ids inexistentes: se descartan con sus lugares
+        adjacency = graph.adjacency
+        for star_id, waiting in self.waiting_links.items():
+            for label, _ in waiting:
+                neigh = adjacency.get(label)
+                if neigh is not None:
+                    neigh.pop((_PENDING, star_id), None)
+                    if not neigh:
+                        del adjacency[label]
+        self.waiting_links.clear()
+
+        # Al cargar no hay bloqueos: la adyacencia abierta es una copia completa
+        graph.open_adjacency = {label: dict(neigh) for label, neigh in graph.adjacency.items()}
 
         # Datos globales para UI
-        self.initial_donkey_data = {
-            "burroenergiaInicial": data.get("burroenergiaInicial"),
-            "estadoSalud": data.get("estadoSalud"),
-            "pasto": data.get("pasto"),
-            "startAge": data.get("startAge"),
-            "deathAge": data.get("deathAge")
-        }
-
-    def _get_connection_key(self, star1_label, star2_label):
-        """Helper para obtener una clave consistente para una conexión (tupla ordenada)."""
-        if star1_label not in self.stars or star2_label not in self.stars:
-            return None
-        return tuple(sorted((star1_label, star2_label)))
-
-    def is_connection_blocked(self, star1_label, star2_label):
-        """Verifica si una conexión entre dos estrellas está bloqueada."""
-        key = self._get_connection_key(star1_label, star2_label)
-        if key:
-            return key in self.blocked_connections
-        return False
-
-    def block_connection(self, star1_label, star2_label):
-        """Bloquea una conexión entre dos estrellas."""
-        key = self._get_connection_key(star1_label, star2_label)
-        if not key:
-            return False, "Una o ambas estrellas no existen."
-
-        # Verificar si la conexión realmente existe en el grafo
-        connection_exists = False
-        for s1, s2, _ in self.connections:
-            if tuple(sorted((s1, s2))) == key:
-                connection_exists = True
-                break
-
-        if not connection_exists:
-            return False, f"No se encontró una conexión directa entre {star1_label} y {star2_label}."
-
-        if key in self.blocked_connections:
-            return False, f"La conexión entre {star1_label} y {star2_label} ya está bloqueada."
-
-        self.blocked_connections.add(key)
-        return True, f"Conexión entre {star1_label} y {star2_label} bloqueada exitosamente."
-
-    def unblock_connection(self, star1_label, star2_label):
-        """Desbloquea una conexión entre dos estrellas."""
-        key = self._get_connection_key(star1_label, star2_label)
-        if not key:
-            return False, "Una o ambas estrellas no existen."
-
-        if key not in self.blocked_connections:
-            return False, f"La conexión entre {star1_label} y {star2_label} no está bloqueada."
-
-        self.blocked_connections.remove(key)
-        return True, f"Conexión entre {star1_label} y {star2_label} desbloqueada exitosamente."
-
-    def get_distance(self, star1_label, star2_label):
-        """Devuelve la distancia entre dos estrellas si existe la conexión; inf si no existe."""
-        if star1_label == star2_label:
-            return 0.0
-        a, b = tuple(sorted((star1_label, star2_label)))
-        for s1, s2, dist in self.connections:
-            if s1 == a and s2 == b and not self.is_connection_blocked(s1, s2): # Check if not blocked
-                return float(dist)
-        return float('inf')
-
-    def get_neighbors(self, star_label, include_blocked=False):
-        """
-        Devuelve lista de tuplas (neighbor_label, distance) para la estrella dada.
-        Si include_blocked es False, las conexiones bloqueadas no se incluirán.
-        """
-        neighbors = []
-        for s1, s2, dist in self.connections:
-            # Determinar la clave de conexión para verificar el estado de bloqueo
-            conn_key = tuple(sorted((s1, s2)))
-
-            # Si no se incluyen las bloqueadas y esta conexión está bloqueada, saltarla
-            if not include_blocked and conn_key in self.blocked_connections:
-                continue
-
-            if s1 == star_label:
-                neighbors.append((s2, float(dist)))
-            elif s2 == star_label:
-                neighbors.append((s1, float(dist)))
-        return neighbors
-
-    def get_star_pos(self, star_label):
-        """Devuelve la posición (x,y) en pixeles de la estrella o (0,0) si no existe."""
-        data = self.stars.get(star_label)
-        if not data:
-            return (0, 0)
-        return data.get("pos", (0, 0))
-
-    def get_all_star_labels(self):
-        """Devuelve una lista ordenada de todas las etiquetas de estrellas."""
-        return sorted(list(self.stars.keys()))
\ No newline at end of file
+        graph.initial_donkey_data = {field: root.get(field) for field in self.ROOT_FIELDS}
+        graph.spatial_index = SpatialIndex.from_graph(graph)
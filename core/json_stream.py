@@ -0,0 +1,119 @@
+import json
+
+_WHITESPACE = " \t\n\r"
+
+
+class JsonStreamReader:
+    """
+    Lector JSON incremental (solo biblioteca estándar) sobre un archivo de texto.
+    Permite recorrer objetos y arreglos clave por clave / elemento por elemento y decodificar
+    solo los valores que interesan, manteniendo en memoria un búfer pequeño del archivo.
+    """
+
+    def __init__(self, stream, chunk_size=1 << 16):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, min_extra=1):
+        """Lee más texto del archivo; devuelve False si ya no queda nada."""
+        if self.eof:
+            return False
+        # Descartar lo ya consumido para que el búfer no crezca con el archivo
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self.stream.read(max(self.chunk_size, min_extra))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def _peek(self):
+        """Devuelve el siguiente carácter significativo (sin consumirlo) o '' al final."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"JSON inválido: se esperaba '{char}' y se encontró '{found or 'EOF'}'.")
+        self.pos += 1
+
+    def read_value(self):
+        """Decodifica el siguiente valor JSON completo (objeto, arreglo, cadena, número...)."""
+        self._peek()
+        need = self.chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill(need):
+                    raise
+                need *= 2  # valores grandes: leer bloques cada vez mayores
+                continue
+            # Un número al final del búfer podría continuar en el siguiente bloque
+            if end == len(self.buf) and not self.eof:
+                self._fill(need)
+                need *= 2
+                continue
+            self.pos = end
+            return value
+
+    def skip_value(self):
+        """Salta el siguiente valor sin conservarlo (recorre objetos/arreglos de forma incremental)."""
+        char = self._peek()
+        if char == "{":
+            for _ in self.iter_object():
+                self.skip_value()
+        elif char == "[":
+            for _ in self.iter_array():
+                self.skip_value()
+        else:
+            self.read_value()
+
+    def iter_object(self):
+        """
+        Recorre un objeto JSON entregando cada clave. Antes de pedir la siguiente clave, quien
+        llama debe consumir el valor con read_value, skip_value o un iter_* anidado.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            if not isinstance(key, str):
+                raise ValueError("JSON inválido: las claves de un objeto deben ser cadenas.")
+            self._expect(":")
+            yield key
+            char = self._peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"JSON inválido: se esperaba ',' o '}}' y se encontró '{char or 'EOF'}'.")
+
+    def iter_array(self):
+        """Recorre un arreglo JSON; en cada iteración quien llama consume un elemento."""
+        self._expect("[")
+        if self._peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            char = self._peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"JSON inválido: se esperaba ',' o ']' y se encontró '{char or 'EOF'}'.")
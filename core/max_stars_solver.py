@@ -0,0 +1,248 @@
+import heapq
+import time
+
+
+class RouteCancelled(Exception):
+    """Se lanza cuando quien pidió la ruta la cancela (ver el parámetro cancelled)."""
+
+
+class MaxStarsSolver:
+    """
+    Solver exacto del modo "máximo de estrellas": busca el orden de visita que recorre la mayor
+    cantidad de estrellas distintas sin que la vida del burro llegue a 0 (mismas reglas que
+    calculate_max_stars_route: sólo el viaje descuenta vida).
+
+    Trabaja sobre el cierre métrico del grafo (distancias de camino mínimo entre estrellas):
+    con pocos candidatos usa programación dinámica por subconjuntos (Held-Karp) y, si no,
+    ramificación y poda. Ambas respetan un presupuesto de tiempo y, si se agota, devuelven la
+    mejor ruta encontrada hasta ese momento (nunca peor que la voraz).
+    """
+
+    DP_MAX_NODES = 12           # hasta aquí (candidatos sin contar el inicio) se usa Held-Karp
+    MAX_MEMO = 1_000_000        # estados recordados por la poda de dominancia
+
+    def __init__(self, graph_manager, time_budget=2.0, progress=None, cancelled=None):
+        self.graph_manager = graph_manager
+        self.time_budget = time_budget
+        self.progress = progress      # progress(ruta) con cada mejora de la mejor ruta
+        self.cancelled = cancelled    # cancelled() -> True interrumpe con RouteCancelled
+        self._rows = {}
+        self._limit = float('inf')
+        self._deadline = None
+
+    # ----------------------------------------------------
+    #        DISTANCIAS (filas del cierre métrico, perezosas)
+    # ----------------------------------------------------
+    def _row(self, source):
+        """(dist, prev) de Dijkstra desde source, cortado en la vida disponible."""
+        row = self._rows.get(source)
+        all_pairs = getattr(self.graph_manager, 'all_pairs', None)
+        if row is None and all_pairs is not None:
+            dist, prev = all_pairs.row(source)
+            row = self._rows[source] = ({label: d for label, d in dist.items() if d < self._limit}, prev)
+        elif row is None:
+            limit = self._limit
+            dist = {source: 0.0}
+            prev = {source: None}
+            pq = [(0.0, source)]
+            while pq:
+                d, u = heapq.heappop(pq)
+                if d > dist[u]:
+                    continue
+                for v, weight in self.graph_manager.get_neighbors(u):
+                    nd = d + weight
+                    if nd < limit and nd < dist.get(v, float('inf')):
+                        dist[v] = nd
+                        prev[v] = u
+                        heapq.heappush(pq, (nd, v))
+            row = self._rows[source] = (dist, prev)
+        return row
+
+    def _dist(self, a, b):
+        return self._row(a)[0].get(b, float('inf'))
+
+    def _expand(self, order):
+        """Convierte un orden de visita en la ruta real (caminos mínimos), sin repetir estrellas."""
+        route = [order[0]]
+        for a, b in zip(order, order[1:]):
+            prev = self._row(a)[1]
+            path = []
+            node = b
+            while node is not None:
+                path.append(node)
+                node = prev[node]
+            path.reverse()
+            route.extend(path[1:])
+        return route
+
+    def _timed_out(self):
+        if self.cancelled is not None and self.cancelled():
+            raise RouteCancelled("Cálculo de ruta cancelado.")
+        return self._deadline is not None and time.monotonic() > self._deadline
+
+    def _report(self, order):
+        if self.progress is not None:
+            self.progress(list(dict.fromkeys(self._expand(order))))
+
+    # ----------------------------------------------------
+    #        SOLVER
+    # ----------------------------------------------------
+    def solve(self, start_star, vida):
+        """
+        Devuelve (ruta, estrellas_visitadas, es_optima). 'ruta' incluye las estrellas de paso
+        y es_optima indica si la búsqueda terminó dentro del presupuesto de tiempo.
+        """
+        if start_star not in self.graph_manager.stars:
+            return [], 0, True
+        self._rows = {}
+        self._limit = vida
+        self._deadline = time.monotonic() + self.time_budget if self.time_budget is not None else None
+
+        dist_start = self._row(start_star)[0]
+        candidates = sorted((d, label) for label, d in dist_start.items() if label != start_star)
+        candidates = [label for _, label in candidates]
+
+        best_order = self._greedy(start_star, vida)
+        self._report(best_order)
+        if len(candidates) <= self.DP_MAX_NODES:
+            order, proven = self._held_karp(start_star, candidates, vida, best_order)
+        else:
+            order, proven = self._branch_and_bound(start_star, candidates, vida, best_order)
+
+        path = self._expand(order)
+        tramos = [self._dist(a, b) for a, b in zip(path, path[1:])]
+        if not self._feasible(vida, tramos):
+            # Redondeo al sumar por tramos: quedarse con la voraz, que se validó paso a paso
+            path = self._expand(best_order)
+            proven = False
+        route = list(dict.fromkeys(path))
+        return route, len(route), proven
+
+    def _feasible(self, vida, tramos):
+        """Misma comprobación que DonkeyState.puede_recorrer(considerar_energia=False)."""
+        for distancia in tramos:
+            vida -= distancia
+        return vida > 0
+
+    def _greedy(self, start_star, vida):
+        """Orden voraz (estrella no visitada más cercana), usado como cota inicial."""
+        order = [start_star]
+        visited = {start_star}
+        current = start_star
+        while True:
+            dist = self._row(current)[0]
+            options = sorted((d, label) for label, d in dist.items() if label not in visited and vida - d > 0)
+            if not options:
+                break
+            d, current = options[0]
+            vida -= d
+            # Las estrellas de paso también quedan visitadas
+            for label in self._expand([order[-1], current])[1:]:
+                if label not in visited:
+                    visited.add(label)
+                    order.append(label)
+        return order
+
+    def _held_karp(self, start_star, candidates, vida, best_order):
+        """DP por subconjuntos: cost[mask][j] = menor vida gastada visitando mask y terminando en j."""
+        n = len(candidates)
+        inf = float('inf')
+        dist = [[self._dist(a, b) for b in candidates] for a in candidates]
+        cost = [[inf] * n for _ in range(1 << n)]
+        parent = [[-1] * n for _ in range(1 << n)]
+        for j, label in enumerate(candidates):
+            d = self._dist(start_star, label)
+            if vida - d > 0:
+                cost[1 << j][j] = d
+
+        best_mask, best_end, best_count = 0, -1, len(best_order) - 1
+        proven = True
+        for mask in range(1, 1 << n):
+            if self._timed_out():
+                print("Presupuesto de tiempo agotado; se devuelve la mejor ruta encontrada.")
+                proven = False
+                break
+            row = cost[mask]
+            count = bin(mask).count("1")
+            for j in range(n):
+                c = row[j]
+                if c == inf:
+                    continue
+                if count > best_count:
+                    best_mask, best_end, best_count = mask, j, count
+                dj = dist[j]
+                for k in range(n):
+                    if mask & (1 << k):
+                        continue
+                    nc = c + dj[k]
+                    nxt = mask | (1 << k)
+                    if vida - nc > 0 and nc < cost[nxt][k]:
+                        cost[nxt][k] = nc
+                        parent[nxt][k] = j
+        return self._order_from_dp(start_star, candidates, parent, best_mask, best_end, best_order), proven
+
+    def _order_from_dp(self, start_star, candidates, parent, mask, end, fallback):
+        if end < 0:
+            return fallback
+        order = []
+        while end >= 0:
+            order.append(candidates[end])
+            prev_end = parent[mask][end]
+            mask ^= 1 << end
+            end = prev_end
+        return [start_star] + order[::-1]
+
+    def _branch_and_bound(self, start_star, candidates, vida, best_order):
+        """
+        Búsqueda en profundidad sobre el orden de visita. Cota (admisible): para llegar a cada
+        estrella nueva hay que recorrer al menos su conexión más corta, así que a lo sumo se
+        visitan tantas alcanzables como quepan sumando esos mínimos en la vida restante. También
+        poda estados (posición, visitadas) ya alcanzados con menos gasto.
+        """
+        best = list(best_order)
+        seen = {}
+        candidate_set = set(candidates)
+        min_edge = {label: min((w for _, w in self.graph_manager.get_neighbors(label)), default=0.0)
+                    for label in candidates}
+        proven = True
+
+        # Pila explícita: (actual, visitadas, gastado, orden)
+        stack = [(start_star, frozenset(), 0.0, [start_star])]
+        expansions = 0
+        while stack:
+            expansions += 1
+            if expansions % 256 == 0 and self._timed_out():
+                print("Presupuesto de tiempo agotado; se devuelve la mejor ruta encontrada.")
+                proven = False
+                break
+            current, visited, spent, order = stack.pop()
+            if len(order) > len(best):
+                best = order
+                self._report(best)
+
+            remaining = vida - spent
+            dist = self._row(current)[0]
+            reachable = [(d, label) for label, d in dist.items()
+                         if label in candidate_set and label not in visited and remaining - d > 0]
+            if len(order) + len(reachable) <= len(best):
+                continue
+            bound, budget = len(order), remaining
+            for cost in sorted(min_edge[label] for _, label in reachable):
+                budget -= cost
+                if budget <= 0:
+                    break
+                bound += 1
+            if bound <= len(best):
+                continue
+
+            # Apilar al revés para explorar primero la más cercana
+            for d, label in sorted(reachable, reverse=True):
+                new_visited = visited | {label}
+                new_spent = spent + d
+                key = (label, new_visited)
+                if seen.get(key, float('inf')) <= new_spent:
+                    continue
+                if len(seen) < self.MAX_MEMO:
+                    seen[key] = new_spent
+                stack.append((label, new_visited, new_spent, order + [label]))
+        return best, proven
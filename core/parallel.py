@@ -0,0 +1,56 @@
+import contextlib
+import io
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from core.batch import run_scenario
+from core.route_calculator import RouteCalculator
+
+# Estado por proceso trabajador (se inicializa una sola vez en _init_worker)
+_worker_route_calculator = None
+
+
+def _init_worker(shm_name, size):
+    """Reconstruye el grafo en el proceso trabajador leyendo el bloque de memoria compartida."""
+    global _worker_route_calculator
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        graph_manager = pickle.loads(shm.buf[:size])
+    finally:
+        shm.close()
+    _worker_route_calculator = RouteCalculator(graph_manager)
+
+
+def _run_job(job):
+    start_star, donkey_config, mode = job
+    with contextlib.redirect_stdout(io.StringIO()):
+        return run_scenario(_worker_route_calculator, start_star, donkey_config, mode)
+
+
+class ParallelScenarioExecutor:
+    """
+    Ejecuta escenarios de ruta (estrella_inicio, config_burro, modo) en varios procesos.
+    El grafo se serializa una única vez en un bloque de memoria compartida y cada trabajador
+    lo carga al arrancar, en lugar de enviarlo con cada tarea.
+    """
+
+    def __init__(self, graph_manager, workers=None, chunksize=16):
+        self.graph_manager = graph_manager
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = max(1, chunksize)
+
+    def map(self, scenarios):
+        """Genera los resultados en el mismo orden en que se enviaron los escenarios."""
+        payload = pickle.dumps(self.graph_manager, protocol=pickle.HIGHEST_PROTOCOL)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(payload)))
+        try:
+            shm.buf[:len(payload)] = payload
+            with ProcessPoolExecutor(max_workers=self.workers,
+                                     initializer=_init_worker,
+                                     initargs=(shm.name, len(payload))) as executor:
+                yield from executor.map(_run_job, scenarios, chunksize=self.chunksize)
+        finally:
+            shm.close()
+            shm.unlink()
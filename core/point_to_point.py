@@ -0,0 +1,126 @@
+import heapq
+import math
+
+
+class PointToPointSearch:
+    """
+    Camino mínimo entre dos estrellas concretas (inicio -> destino), sobre las conexiones no
+    bloqueadas. Todas las variantes devuelven (camino, distancia, estrellas_expandidas), con
+    camino None y distancia inf si el destino no es alcanzable:
+
+    - dijkstra: Dijkstra que se detiene al asentar el destino (referencia).
+    - astar: A* con la heurística k * |um_pos - destino| (ver GraphManager.heuristic_scale).
+    - bidirectional: A* desde ambos extremos con potenciales promedio, que mantienen la
+      heurística consistente en los dos sentidos.
+
+    estrellas_expandidas cuenta las estrellas asentadas (sacadas de la cola y recorridas).
+    """
+
+    METHODS = ("astar", "bidirectional", "dijkstra")
+
+    def __init__(self, graph_manager):
+        self.graph_manager = graph_manager
+
+    def search(self, start, target, method="astar"):
+        if method not in self.METHODS:
+            raise ValueError(f"Método desconocido: '{method}'. Use uno de {self.METHODS}.")
+        if start not in self.graph_manager.stars or target not in self.graph_manager.stars:
+            return None, float('inf'), 0
+        if start == target:
+            return [start], 0.0, 0
+        return getattr(self, method)(start, target)
+
+    def _distance_to(self, target):
+        """Heurística h(v) = k * distancia euclídea (en cm del plano) de v a target."""
+        stars = self.graph_manager.stars
+        scale = self.graph_manager.heuristic_scale()
+        tx, ty = stars[target]["um_pos"]
+
+        def h(label):
+            x, y = stars[label]["um_pos"]
+            return scale * math.hypot(x - tx, y - ty)
+        return h
+
+    def dijkstra(self, start, target):
+        return self.astar(start, target, heuristic=lambda label: 0.0)
+
+    def astar(self, start, target, heuristic=None):
+        h = heuristic or self._distance_to(target)
+        get_neighbors = self.graph_manager.get_neighbors
+        inf = float('inf')
+        g = {start: 0.0}
+        prev = {start: None}
+        pq = [(h(start), start)]
+        closed = set()
+        while pq:
+            _, u = heapq.heappop(pq)
+            if u in closed:
+                continue
+            closed.add(u)
+            if u == target:
+                return _walk(prev, target)[::-1], g[target], len(closed)
+            gu = g[u]
+            for v, weight in get_neighbors(u):
+                ng = gu + weight
+                if ng < g.get(v, inf):
+                    g[v] = ng
+                    prev[v] = u
+                    heapq.heappush(pq, (ng + h(v), v))
+        return None, inf, len(closed)
+
+    def bidirectional(self, start, target):
+        """
+        Búsqueda desde start y desde target a la vez. Con potenciales promedio
+        p(v) = (h_target(v) - h_start(v)) / 2 en un sentido y -p(v) en el otro, ambas búsquedas
+        son Dijkstra sobre costos reducidos no negativos y se puede parar en cuanto la suma de los
+        topes de las dos colas alcanza la mejor distancia encontrada (mu).
+        """
+        h_target = self._distance_to(target)
+        h_start = self._distance_to(start)
+        potential = lambda label: (h_target(label) - h_start(label)) / 2
+        get_neighbors = self.graph_manager.get_neighbors
+        inf = float('inf')
+
+        # Índice 0: hacia adelante (desde start); 1: hacia atrás (desde target)
+        sign = (1, -1)
+        g = ({start: 0.0}, {target: 0.0})
+        prev = ({start: None}, {target: None})
+        pq = ([(potential(start), start)], [(-potential(target), target)])
+        closed = (set(), set())
+        mu, meeting = inf, None
+
+        while pq[0] and pq[1]:
+            if pq[0][0][0] + pq[1][0][0] >= mu:
+                break
+            side = 0 if len(pq[0]) <= len(pq[1]) else 1
+            _, u = heapq.heappop(pq[side])
+            if u in closed[side]:
+                continue
+            closed[side].add(u)
+            gu = g[side][u]
+            other_g = g[1 - side]
+            for v, weight in get_neighbors(u):
+                ng = gu + weight
+                if ng < g[side].get(v, inf):
+                    g[side][v] = ng
+                    prev[side][v] = u
+                    heapq.heappush(pq[side], (ng + sign[side] * potential(v), v))
+                if v in other_g and ng + other_g[v] < mu:
+                    mu = ng + other_g[v]
+                    meeting = (u, v) if side == 0 else (v, u)
+
+        expanded = len(closed[0]) + len(closed[1])
+        if meeting is None:
+            return None, inf, expanded
+        u, v = meeting
+        path = _walk(prev[0], u)[::-1] + _walk(prev[1], v)
+        return path, mu, expanded
+
+
+def _walk(prev, node):
+    """Estrellas desde node hasta la raíz siguiendo prev."""
+    path = []
+    while node is not None:
+        path.append(node)
+        node = prev[node]
+    return path
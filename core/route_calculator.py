@@ -1,40 +1,366 @@
-import copy
 import heapq
+import math
+import threading
+from collections import OrderedDict
 
-class RouteCalculator:
-    def __init__(self, graph_manager):
+from core.donkey import Donkey
+from core.max_stars_solver import MaxStarsSolver, RouteCancelled
+from core.point_to_point import PointToPointSearch
+
+
+class _ShortestPathTree:
+    """
+    Árbol de caminos mínimos desde una estrella, calculado de forma perezosa: Dijkstra avanza sólo
+    hasta donde lo pida quien lo recorre (groups) y el avance queda guardado, así que un árbol en
+    caché se reutiliza y se completa (full) sin repetir la búsqueda.
+
+    Un árbol completo se puede reparar cuando se bloquea o desbloquea una conexión (edge_blocked,
+    edge_unblocked) en lugar de recalcularlo: al estilo de Ramalingam-Reps, sólo se rehacen las
+    estrellas cuyo camino mínimo cambia. Las distancias quedan iguales a las de un Dijkstra nuevo;
+    entre caminos de igual largo el predecesor elegido puede ser otro.
+
+    Un mismo árbol del caché puede recorrerse desde el hilo de la interfaz y desde un RouteWorker:
+    cada paso de Dijkstra se hace con self._lock tomado.
+    """
+
+    def __init__(self, graph_manager, source):
         self.graph_manager = graph_manager
+        self.dist = {source: 0.0}
+        self.prev = {source: None}
+        self._pq = [(0.0, source)]
+        self._settled = []  # (distancia, estrella) en orden de asentamiento
+        self._children = None  # estrella -> hijos en el árbol; se arma en la primera reparación
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_rows(cls, dist, prev, settled):
+        """
+        Árbol ya completo a partir de una fila de la matriz de caminos mínimos y de su orden de
+        asentamiento (ver AllPairsShortestPaths.sorted_row); se comparten, no se copian.
+        """
+        tree = cls.__new__(cls)
+        tree.dist, tree.prev, tree._pq = dist, prev, []
+        tree._settled = settled
+        tree._children = None
+        tree._lock = threading.Lock()
+        return tree
+
+    @property
+    def complete(self):
+        return not self._pq
+
+    def _settle_next(self):
+        """Asienta la siguiente estrella; devuelve False cuando ya no quedan."""
+        with self._lock:
+            dist, prev, pq = self.dist, self.prev, self._pq
+            while pq:
+                d, u = heapq.heappop(pq)
+                if d > dist[u]:
+                    continue
+                self._settled.append((d, u))
+                for v, weight in self.graph_manager.get_neighbors(u):
+                    nd = d + weight
+                    if nd < dist.get(v, float('inf')):
+                        dist[v] = nd
+                        prev[v] = u
+                        heapq.heappush(pq, (nd, v))
+                return True
+            return False
 
-    def calculate_max_stars_route(self, start_star, donkey):
+    def groups(self):
+        """
+        Entrega, en orden de distancia, grupos de estrellas asentadas con la misma distancia
+        (ordenados por etiqueta). Un grupo sale cuando aparece una distancia mayor, es decir,
+        cuando sus caminos ya son definitivos.
+        """
+        settled = self._settled
+        i = 0
+        group, group_dist = [], None
+        while i < len(settled) or self._settle_next():
+            d, u = settled[i]
+            i += 1
+            if group and d != group_dist:
+                yield sorted(group)
+                group = []
+            group_dist = d
+            group.append(u)
+        if group:
+            yield sorted(group)
+
+    def full(self):
+        """Completa el árbol y devuelve (dist, prev); no modificar los dicts devueltos."""
+        while self._settle_next():
+            pass
+        return self.dist, self.prev
+
+    # ----------------------------------------------------
+    #        REPARACIÓN INCREMENTAL (sólo árboles completos)
+    # ----------------------------------------------------
+    def _child_index(self):
+        if self._children is None:
+            children = {}
+            for node, parent in self.prev.items():
+                if parent is not None:
+                    children.setdefault(parent, set()).add(node)
+            self._children = children
+        return self._children
+
+    def _attach(self, node, parent, d):
+        children = self._child_index()
+        old_parent = self.prev.get(node)
+        if old_parent is not None:
+            children[old_parent].discard(node)
+        self.dist[node] = d
+        self.prev[node] = parent
+        children.setdefault(parent, set()).add(node)
+
+    def edge_blocked(self, a, b):
+        """
+        La conexión a-b dejó de estar disponible. Si el árbol no la usa no cambia nada; si la usa,
+        sólo el subárbol que colgaba de ella pierde sus caminos: se separa y se vuelve a unir con
+        un Dijkstra limitado a esas estrellas, partiendo de sus vecinas fuera del subárbol.
+        Devuelve cuántas estrellas se rehicieron.
+        """
+        dist, prev = self.dist, self.prev
+        if prev.get(b, False) == a:
+            root = b
+        elif prev.get(a, False) == b:
+            root = a
+        else:
+            return 0
+
+        children = self._child_index()
+        children[prev[root]].discard(root)
+        affected, stack = [], [root]
+        while stack:
+            node = stack.pop()
+            affected.append(node)
+            stack.extend(children.pop(node, ()))
+        for node in affected:
+            del dist[node]
+            del prev[node]
+
+        # Mejor entrada desde el resto del árbol (que no cambia: quitar una conexión no acorta nada)
+        inf = float('inf')
+        best, parent, pq = {}, {}, []
+        for node in affected:
+            for neighbor, weight in self.graph_manager.get_neighbors(node):
+                nd = dist.get(neighbor, inf) + weight
+                if nd < best.get(node, inf):
+                    best[node], parent[node] = nd, neighbor
+            if node in best:
+                heapq.heappush(pq, (best[node], node))
+        pending = set(affected)
+        while pq:
+            d, node = heapq.heappop(pq)
+            if node not in pending or d > best[node]:
+                continue
+            pending.discard(node)
+            self._attach(node, parent[node], d)
+            for neighbor, weight in self.graph_manager.get_neighbors(node):
+                nd = d + weight
+                if neighbor in pending and nd < best.get(neighbor, inf):
+                    best[neighbor], parent[neighbor] = nd, node
+                    heapq.heappush(pq, (nd, neighbor))
+        # Las que quedaron en 'pending' ya no son alcanzables
+        self._settled = sorted((d, label) for label, d in dist.items())
+        return len(affected)
+
+    def edge_unblocked(self, a, b, weight):
+        """
+        La conexión a-b (de largo weight) volvió a estar disponible. Sólo puede acortar caminos que
+        pasen por ella: se propaga la mejora desde el extremo que gana, sin tocar el resto.
+        Devuelve cuántas estrellas cambiaron.
+        """
+        inf = float('inf')
+        dist = self.dist
+        for u, v in ((a, b), (b, a)):
+            if u not in dist or dist[u] + weight >= dist.get(v, inf):
+                continue
+            changed = 0
+            pq = [(dist[u] + weight, v, u)]
+            while pq:
+                d, node, parent = heapq.heappop(pq)
+                if d >= dist.get(node, inf):
+                    continue
+                self._attach(node, parent, d)
+                changed += 1
+                for neighbor, w in self.graph_manager.get_neighbors(node):
+                    if d + w < dist.get(neighbor, inf):
+                        heapq.heappush(pq, (d + w, neighbor, node))
+            self._settled = sorted((d, label) for label, d in dist.items())
+            return changed  # si mejora en un sentido, en el otro no puede
+        return 0
+
+
+class RouteCalculator:
+    CACHE_SIZE = 256  # árboles de caminos mínimos guardados (LRU)
+
+    def __init__(self, graph_manager, cache_size=CACHE_SIZE):
+        self.graph_manager = graph_manager
+        self.cache_size = cache_size
+        self._tree_cache = OrderedDict()  # (estrella, generación del grafo) -> _ShortestPathTree
+        # El caché se usa desde el hilo de la interfaz (bloqueos, re-planificación) y desde el
+        # RouteWorker en curso: toda operación sobre él se hace con este lock tomado
+        self._cache_lock = threading.RLock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def shortest_path_tree(self, source):
+        """
+        Árbol de caminos mínimos desde source. Se guarda en un caché LRU por (estrella, generación
+        del grafo): mientras el grafo no cambie, volver a planificar desde la misma estrella (otra
+        vez, con otro burro o en el otro modo) no repite la búsqueda.
+        """
+        all_pairs = getattr(self.graph_manager, 'all_pairs', None)
+        if all_pairs is not None:
+            return _ShortestPathTree.from_rows(*all_pairs.sorted_row(source))
+
+        key = (source, getattr(self.graph_manager, 'generation', 0))
+        with self._cache_lock:
+            tree = self._tree_cache.get(key)
+            if tree is not None:
+                self.cache_hits += 1
+                self._tree_cache.move_to_end(key)
+                return tree
+            self.cache_misses += 1
+            if self._tree_cache and next(reversed(self._tree_cache))[1] != key[1]:
+                self._tree_cache.clear()  # el grafo cambió: todo lo guardado quedó obsoleto
+            tree = self._tree_cache[key] = _ShortestPathTree(self.graph_manager, source)
+            while len(self._tree_cache) > self.cache_size:
+                self._tree_cache.popitem(last=False)
+            return tree
+
+    def connection_blocked(self, star1, star2):
+        """
+        Avisar tras un GraphManager.block_connection exitoso: repara los árboles completos del
+        caché (ver _ShortestPathTree.edge_blocked) y los pasa a la nueva generación del grafo.
+        """
+        self._repair_trees(lambda tree: tree.edge_blocked(star1, star2))
+
+    def connection_unblocked(self, star1, star2):
+        """Como connection_blocked, tras un GraphManager.unblock_connection exitoso."""
+        weight = self.graph_manager.get_distance(star1, star2)
+        self._repair_trees(lambda tree: tree.edge_unblocked(star1, star2, weight))
+
+    def _repair_trees(self, repair):
+        generation = getattr(self.graph_manager, 'generation', 0)
+        with self._cache_lock:
+            repaired = OrderedDict()
+            for (source, tree_generation), tree in self._tree_cache.items():
+                # Sólo se puede reparar un árbol completo al que le falte exactamente este cambio
+                if tree_generation == generation - 1 and tree.complete:
+                    repair(tree)
+                    repaired[(source, generation)] = tree
+            self._tree_cache = repaired
+
+    def replan_route(self, route, index):
+        """
+        Ruta restante desde route[index] (la estrella donde está el burro) tras bloquear conexiones.
+        Conserva el orden de las estrellas pendientes y reemplaza cada tramo bloqueado por el camino
+        mínimo actual; con connection_blocked los árboles ya están reparados, así que no se repite
+        ningún Dijkstra completo. Si una estrella quedó inalcanzable, la ruta termina antes.
+        """
+        new_route = [route[index]]
+        for star in route[index + 1:]:
+            current = new_route[-1]
+            if not self.graph_manager.is_connection_blocked(current, star):
+                new_route.append(star)
+                continue
+            prev = self.shortest_path_tree(current).full()[1]
+            if star not in prev:
+                print(f"'{star}' quedó inalcanzable desde '{current}'. La ruta termina ahí.")
+                break
+            path = []
+            node = star
+            while node != current:
+                path.append(node)
+                node = prev[node]
+            new_route.extend(reversed(path))
+        return new_route
+
+    def segment_distance(self, a, b):
+        """
+        Largo del tramo a -> b tal como lo recorre el burro: el de la conexión (aunque se haya
+        bloqueado con el burro ya en camino) o, si no hay conexión, la distancia euclídea / 4.
+        """
+        distance = self.graph_manager.get_distance(a, b)
+        if distance == float('inf'):
+            distance = dict(self.graph_manager.get_neighbors(a, include_blocked=True)).get(b, float('inf'))
+        if distance == float('inf'):
+            pa = self.graph_manager.get_star_pos(a)
+            pb = self.graph_manager.get_star_pos(b)
+            distance = math.sqrt((pa[0] - pb[0]) ** 2 + (pa[1] - pb[1]) ** 2) / 4.0
+        return distance
+
+    def simulate_route(self, route, donkey):
+        """
+        Recorre route con una copia de donkey (sin sus logs): procesa la estrella inicial, como
+        calculate_economical_route, y por cada tramo viaja y procesa la estrella de llegada, como
+        la animación, hasta terminar o morir. Devuelve (estrellas_recorridas, food_log,
+        research_log) en el formato de calculate_economical_route.
+        """
+        if not route:
+            return [], [], []
+        sim_donkey = Donkey.desde_estado(donkey)
+        effects = self.graph_manager.star_effects
+        sim_donkey.procesar_estrella(route[0], effects.effect(route[0]))
+        visited = [route[0]]
+        for a, b in zip(route, route[1:]):
+            sim_donkey.viajar(self.segment_distance(a, b))
+            sim_donkey.procesar_estrella(b, effects.effect(b))
+            visited.append(b)
+            if sim_donkey.vida_restante <= 0 or sim_donkey.energia <= 0:
+                break
+        return list(dict.fromkeys(visited)), sim_donkey.food_consumption_log, sim_donkey.research_log
+
+    def cache_stats(self):
+        """Aciertos, fallos y ocupación del caché de árboles de caminos mínimos."""
+        with self._cache_lock:
+            total = self.cache_hits + self.cache_misses
+            return {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "hit_rate": self.cache_hits / total if total else 0.0,
+                "size": len(self._tree_cache),
+                "capacity": self.cache_size,
+            }
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._tree_cache.clear()
+            self.cache_hits = 0
+            self.cache_misses = 0
+
+    @staticmethod
+    def _check_cancelled(cancelled):
+        if cancelled is not None and cancelled():
+            raise RouteCancelled("Cálculo de ruta cancelado.")
+
+    def calculate_max_stars_route(self, start_star, donkey, progress=None, cancelled=None):
         """
         Utiliza Dijkstra para encontrar la estrella no visitada más cercana en términos de coste de ruta
         y simula el viaje para asegurar que el burro pueda sobrevivir.
+
+        progress(ruta_parcial) se llama cada vez que la ruta crece (la lista no debe modificarse);
+        si cancelled() devuelve True el cálculo se interrumpe con RouteCancelled.
         """
-        sim_donkey = copy.deepcopy(donkey) # Usamos una copia para no alterar el original
+        sim_donkey = donkey.obtener_estado() # Estado compacto (sin logs) para no alterar el original
         current_star_label = start_star
         visited_stars = {current_star_label}
         route = [current_star_label]
 
         print(f"Iniciando cálculo 'Die Hard' (Dijkstra) desde '{start_star}'. Vida inicial: {sim_donkey.vida_restante}")
 
-        def dijkstra(start_node):
-            dist = {node: float('inf') for node in self.graph_manager.stars}
-            dist[start_node] = 0
-            prev = {node: None for node in self.graph_manager.stars}
-            pq = [(0, start_node)]
-
-            while pq:
-                d, u = heapq.heappop(pq)
-
-                if d > dist[u]:
-                    continue
-
-                for v, weight in self.graph_manager.get_neighbors(u):
-                    if dist[u] + weight < dist[v]:
-                        dist[v] = dist[u] + weight
-                        prev[v] = u
-                        heapq.heappush(pq, (dist[v], v))
-            return dist, prev
+        def dijkstra_por_niveles(start_node):
+            """
+            Dijkstra perezoso (ver _ShortestPathTree): entrega, en orden de distancia, grupos de
+            estrellas con la misma distancia junto con los predecesores. Así la búsqueda se detiene
+            en cuanto aparece un destino alcanzable, sin recorrer todo el grafo.
+            """
+            tree = self.shortest_path_tree(start_node)
+            for group in tree.groups():
+                yield group, tree.prev
 
         def reconstruct_path(prev_nodes, target_node):
             path = []
@@ -46,36 +372,32 @@ class RouteCalculator:
             return path if path and path[0] == current_star_label else None
 
         while True:
-            distances, predecessors = dijkstra(current_star_label)
-
-            # Encontrar candidatos: estrellas no visitadas y alcanzables
-            candidates = [(dist, node) for node, dist in distances.items() if node not in visited_stars and dist != float('inf')]
-            candidates.sort()
+            self._check_cancelled(cancelled)
+            # Recorrer candidatos (no visitados y alcanzables) en orden de coste de ruta
+            has_candidates = False
+            path_to_target = None
+            for group, predecessors in dijkstra_por_niveles(current_star_label):
+                self._check_cancelled(cancelled)
+                for target_node in group:
+                    if target_node in visited_stars:
+                        continue
+                    has_candidates = True
+                    path = reconstruct_path(predecessors, target_node)
+                    if not path or len(path) < 2:
+                        continue
+
+                    # Comprobar si el burro sobrevive al viaje (solo cuenta la vida restante)
+                    tramos = [self.graph_manager.get_distance(path[i], path[i+1]) for i in range(len(path) - 1)]
+                    if sim_donkey.puede_recorrer(tramos, considerar_energia=False):
+                        path_to_target = path
+                        break # Encontramos el mejor candidato posible
+                if path_to_target:
+                    break
 
-            if not candidates:
+            if not has_candidates:
                 print("No hay más estrellas alcanzables. Fin de la ruta.")
                 break
 
-            path_to_target = None
-            for _, target_node in candidates:
-                path = reconstruct_path(predecessors, target_node)
-                if not path or len(path) < 2:
-                    continue
-
-                # Simular el viaje con una copia para ver si es posible
-                temp_donkey = copy.deepcopy(sim_donkey)
-                can_survive = True
-                for i in range(len(path) - 1):
-                    trip_dist = self.graph_manager.get_distance(path[i], path[i+1])
-                    if temp_donkey.vida_restante <= trip_dist:
-                        can_survive = False
-                        break
-                    temp_donkey.viajar(trip_dist)
-                
-                if can_survive:
-                    path_to_target = path
-                    break # Encontramos el mejor candidato posible
-
             if not path_to_target:
                 print("No se puede alcanzar ninguna estrella restante sin morir. Fin de la ruta.")
                 break
@@ -91,15 +413,54 @@ class RouteCalculator:
                 print(f"Viajando a '{next_step_star}' (distancia: {trip_dist}). Vida restante: {sim_donkey.vida_restante}")
 
             current_star_label = path_to_target[-1]
+            if progress is not None:
+                progress(route)
 
         return list(dict.fromkeys(route)), len(list(dict.fromkeys(route)))
 
-    def calculate_economical_route(self, start_star_label, donkey):
+    def shortest_route(self, start_star, target_star, method="astar"):
+        """
+        Camino mínimo de start_star a target_star (ver PointToPointSearch). method: "astar",
+        "bidirectional", "dijkstra", "ch" (jerarquía de contracción, requiere
+        graph_manager.enable_contraction_hierarchy) o "constellation" (índice por constelaciones,
+        requiere graph_manager.enable_constellation_routing). Devuelve (camino, distancia,
+        estrellas_expandidas); camino es None si target_star no es alcanzable.
+        """
+        if method == "ch":
+            hierarchy = self.graph_manager.contraction_hierarchy
+            if hierarchy is None:
+                raise ValueError("La jerarquía de contracción no está habilitada (ver enable_contraction_hierarchy).")
+            path, distance, expanded = hierarchy.query(start_star, target_star)
+        elif method == "constellation":
+            router = self.graph_manager.constellation_router
+            if router is None:
+                raise ValueError("El índice por constelaciones no está habilitado (ver enable_constellation_routing).")
+            path, distance, expanded = router.query(start_star, target_star)
+        else:
+            path, distance, expanded = PointToPointSearch(self.graph_manager).search(start_star, target_star, method)
+        print(f"Camino '{start_star}' -> '{target_star}' ({method}): distancia {distance}, "
+              f"{expanded} estrellas expandidas.")
+        return path, distance, expanded
+
+    def calculate_optimal_max_stars_route(self, start_star, donkey, time_budget=2.0, progress=None, cancelled=None):
+        """
+        Variante exacta de calculate_max_stars_route (ver MaxStarsSolver). Devuelve
+        (ruta, estrellas_visitadas, es_optima); si se agota time_budget (segundos) la ruta es
+        la mejor encontrada hasta ese momento y es_optima es False. progress recibe cada mejora.
+        """
+        vida = donkey.obtener_estado().vida_restante
+        print(f"Iniciando cálculo 'Die Hard' exacto desde '{start_star}'. Vida inicial: {vida}")
+        solver = MaxStarsSolver(self.graph_manager, time_budget, progress=progress, cancelled=cancelled)
+        route, stars_visited, optimal = solver.solve(start_star, vida)
+        print(f"Ruta exacta: {stars_visited} estrellas ({'óptima' if optimal else 'mejor encontrada'}).")
+        return route, stars_visited, optimal
+
+    def calculate_economical_route(self, start_star_label, donkey, progress=None, cancelled=None):
         """
         Usa Dijkstra para encontrar caminos de coste mínimo desde la posición actual.
-
+        progress y cancelled: como en calculate_max_stars_route.
         """
-        sim_donkey = copy.deepcopy(donkey)
+        sim_donkey = donkey.clonar()
         current = start_star_label
         visited = {current}
         route = [current]
@@ -110,28 +471,23 @@ class RouteCalculator:
 
         # Procesar la estrella inicial
         try:
-            initial_star_data = self.graph_manager.stars[current]
-            sim_donkey.procesar_estrella(current, initial_star_data)
+            sim_donkey.procesar_estrella(current, self.graph_manager.star_effects.effect(current))
         except Exception:
             pass
 
         print(f"Iniciando cálculo 'Económico' (Dijkstra) desde '{start_star_label}'. Vida: {getattr(sim_donkey, 'vida_restante', 0):.1f}, Energía: {getattr(sim_donkey, 'energia', 0):.1f}")
 
         def dijkstra(start):
-            dist = {start: 0.0}
-            prev = {}
-            pq = [(0.0, start)]
-            while pq:
-                d_u, u = heapq.heappop(pq)
-                if d_u > dist.get(u, float('inf')):
-                    continue
-                for v, w in self.graph_manager.get_neighbors(u):
-                    nd = d_u + float(w)
-                    if nd < dist.get(v, float('inf')):
-                        dist[v] = nd
-                        prev[v] = u
-                        heapq.heappush(pq, (nd, v))
-            return dist, prev
+            return self.shortest_path_tree(start).full()
+
+        def edge_distance(a, b):
+            edge_dist = self.graph_manager.get_distance(a, b)
+            if edge_dist == float('inf'):
+                # fallback: distancia euclídea/4 para no bloquear la simulación
+                pa = self.graph_manager.get_star_pos(a)
+                pb = self.graph_manager.get_star_pos(b)
+                edge_dist = (((pa[0]-pb[0])**2 + (pa[1]-pb[1])**2) ** 0.5) / 4.0
+            return edge_dist
 
         def reconstruct_path(prev, src, tgt):
             if tgt not in prev and tgt != src:
@@ -147,6 +503,7 @@ class RouteCalculator:
             return path
 
         while True:
+            self._check_cancelled(cancelled)
             # calcular distancias mínimas desde la estrella actual
             dist, prev = dijkstra(current)
 
@@ -163,22 +520,9 @@ class RouteCalculator:
                 path = reconstruct_path(prev, current, node)
                 if path is None:
                     continue
-                # probar simular el viaje paso a paso con una copia temporal
-                temp = copy.deepcopy(sim_donkey)
-                can_reach = True
-                for i in range(1, len(path)):
-                    a = path[i-1]; b = path[i]
-                    edge_dist = self.graph_manager.get_distance(a, b)
-                    if edge_dist == float('inf'):
-                        # fallback: distancia euclídea/4 para no bloquear la simulación
-                        pa = self.graph_manager.get_star_pos(a)
-                        pb = self.graph_manager.get_star_pos(b)
-                        edge_dist = (((pa[0]-pb[0])**2 + (pa[1]-pb[1])**2) ** 0.5) / 4.0
-                    temp.viajar(edge_dist)
-                    if getattr(temp, 'vida_restante', 1) <= 0 or getattr(temp, 'energia', 1) <= 0:
-                        can_reach = False
-                        break
-                if can_reach:
+                # comprobar si el burro llega con vida y energía, sin simular sobre una copia
+                tramos = [edge_distance(path[i-1], path[i]) for i in range(1, len(path))]
+                if sim_donkey.puede_recorrer(tramos):
                     next_node = node
                     next_path = path
                     break
@@ -190,12 +534,7 @@ class RouteCalculator:
             # mover sim_donkey a lo largo de next_path, aplicando viajar y procesar_estrella
             for i in range(1, len(next_path)):
                 a = next_path[i-1]; b = next_path[i]
-                edge_dist = self.graph_manager.get_distance(a, b)
-                if edge_dist == float('inf'):
-                    pa = self.graph_manager.get_star_pos(a)
-                    pb = self.graph_manager.get_star_pos(b)
-                    edge_dist = (((pa[0]-pb[0])**2 + (pa[1]-pb[1])**2) ** 0.5) / 4.0
-                sim_donkey.viajar(edge_dist)
+                sim_donkey.viajar(edge_distance(a, b))
                 if b not in route:
                     route.append(b)
                 if getattr(sim_donkey, 'vida_restante', 1) <= 0 or getattr(sim_donkey, 'energia', 1) <= 0:
@@ -204,13 +543,14 @@ class RouteCalculator:
 
             # al llegar a next_node, procesar la estrella
             try:
-                star_info = self.graph_manager.stars.get(next_node, {})
-                sim_donkey.procesar_estrella(next_node, star_info)
+                sim_donkey.procesar_estrella(next_node, self.graph_manager.star_effects.effect(next_node))
             except Exception:
                 pass
 
             visited.add(next_node)
             current = next_node
+            if progress is not None:
+                progress(route)
 
             # condición de parada si ya visitó todas las estrellas
             if len(visited) >= len(self.graph_manager.stars):
@@ -0,0 +1,158 @@
+import math
+
+
+class SpatialIndex:
+    """
+    Índice espacial de grilla uniforme sobre las posiciones en píxeles de las estrellas y las
+    cajas envolventes de las conexiones. Responde consultas por rectángulo ("qué estrellas /
+    conexiones caen aquí") y de estrella más cercana visitando sólo las celdas cercanas.
+    """
+
+    MAX_EDGE_CELLS = 64  # más celdas que esto por conexión => va a long_edges
+
+    def __init__(self, cell_size=64.0):
+        self.cell_size = float(cell_size)
+        self.star_cells = {}   # (cx, cy) -> [orden de inserción de la estrella]
+        self.edge_cells = {}   # (cx, cy) -> [índice de la conexión]
+        self.star_labels = []
+        self.star_points = []
+        self.edges = []        # (a, b, distancia)
+        self.edge_boxes = []   # (x0, y0, x1, y1)
+        self.long_edges = []   # conexiones que cruzan demasiadas celdas: se revisan siempre
+        self.bounds = None     # celdas extremas ocupadas (cx0, cy0, cx1, cy1)
+
+    @classmethod
+    def from_graph(cls, graph, cell_size=None):
+        """Construye el índice desde un GraphManager (o cualquier grafo con su misma API)."""
+        positions = [(label, data['pos']) for label, data in graph.stars.items()]
+        if cell_size is None:
+            cell_size = cls._suggest_cell_size([pos for _, pos in positions])
+        index = cls(cell_size)
+        for label, (x, y) in positions:
+            index.add_star(label, x, y)
+        for a, b, dist in sorted(graph.connections):
+            if a in graph.stars and b in graph.stars:
+                (x1, y1), (x2, y2) = graph.stars[a]['pos'], graph.stars[b]['pos']
+                index.add_edge(a, b, dist, x1, y1, x2, y2)
+        return index
+
+    @staticmethod
+    def _suggest_cell_size(points):
+        """Celdas con ~2 estrellas en promedio (mínimo 16 px)."""
+        if len(points) < 2:
+            return 64.0
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        area = max(1.0, (max(xs) - min(xs)) * (max(ys) - min(ys)))
+        return max(16.0, math.sqrt(2.0 * area / len(points)))
+
+    def _cell(self, x, y):
+        return (int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size)))
+
+    def _cell_range(self, x0, y0, x1, y1):
+        cx0, cy0 = self._cell(min(x0, x1), min(y0, y1))
+        cx1, cy1 = self._cell(max(x0, x1), max(y0, y1))
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                yield (cx, cy)
+
+    def _occupied_cell_range(self, x0, y0, x1, y1):
+        """
+        Como _cell_range, pero recortado a las celdas extremas ocupadas (bounds): con poco zoom
+        el rectángulo visible puede cubrir miles de celdas vacías alrededor del mapa.
+        """
+        if self.bounds is None:
+            return
+        gx0, gy0, gx1, gy1 = self.bounds
+        cx0, cy0 = self._cell(min(x0, x1), min(y0, y1))
+        cx1, cy1 = self._cell(max(x0, x1), max(y0, y1))
+        if cx1 < gx0 or cx0 > gx1 or cy1 < gy0 or cy0 > gy1:
+            return
+        for cx in range(max(cx0, gx0), min(cx1, gx1) + 1):
+            for cy in range(max(cy0, gy0), min(cy1, gy1) + 1):
+                yield (cx, cy)
+
+    def add_star(self, label, x, y):
+        idx = len(self.star_labels)
+        self.star_labels.append(label)
+        self.star_points.append((x, y))
+        cell = self._cell(x, y)
+        self.star_cells.setdefault(cell, []).append(idx)
+        self._extend_bounds(cell)
+
+    def _extend_bounds(self, cell):
+        if self.bounds is None:
+            self.bounds = (cell[0], cell[1], cell[0], cell[1])
+        else:
+            gx0, gy0, gx1, gy1 = self.bounds
+            self.bounds = (min(gx0, cell[0]), min(gy0, cell[1]), max(gx1, cell[0]), max(gy1, cell[1]))
+
+    def add_edge(self, a, b, dist, x1, y1, x2, y2):
+        idx = len(self.edges)
+        self.edges.append((a, b, dist))
+        self.edge_boxes.append((min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)))
+        cx0, cy0 = self._cell(min(x1, x2), min(y1, y2))
+        cx1, cy1 = self._cell(max(x1, x2), max(y1, y2))
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > self.MAX_EDGE_CELLS:
+            self.long_edges.append(idx)
+            return
+        for cell in self._cell_range(x1, y1, x2, y2):
+            self.edge_cells.setdefault(cell, []).append(idx)
+        # Normalmente ya las cubren sus estrellas, pero una conexión puede indexarse sin ellas
+        self._extend_bounds((cx0, cy0))
+        self._extend_bounds((cx1, cy1))
+
+    def stars_in_rect(self, x0, y0, x1, y1):
+        """Etiquetas de las estrellas dentro del rectángulo, en orden de inserción (orden de dibujo)."""
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        found = []
+        for cell in self._occupied_cell_range(x0, y0, x1, y1):
+            for idx in self.star_cells.get(cell, ()):
+                x, y = self.star_points[idx]
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    found.append(idx)
+        found.sort()
+        return [self.star_labels[i] for i in found]
+
+    def edges_in_rect(self, x0, y0, x1, y1):
+        """Conexiones (a, b, distancia) cuya caja envolvente toca el rectángulo."""
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        found = set()
+        boxes = self.edge_boxes
+        for cell in self._occupied_cell_range(x0, y0, x1, y1):
+            for idx in self.edge_cells.get(cell, ()):
+                bx0, by0, bx1, by1 = boxes[idx]
+                if bx0 <= x1 and bx1 >= x0 and by0 <= y1 and by1 >= y0:
+                    found.add(idx)
+        for idx in self.long_edges:
+            bx0, by0, bx1, by1 = boxes[idx]
+            if bx0 <= x1 and bx1 >= x0 and by0 <= y1 and by1 >= y0:
+                found.add(idx)
+        return [self.edges[i] for i in sorted(found)]
+
+    def nearest_star(self, x, y, max_dist=float('inf')):
+        """Estrella más cercana a (x, y) a no más de max_dist píxeles, o None."""
+        if not self.star_labels:
+            return None
+        cx, cy = self._cell(x, y)
+        gx0, gy0, gx1, gy1 = self.bounds
+        last_ring = max(abs(cx - gx0), abs(cx - gx1), abs(cy - gy0), abs(cy - gy1))
+        best_idx, best_d2 = None, max_dist * max_dist
+
+        # Recorrer anillos de celdas alrededor de (cx, cy); lo que está en el anillo r o más allá
+        # queda a al menos (r - 1) * cell_size, así que se puede parar en cuanto el mejor sea más cercano
+        for ring in range(last_ring + 1):
+            gap = max(0, ring - 1) * self.cell_size
+            if gap > max_dist or (best_idx is not None and best_d2 < gap * gap):
+                break
+            for gx in range(cx - ring, cx + ring + 1):
+                step = 1 if abs(gx - cx) == ring else 2 * ring
+                for gy in range(cy - ring, cy + ring + 1, max(1, step)):
+                    for idx in self.star_cells.get((gx, gy), ()):
+                        sx, sy = self.star_points[idx]
+                        d2 = (sx - x) ** 2 + (sy - y) ** 2
+                        if d2 < best_d2 or (d2 == best_d2 and (best_idx is None or idx < best_idx)):
+                            best_idx, best_d2 = idx, d2
+        return self.star_labels[best_idx] if best_idx is not None else None
@@ -0,0 +1,27 @@
+from core.donkey import StarEffect
+
+
+class StarEffectTable:
+    """
+    StarEffect de cada estrella del grafo, derivado de graph_manager.stars la primera vez que se
+    pide y reutilizado por la animación y los simuladores en cada llegada a la estrella.
+    Si se editan los datos de una estrella hay que llamar a refresh(label).
+    """
+
+    def __init__(self, graph_manager):
+        self.graph_manager = graph_manager
+        self._effects = {}
+
+    def effect(self, star_label):
+        efecto = self._effects.get(star_label)
+        if efecto is None:
+            efecto = StarEffect.desde_datos(self.graph_manager.stars.get(star_label, {}))
+            self._effects[star_label] = efecto
+        return efecto
+
+    def refresh(self, star_label=None):
+        """Descarta el registro de una estrella (o de todas) para volver a derivarlo de sus datos."""
+        if star_label is None:
+            self._effects.clear()
+        else:
+            self._effects.pop(star_label, None)
@@ -1,14 +1,16 @@
 import sys
 import math
+import time
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QPushButton, QVBoxLayout, QWidget,
     QFileDialog, QHBoxLayout, QGroupBox, QFormLayout,
     QComboBox, QLabel, QSpinBox, QMessageBox
 )
-from PyQt6.QtCore import QTimer, QUrl, Qt, QDir
+from PyQt6.QtCore import QTimer, QUrl, Qt, QDir, QThreadPool
 from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
 from core.graph_manager import GraphManager
 from ui.graph_widget import GraphWidget
+from ui.route_worker import RouteWorker
 from core.donkey import Donkey
 from core.route_calculator import RouteCalculator
 
@@ -21,12 +23,16 @@ class MainWindow(QMainWindow):
 
         self.graph_manager = GraphManager()
         self.route_calculator = RouteCalculator(self.graph_manager)
+        # Cálculo de rutas en segundo plano (uno a la vez)
+        self.thread_pool = QThreadPool.globalInstance()
+        self.route_job = None
 
         # --- Animación ---
         self.animation_timer = QTimer(self)
         self.animation_timer.timeout.connect(self.animate_step)
         self.animation_path = []
         self.animation_step_index = 0
+        self.animation_start_donkey = None
         self.current_donkey = None
         self.current_route_report_data = None # Para guardar datos del reporte
 
@@ -90,11 +96,21 @@ class MainWindow(QMainWindow):
 
         self.calc_die_hard_button = QPushButton("Calcular Ruta de Resistencia")
         self.calc_die_hard_button.clicked.connect(self.calculate_die_hard_route)
+        self.calc_optimal_button = QPushButton("Calcular Ruta de Resistencia Óptima")
+        self.calc_optimal_button.clicked.connect(self.calculate_optimal_die_hard_route)
         self.calc_economical_button = QPushButton("Calcular Ruta Económica")
         self.calc_economical_button.clicked.connect(self.calculate_economical_route)
 
         sim_layout.addWidget(self.calc_die_hard_button)
+        sim_layout.addWidget(self.calc_optimal_button)
         sim_layout.addWidget(self.calc_economical_button)
+
+        self.route_status_label = QLabel("")
+        self.cancel_route_button = QPushButton("Cancelar Cálculo")
+        self.cancel_route_button.clicked.connect(self.cancel_route_job)
+        self.cancel_route_button.setEnabled(False)
+        sim_layout.addWidget(self.route_status_label)
+        sim_layout.addWidget(self.cancel_route_button)
         sim_group.setLayout(sim_layout)
         left_layout.addWidget(sim_group)
 
@@ -163,6 +179,7 @@ class MainWindow(QMainWindow):
 
         # --- Widget del Grafo ---
         self.graph_widget = GraphWidget(self.graph_manager)
+        self.graph_widget.star_clicked.connect(self.on_star_clicked)
 
         main_layout.addWidget(left_panel)
         main_layout.addWidget(self.graph_widget)
@@ -188,10 +205,12 @@ class MainWindow(QMainWindow):
         )
         if file_path:
             try:
-                self.graph_manager.load_from_json(file_path)
+                # Usa el grafo compilado (en la carpeta de cachés del usuario) si sigue vigente;
+                # si no, lo regenera
+                self.graph_manager.load_cached(file_path)
                 print(f"Archivo cargado exitosamente: {file_path}")
                 self.update_ui_after_load()
-                self.graph_widget.update()
+                self.graph_widget.reset_view()
             except Exception as e:
                 print(f"Error al cargar el archivo JSON: {e}")
 
@@ -216,22 +235,29 @@ class MainWindow(QMainWindow):
         self.update_star_modification_ui()
 
     def calculate_die_hard_route(self):
-        start_star = self.start_star_combo.currentText()
-        if not start_star or not self.current_donkey:
-            QMessageBox.warning(self, "Advertencia", "Selecciona constelación, estrella y crea un burro.")
-            return
-        route, stars_visited = self.route_calculator.calculate_max_stars_route(start_star, self.current_donkey)
+        self.start_route_job("calculate_max_stars_route", self.on_die_hard_route_ready)
+
+    def on_die_hard_route_ready(self, result):
+        route, stars_visited = result
         self.graph_widget.set_highlighted_route(route)
         QMessageBox.information(self, "Ruta de Resistencia", f"Visitadas {stars_visited} estrellas:\n{' -> '.join(route)}")
 
+    def calculate_optimal_die_hard_route(self):
+        self.start_route_job("calculate_optimal_max_stars_route", self.on_optimal_route_ready, time_budget=2.0)
+
+    def on_optimal_route_ready(self, result):
+        route, stars_visited, optimal = result
+        self.graph_widget.set_highlighted_route(route)
+        note = "Ruta óptima" if optimal else "Mejor ruta encontrada en el tiempo disponible"
+        QMessageBox.information(self, "Ruta de Resistencia Óptima",
+                                f"{note}. Visitadas {stars_visited} estrellas:\n{' -> '.join(route)}")
+
     def calculate_economical_route(self):
-        start_star = self.start_star_combo.currentText()
-        if not start_star or not self.current_donkey:
-            QMessageBox.warning(self, "Advertencia", "Selecciona constelación, estrella y crea un burro.")
-            return
-        
-        route, stars_visited, food_log, research_log = self.route_calculator.calculate_economical_route(start_star, self.current_donkey)
-        
+        self.start_route_job("calculate_economical_route", self.on_economical_route_ready)
+
+    def on_economical_route_ready(self, result):
+        route, stars_visited, food_log, research_log = result
+
         # Guardar los datos para el reporte que se mostrará al final del viaje
         self.current_route_report_data = {
             "route": route, "food_log": food_log, "research_log": research_log
@@ -241,6 +267,101 @@ class MainWindow(QMainWindow):
         QMessageBox.information(self, "Ruta Económica", f"Visitadas {stars_visited} estrellas.\nIniciando simulación...")
         self.start_animation(route)
 
+    # ----------------------------------------------------
+    #        CÁLCULO DE RUTAS EN SEGUNDO PLANO
+    # ----------------------------------------------------
+    def start_route_job(self, mode, on_ready, **kwargs):
+        """Lanza el cálculo en el QThreadPool; on_ready recibe el resultado si sigue vigente."""
+        start_star = self.start_star_combo.currentText()
+        if not start_star or not self.current_donkey:
+            QMessageBox.warning(self, "Advertencia", "Selecciona constelación, estrella y crea un burro.")
+            return
+        if self.route_job is not None:
+            QMessageBox.warning(self, "Advertencia", "Ya hay un cálculo de ruta en curso.")
+            return
+
+        job = RouteWorker(self.route_calculator, mode, start_star, self.current_donkey, **kwargs)
+        job.signals.progress.connect(self.on_route_progress)
+        job.signals.partial_route.connect(lambda route: self.on_partial_route(job, route))
+        job.signals.finished.connect(lambda result, generation, effects_generation: self.on_route_finished(
+            job, on_ready, result, generation, effects_generation))
+        job.signals.failed.connect(lambda message: self.on_route_failed(job, message))
+        job.signals.cancelled.connect(lambda: self.on_route_cancelled(job))
+        self.route_job = job
+        self.set_route_job_running(True)
+        self.thread_pool.start(job)
+
+    def set_route_job_running(self, running):
+        for button in (self.calc_die_hard_button, self.calc_optimal_button, self.calc_economical_button):
+            button.setEnabled(not running)
+        self.cancel_route_button.setEnabled(running)
+        self.route_status_label.setText("Calculando ruta..." if running else "")
+
+    def cancel_route_job(self):
+        if self.route_job is not None:
+            self.route_job.cancel()
+            self.route_status_label.setText("Cancelando...")
+
+    def is_route_job_current(self, job):
+        """
+        La ruta sólo vale si el grafo (bloqueos, recarga) y los efectos de las estrellas no
+        cambiaron desde que se lanzó el cálculo.
+        """
+        return job is self.route_job and self.is_graph_version_current(job.generation, job.effects_generation)
+
+    def is_graph_version_current(self, generation, effects_generation):
+        return (generation == self.graph_manager.generation
+                and effects_generation == getattr(self.graph_manager, 'effects_generation', 0))
+
+    def on_route_progress(self, stars_visited):
+        if self.route_job is not None and not self.route_job.is_cancelled():
+            self.route_status_label.setText(f"Calculando ruta... {stars_visited} estrellas")
+
+    def on_partial_route(self, job, route):
+        if self.is_route_job_current(job) and not job.is_cancelled():
+            self.graph_widget.set_highlighted_route(route)
+
+    def finish_route_job(self, job):
+        if job is not self.route_job:
+            return False
+        self.route_job = None
+        self.set_route_job_running(False)
+        return True
+
+    def on_route_finished(self, job, on_ready, result, generation, effects_generation):
+        current = self.is_graph_version_current(generation, effects_generation)
+        if not self.finish_route_job(job):
+            return
+        if not current:
+            self.graph_widget.set_highlighted_route([])
+            QMessageBox.warning(self, "Ruta Descartada",
+                                "El mapa cambió mientras se calculaba la ruta. Vuelve a calcularla.")
+            return
+        on_ready(result)
+
+    def on_route_failed(self, job, message):
+        current = self.is_route_job_current(job)
+        if not self.finish_route_job(job):
+            return
+        self.graph_widget.set_highlighted_route([])
+        if current:
+            QMessageBox.warning(self, "Error", f"No se pudo calcular la ruta: {message}")
+        else:
+            QMessageBox.warning(self, "Ruta Descartada",
+                                "El mapa cambió mientras se calculaba la ruta. Vuelve a calcularla.")
+
+    def on_route_cancelled(self, job):
+        if self.finish_route_job(job):
+            self.graph_widget.set_highlighted_route([])
+            self.route_status_label.setText("Cálculo cancelado.")
+
+    def closeEvent(self, event):
+        # No dejar un cálculo corriendo sobre una ventana que ya no existe
+        if self.route_job is not None:
+            self.route_job.cancel()
+            self.thread_pool.waitForDone()
+        super().closeEvent(event)
+
     def create_or_update_donkey(self):
         self.current_donkey = Donkey(
             salud=self.health_combo.currentText(),
@@ -258,7 +379,9 @@ class MainWindow(QMainWindow):
             return
         self.animation_path = route
         self.animation_step_index = 0
-        self.graph_widget.donkey_pos = self.graph_manager.get_star_pos(route[0])
+        # Estado del burro al salir, para rehacer el reporte si la ruta se re-planifica
+        self.animation_start_donkey = self.current_donkey.clonar() if self.current_donkey else None
+        self.graph_widget.set_donkey_pos(self.graph_manager.get_star_pos(route[0]))
         self.update_donkey_status_ui()
         self.animation_timer.start(30)
 
@@ -282,27 +405,19 @@ class MainWindow(QMainWindow):
 
         if distance > 2:
             speed = 2
-            self.graph_widget.donkey_pos = (current_pos[0] + (dx / distance) * speed,
-                                            current_pos[1] + (dy / distance) * speed)
+            self.graph_widget.set_donkey_pos((current_pos[0] + (dx / distance) * speed,
+                                              current_pos[1] + (dy / distance) * speed))
         else:
-            self.graph_widget.donkey_pos = end_pos
+            self.graph_widget.set_donkey_pos(end_pos)
             self.animation_step_index += 1
 
             if self.current_donkey:
-                travel_distance = self.graph_manager.get_distance(
+                travel_distance = self.route_calculator.segment_distance(
                     self.animation_path[start_idx], self.animation_path[end_idx])
-                if travel_distance == float('inf'):
-                    travel_distance = math.sqrt((start_pos[0]-end_pos[0])**2 + (start_pos[1]-end_pos[1])**2) / 4.0
 
                 self.current_donkey.viajar(travel_distance)
-                star_info = self.graph_manager.stars.get(self.animation_path[end_idx], {})
-                estrella_data = {
-                    'tiempo_para_comer': star_info.get('tiempo_para_comer', 1),
-                    'costo_energia_invest': star_info.get('costo_energia_invest', 1),
-                    'health_effect': star_info.get('health_effect', 0),
-                    'life_effect': star_info.get('life_effect', 0)
-                }
-                self.current_donkey.procesar_estrella(self.animation_path[end_idx], estrella_data) # Pasar el label de la estrella
+                star_label = self.animation_path[end_idx]
+                self.current_donkey.procesar_estrella(star_label, self.graph_manager.star_effects.effect(star_label))
 
                 # 💀 Muerte del burro
                 if self.current_donkey.vida_restante <= 0 or self.current_donkey.energia <= 0:
@@ -320,8 +435,6 @@ class MainWindow(QMainWindow):
 
                 self.update_donkey_status_ui()
 
-        self.graph_widget.update()
-
     def update_donkey_status_ui(self):
         if self.current_donkey:
             self.status_health_label.setText(self.current_donkey.get_salud_str())
@@ -340,16 +453,22 @@ class MainWindow(QMainWindow):
         self.start_star_combo.addItems(stars)
         if stars:
             pos = self.graph_manager.get_star_pos(stars[0])
-            self.graph_widget.donkey_pos = pos
-            self.graph_widget.update()
+            self.graph_widget.set_donkey_pos(pos)
 
     def on_start_star_changed(self, index=None):
         name = self.start_star_combo.itemText(index) if isinstance(index, int) else self.start_star_combo.currentText()
         print(f"[DEBUG] Estrella seleccionada: {name}")
         if name:
             pos = self.graph_manager.get_star_pos(name)
-            self.graph_widget.donkey_pos = pos
-            self.graph_widget.update()
+            self.graph_widget.set_donkey_pos(pos)
+
+    def on_star_clicked(self, star_label, shift):
+        """Clic en el mapa: elige la estrella para bloqueo/modificación (Shift: segunda estrella)."""
+        if shift:
+            self.block_star2_combo.setCurrentText(star_label)
+        else:
+            self.block_star1_combo.setCurrentText(star_label)
+            self.mod_star_combo.setCurrentText(star_label)
 
     def update_path_blocking_ui(self):
         """Actualiza los QComboBox para el bloqueo de caminos con todas las estrellas."""
@@ -385,10 +504,11 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Advertencia", "No hay ninguna estrella seleccionada para modificar.")
             return
 
-        star_data = self.graph_manager.stars.get(star_label)
-        if star_data:
-            star_data['health_effect'] = self.mod_health_effect_input.value()
-            star_data['life_effect'] = self.mod_life_effect_input.value()
+        # Cambia la generación de efectos (no la del grafo): una ruta en cálculo con los efectos
+        # anteriores se descarta, pero los árboles de caminos en caché siguen valiendo
+        if self.graph_manager.set_star_effects(star_label, self.mod_health_effect_input.value(),
+                                               self.mod_life_effect_input.value()):
+            self.graph_widget.invalidate_static_layer()
             QMessageBox.information(self, "Éxito", f"Los efectos de la estrella '{star_label}' han sido actualizados.")
         else:
             QMessageBox.warning(self, "Error", f"No se encontraron datos para la estrella '{star_label}'.")
@@ -408,8 +528,11 @@ class MainWindow(QMainWindow):
 
         success, message = self.graph_manager.block_connection(star1, star2)
         if success:
+            self.update_route_trees(self.route_calculator.connection_blocked, star1, star2)
+            if self.animation_timer.isActive():
+                self.replan_animation()
             QMessageBox.information(self, "Camino Bloqueado", message)
-            self.graph_widget.update() # Redibujar para mostrar el camino bloqueado
+            self.graph_widget.invalidate_static_layer() # Redibujar para mostrar el camino bloqueado
         else:
             QMessageBox.warning(self, "Error al Bloquear", message)
 
@@ -424,11 +547,48 @@ class MainWindow(QMainWindow):
 
         success, message = self.graph_manager.unblock_connection(star1, star2)
         if success:
+            self.update_route_trees(self.route_calculator.connection_unblocked, star1, star2)
             QMessageBox.information(self, "Camino Desbloqueado", message)
-            self.graph_widget.update() # Redibujar para mostrar el camino desbloqueado
+            self.graph_widget.invalidate_static_layer() # Redibujar para mostrar el camino desbloqueado
         else:
             QMessageBox.warning(self, "Error al Desbloquear", message)
 
+    def update_route_trees(self, repair, star1, star2):
+        """Repara los árboles de caminos mínimos guardados tras bloquear/desbloquear un camino."""
+        if self.route_job is None:
+            repair(star1, star2)
+        else:
+            # El cálculo en segundo plano puede estar recorriendo esos árboles: en lugar de
+            # repararlos se vacía el caché (con su lock); el resultado del cálculo se descartará
+            self.route_calculator.clear_cache()
+
+    def replan_animation(self):
+        """
+        Un camino se bloqueó durante la animación: la ruta restante se re-planifica rodeando los
+        tramos bloqueados. Si el burro ya salió hacia la siguiente estrella, primero termina ese
+        tramo (aunque sea el bloqueado) y la ruta se re-planifica desde allí, así no salta desde la
+        mitad de un camino. El reporte pendiente se rehace con la ruta nueva.
+        """
+        path = self.animation_path
+        index = self.animation_step_index
+        if index + 1 < len(path) and self.graph_widget.donkey_pos != self.graph_manager.get_star_pos(path[index]):
+            index += 1
+        t0 = time.perf_counter()
+        remaining = self.route_calculator.replan_route(path, index)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        if remaining == path[index:]:
+            return
+        self.animation_path = path[:index] + remaining
+        donkey_pos = self.graph_widget.donkey_pos
+        self.graph_widget.set_highlighted_route(self.animation_path)
+        self.graph_widget.set_donkey_pos(donkey_pos)  # el burro sigue donde estaba
+        if self.current_route_report_data is not None and self.animation_start_donkey is not None:
+            route, food_log, research_log = self.route_calculator.simulate_route(
+                self.animation_path, self.animation_start_donkey)
+            self.current_route_report_data = {"route": route, "food_log": food_log, "research_log": research_log}
+        self.route_status_label.setText(f"Ruta re-planificada en {elapsed_ms:.1f} ms.")
+        print(f"Ruta re-planificada desde '{remaining[0]}' en {elapsed_ms:.1f} ms: {' -> '.join(remaining)}")
+
     def show_route_report(self, route, food_log, research_log):
         """
         Genera y muestra un reporte detallado de la ruta calculada.
@@ -0,0 +1,27 @@
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+# Los tests importan core/ desde la raíz del repositorio, igual que benchmarks/
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.generate_constellations import generate  # noqa: E402
+from core.graph_manager import GraphManager  # noqa: E402
+
+
+@pytest.fixture
+def generated_map(tmp_path):
+    """Fábrica de mapas sintéticos reproducibles: generated_map(estrellas, semilla) -> (GraphManager, ruta)."""
+    def make(n_stars=120, seed=0, degree=4):
+        path = tmp_path / f"mapa-{n_stars}-{seed}-{degree}.json"
+        if not path.exists():
+            generate(str(path), n_stars, degree=degree, seed=seed)
+        gm = GraphManager()
+        with contextlib.redirect_stdout(io.StringIO()):
+            gm.load_from_json(str(path))
+        return gm, path
+    return make
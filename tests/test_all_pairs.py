@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from core.all_pairs import AllPairsShortestPaths
+
+
+def _assert_matches_rebuild(gm):
+    incremental = gm.all_pairs
+    rebuilt = AllPairsShortestPaths(gm).build(method="dijkstra")
+    for source in gm.get_all_star_labels():
+        dist = incremental.row(source)[0]
+        expected = rebuilt.row(source)[0]
+        assert dist.keys() == expected.keys(), source
+        for target, d in expected.items():
+            assert dist[target] == pytest.approx(d), (source, target)
+        # Los caminos de la matriz usan sólo conexiones abiertas y miden lo que dice la fila
+        for target in list(dist)[-3:]:
+            path = incremental.path(source, target)
+            assert path[0] == source and path[-1] == target
+            assert sum(gm.get_distance(a, b) for a, b in zip(path, path[1:])) == pytest.approx(dist[target])
+        # El orden guardado por fila acompaña a la fila vigente
+        settled = incremental.sorted_row(source)[2]
+        assert settled == sorted((d, label) for label, d in dist.items())
+
+
+def test_incremental_updates_match_rebuild(generated_map):
+    gm, _ = generated_map(80, seed=5)
+    gm.enable_all_pairs(method="dijkstra")
+    rnd = random.Random(2)
+    edges = sorted((a, b) for a, b, _ in gm.connections)
+    for _ in range(30):
+        blocked = sorted(gm.blocked_connections)
+        if blocked and rnd.random() < 0.4:
+            ok, _ = gm.unblock_connection(*rnd.choice(blocked))
+        else:
+            ok, _ = gm.block_connection(*rnd.choice(edges))
+        if ok:
+            _assert_matches_rebuild(gm)
+
+
+def test_rows_are_replaced_not_mutated(generated_map):
+    gm, _ = generated_map(40, seed=1)
+    all_pairs = gm.enable_all_pairs(method="dijkstra")
+    rows = {source: all_pairs.row(source) for source in gm.get_all_star_labels()}
+    snapshot = {source: (dict(dist), dict(prev)) for source, (dist, prev) in rows.items()}
+
+    a, b = next((a, b) for a, b, _ in sorted(gm.connections))
+    gm.block_connection(a, b)
+    gm.unblock_connection(a, b)
+
+    # Quien tenía una fila (p. ej. otro hilo) la sigue viendo tal como estaba
+    for source, (dist, prev) in rows.items():
+        assert (dist, prev) == snapshot[source]
@@ -0,0 +1,65 @@
+import contextlib
+import io
+import random
+
+import pytest
+
+from core.compact_graph import CompactGraphManager
+from core.graph_manager import GraphManager
+from core.spatial_index import SpatialIndex
+
+
+def _compact_variants(gm, tmp_path):
+    built = CompactGraphManager.from_graph_manager(gm)
+    compiled = tmp_path / "mapa.graphc"
+    gm.save_compiled(str(compiled))
+    mapped = CompactGraphManager()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert mapped.load_compiled(str(compiled))
+    return built, mapped
+
+
+def test_lookups_and_neighbour_order_match_graph_manager(generated_map, tmp_path):
+    gm, _ = generated_map(150, seed=8, degree=8)
+    rnd = random.Random(9)
+    edges = sorted((a, b) for a, b, _ in gm.connections)
+    for a, b in rnd.sample(edges, 10):
+        gm.block_connection(a, b)
+    labels = gm.get_all_star_labels()
+
+    for compact in _compact_variants(gm, tmp_path):
+        assert compact.targets.itemsize == compact.constellation_idx.itemsize == 8
+        for label in labels:
+            # Mismo orden de vecinos que el índice de adyacencia (desempates de Dijkstra)
+            assert compact.get_neighbors(label) == gm.get_neighbors(label)
+            assert compact.get_neighbors(label, include_blocked=True) == gm.get_neighbors(label, include_blocked=True)
+        for a in labels:
+            for b in rnd.sample(labels, 10) + [other for other, _ in gm.get_neighbors(a, include_blocked=True)]:
+                assert compact.get_distance(a, b) == gm.get_distance(a, b), (a, b)
+                assert compact.is_connection_blocked(a, b) == gm.is_connection_blocked(a, b), (a, b)
+
+
+def test_block_and_unblock_high_degree_star():
+    gm = CompactGraphManager.from_graph_manager(_hub_graph(300))
+    for other in random.Random(1).sample(range(1, 301), 50):
+        label = f"S{other}"
+        assert gm.block_connection("S0", label)[0]
+        assert gm.is_connection_blocked(label, "S0")
+        assert gm.get_distance("S0", label) == float('inf')
+        assert gm.unblock_connection(label, "S0")[0]
+        assert gm.get_distance(label, "S0") == pytest.approx(other)
+    assert not gm.block_connection("S1", "S2")[0]
+
+
+def _hub_graph(n):
+    """GraphManager con una estrella S0 conectada a S1..Sn (en orden inverso de id)."""
+    gm = GraphManager()
+    for i in range(n + 1):
+        gm.stars[f"S{i}"] = {"id": i, "pos": (i, 0), "um_pos": (i, 0), "constellation": "C"}
+    for i in range(n, 0, -1):
+        a, b = sorted(("S0", f"S{i}"))
+        gm.connections.add((a, b, float(i)))
+        gm._index_connection(a, b, float(i))
+    gm.open_adjacency = {label: dict(neigh) for label, neigh in gm.adjacency.items()}
+    gm.spatial_index = SpatialIndex.from_graph(gm)
+    return gm
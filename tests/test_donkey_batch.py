@@ -0,0 +1,84 @@
+import json
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.donkey import Donkey
+from core.donkey_batch import BatchDonkeySimulator, DonkeyPopulation
+from core.graph_manager import GraphManager
+
+
+def _star(sid, x, y, links, time_to_eat, energy, health, life):
+    return {"id": sid, "label": f"S{sid}", "coordenates": {"x": x, "y": y},
+            "timeToEat": time_to_eat, "amountOfEnergy": energy,
+            "healthEffect": health, "lifeEffect": life,
+            "linkedTo": [{"starId": other, "distance": dist} for other, dist in links]}
+
+
+@pytest.fixture
+def graph_manager(tmp_path):
+    """Mapa chico con efectos variados; S4 y S5 no están conectadas (se usa la distancia euclídea)."""
+    data = {
+        "constellations": [
+            {"name": "Norte", "starts": [
+                _star(1, 10, 10, [(2, 30), (3, 45)], 1, 1, 1, 0),
+                _star(2, 40, 15, [(3, 20)], 2, 0.3, -1, 30),
+                _star(3, 60, 40, [(4, 70)], 0.5, 2, 0, -50),
+            ]},
+            {"name": "Sur", "starts": [
+                _star(4, 20, 120, [], 3, 0, -2, 0),
+                _star(5, 90, 150, [(1, 55)], 1, 1, 2, 10),
+            ]},
+        ],
+    }
+    path = tmp_path / "mapa.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    gm = GraphManager()
+    gm.load_from_json(str(path))
+    return gm
+
+
+def _simular_escalar(graph_manager, donkey, route):
+    """Misma secuencia que la animación: viajar, procesar la estrella de llegada y ver si murió."""
+    for step in range(1, len(route)):
+        a, b = route[step - 1], route[step]
+        distancia = graph_manager.get_distance(a, b)
+        if distancia == float('inf'):
+            pa, pb = graph_manager.get_star_pos(a), graph_manager.get_star_pos(b)
+            distancia = math.sqrt((pa[0] - pb[0]) ** 2 + (pa[1] - pb[1]) ** 2) / 4.0
+        donkey.viajar(distancia)
+        donkey.procesar_estrella(b, graph_manager.stars[b])
+        if donkey.vida_restante <= 0 or donkey.energia <= 0:
+            return step
+    return -1
+
+
+def test_batch_matches_scalar_donkeys(graph_manager):
+    route = ["S1", "S2", "S3", "S4", "S5", "S1", "S3", "S2", "S1", "S2", "S3", "S4", "S5"]
+    population = DonkeyPopulation.from_grid(
+        ["excelente", "buena", "regular", "mala", "moribundo"],
+        range(1, 100, 7), [0, 3.5, 10, 25, 49.9, 50, 80, 100], [0, 0.25, 4, 40, 300])
+
+    death_step, final = BatchDonkeySimulator(graph_manager).simulate(population, route)
+
+    deaths = 0
+    for i in range(len(population)):
+        donkey = Donkey.desde_estado(population.estado(i))
+        step = _simular_escalar(graph_manager, donkey, route)
+        assert death_step[i] == step, i
+        assert final.estado(i) == donkey.obtener_estado(), i
+        deaths += step != -1
+    # La grilla tiene que cubrir tanto burros que mueren como burros que completan la ruta
+    assert 0 < deaths < len(population)
+
+
+def test_simulate_does_not_modify_population(graph_manager):
+    population = DonkeyPopulation.from_grid(["buena"], [10, 90], [20, 70], [0, 50])
+    before = population.copy()
+
+    BatchDonkeySimulator(graph_manager).simulate(population, ["S1", "S2", "S3", "S5"])
+
+    for field in ("salud", "edad", "energia", "pasto", "vida_restante"):
+        assert np.array_equal(getattr(population, field), getattr(before, field))
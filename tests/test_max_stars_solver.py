@@ -0,0 +1,77 @@
+import contextlib
+import io
+import itertools
+import random
+import types
+
+import pytest
+
+from core import max_stars_solver
+from core.all_pairs import dijkstra_row
+from core.max_stars_solver import MaxStarsSolver
+
+
+def _vida_para(gm, start, k):
+    """Vida con la que exactamente k estrellas (además del inicio) quedan a distancia alcanzable."""
+    distances = sorted(dijkstra_row(start, gm.get_neighbors)[0].values())
+    return (distances[k] + distances[k + 1]) / 2
+
+
+def _solve(gm, start, vida, time_budget=None, dp_max_nodes=None):
+    solver = MaxStarsSolver(gm, time_budget=time_budget)
+    if dp_max_nodes is not None:
+        solver.DP_MAX_NODES = dp_max_nodes
+    with contextlib.redirect_stdout(io.StringIO()):
+        route, count, proven = solver.solve(start, vida)
+    return solver, route, count, proven
+
+
+def _check_route(gm, start, route, count, vida):
+    assert route[0] == start
+    assert len(route) == count == len(set(route))
+    # Las estrellas de la ruta se visitan en orden: la suma de los caminos mínimos entre
+    # consecutivas no puede superar la vida (sobre el camino real es igual o mayor)
+    spent = sum(dijkstra_row(a, gm.get_neighbors)[0][b] for a, b in zip(route, route[1:]))
+    assert spent < vida
+
+
+def _greedy_count(solver, start, vida):
+    return len(dict.fromkeys(solver._expand(solver._greedy(start, vida))))
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """Reloj que avanza en cada lectura: con time_budget=0 el presupuesto vence en el primer control."""
+    ticks = itertools.count()
+    monkeypatch.setattr(max_stars_solver, "time", types.SimpleNamespace(monotonic=lambda: next(ticks)))
+
+
+def test_held_karp_matches_branch_and_bound(generated_map):
+    gm, _ = generated_map(120, seed=3)
+    rnd = random.Random(1)
+    labels = gm.get_all_star_labels()
+    for _ in range(15):
+        start = rnd.choice(labels)
+        vida = _vida_para(gm, start, rnd.randint(3, MaxStarsSolver.DP_MAX_NODES))
+
+        _, hk_route, hk_count, hk_proven = _solve(gm, start, vida)
+        _, bb_route, bb_count, bb_proven = _solve(gm, start, vida, dp_max_nodes=0)
+
+        assert hk_proven and bb_proven
+        assert hk_count == bb_count, start
+        _check_route(gm, start, hk_route, hk_count, vida)
+        _check_route(gm, start, bb_route, bb_count, vida)
+
+
+@pytest.mark.parametrize("k", [MaxStarsSolver.DP_MAX_NODES, 50])
+def test_time_budget_returns_best_found(generated_map, fake_clock, k):
+    # k = DP_MAX_NODES usa Held-Karp; 50 candidatos, ramificación y poda
+    gm, _ = generated_map(120, seed=3)
+    start = gm.get_all_star_labels()[0]
+    vida = _vida_para(gm, start, k)
+
+    solver, route, count, proven = _solve(gm, start, vida, time_budget=0)
+
+    assert not proven
+    _check_route(gm, start, route, count, vida)
+    assert count >= _greedy_count(solver, start, vida)
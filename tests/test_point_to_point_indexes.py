@@ -0,0 +1,119 @@
+import contextlib
+import io
+import random
+
+import pytest
+
+from core import contraction_hierarchy
+from core.compact_graph import CompactGraphManager
+from core.compiled_graph import user_cache_path
+from core.graph_manager import GraphManager
+from core.point_to_point import PointToPointSearch
+
+
+@pytest.fixture(autouse=True)
+def cache_home(monkeypatch, tmp_path):
+    """Los índices guardados van a una carpeta de cachés temporal, no a la del usuario."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+def _assert_same_as_dijkstra(gm, query, pairs):
+    reference = PointToPointSearch(gm)
+    for start, target in pairs:
+        expected_path, expected, _ = reference.search(start, target, "dijkstra")
+        path, distance, _ = query(start, target)
+        assert distance == pytest.approx(expected), (start, target)
+        assert (path is None) == (expected_path is None), (start, target)
+        if path is not None:
+            # Camino real sobre conexiones abiertas, del largo informado
+            assert path[0] == start and path[-1] == target
+            assert sum(gm.get_distance(a, b) for a, b in zip(path, path[1:])) == pytest.approx(distance)
+
+
+def _random_pairs(gm, rnd, n=60):
+    labels = gm.get_all_star_labels()
+    return [(rnd.choice(labels), rnd.choice(labels)) for _ in range(n)]
+
+
+def _block_and_unblock(gm, rnd, check, steps=12):
+    """Bloquea (y a veces desbloquea) conexiones al azar, comprobando el índice tras cada cambio."""
+    edges = sorted((a, b) for a, b, _ in gm.connections)
+    for _ in range(steps):
+        blocked = sorted(gm.blocked_connections)
+        if blocked and rnd.random() < 0.3:
+            ok, _ = gm.unblock_connection(*rnd.choice(blocked))
+        else:
+            ok, _ = gm.block_connection(*rnd.choice(edges))
+        if ok:
+            check()
+
+
+def _quiet(func, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def test_contraction_hierarchy_matches_dijkstra(generated_map):
+    gm, _ = generated_map(200, seed=7)
+    ch = _quiet(gm.enable_contraction_hierarchy)
+    rnd = random.Random(3)
+
+    _assert_same_as_dijkstra(gm, ch.query, _random_pairs(gm, rnd))
+    _block_and_unblock(gm, rnd, lambda: _assert_same_as_dijkstra(gm, ch.query, _random_pairs(gm, rnd, 20)))
+
+    # Reconstruido con las conexiones bloqueadas actuales
+    assert _quiet(gm.rebuild_contraction_hierarchy)
+    assert not gm.contraction_hierarchy.stale
+    _assert_same_as_dijkstra(gm, gm.contraction_hierarchy.query, _random_pairs(gm, rnd))
+
+
+def test_contraction_hierarchy_round_trip(generated_map, monkeypatch):
+    gm, path = generated_map(200, seed=7)
+    _quiet(gm.enable_contraction_hierarchy)
+    assert user_cache_path(path, ".ch").exists()
+
+    # Otra carga del mismo JSON lee el índice guardado en lugar de construirlo
+    reloaded, _ = generated_map(200, seed=7)
+    rnd = random.Random(4)
+    edges = sorted((a, b) for a, b, _ in reloaded.connections)
+    for a, b in rnd.sample(edges, 3):
+        reloaded.block_connection(a, b)
+    monkeypatch.setattr(contraction_hierarchy.ContractionHierarchy, "build",
+                        lambda self: pytest.fail("el índice guardado debía reutilizarse"))
+    ch = _quiet(reloaded.enable_contraction_hierarchy)
+
+    _assert_same_as_dijkstra(reloaded, ch.query, _random_pairs(reloaded, rnd))
+    _block_and_unblock(reloaded, rnd,
+                       lambda: _assert_same_as_dijkstra(reloaded, ch.query, _random_pairs(reloaded, rnd, 20)))
+
+
+def test_contraction_hierarchy_rejects_other_source(generated_map, tmp_path):
+    gm, _ = generated_map(60, seed=2)
+    ch = _quiet(gm.enable_contraction_hierarchy)
+    saved = tmp_path / "indice.ch"
+    ch.save(saved, "a" * 64)
+
+    other = contraction_hierarchy.ContractionHierarchy(gm)
+    with pytest.raises(contraction_hierarchy.ContractionHierarchyError):
+        other.load(saved, "b" * 64)
+    with pytest.raises(contraction_hierarchy.ContractionHierarchyError):
+        other.load(saved)
+
+
+@pytest.mark.parametrize("manager_class", [GraphManager, CompactGraphManager])
+def test_constellation_router_matches_dijkstra(generated_map, tmp_path, manager_class):
+    source, path = generated_map(200, seed=11)
+    # Ida y vuelta por el grafo compilado antes de armar el índice
+    compiled = tmp_path / "mapa.graphc"
+    source.save_compiled(str(compiled))
+    gm = manager_class()
+    assert _quiet(gm.load_compiled, str(compiled))
+    router = gm.enable_constellation_routing()
+    rnd = random.Random(5)
+
+    # Pares dentro de la misma constelación y entre constelaciones
+    labels = gm.get_all_star_labels()
+    same = [(a, rnd.choice(router.members[router.constellation_of[a]])) for a in rnd.sample(labels, 30)]
+    _assert_same_as_dijkstra(gm, router.query, same + _random_pairs(gm, rnd))
+    _block_and_unblock(gm, rnd, lambda: _assert_same_as_dijkstra(gm, router.query, _random_pairs(gm, rnd, 20)),
+                       steps=20)
@@ -0,0 +1,48 @@
+import math
+
+import pytest
+
+from core.donkey import Donkey
+from core.route_calculator import RouteCalculator
+
+
+def test_segment_distance_keeps_length_of_blocked_connection(generated_map):
+    gm, _ = generated_map(60, seed=2)
+    calculator = RouteCalculator(gm)
+    a, b, dist = sorted(gm.connections)[0]
+    assert calculator.segment_distance(a, b) == pytest.approx(dist)
+
+    # Un tramo bloqueado con el burro ya en camino se termina con su largo real
+    gm.block_connection(a, b)
+    assert calculator.segment_distance(b, a) == pytest.approx(dist)
+
+    # Sin conexión: distancia euclídea / 4, como la animación
+    neighbours = {other for other, _ in gm.get_neighbors(a, include_blocked=True)}
+    c = next(label for label in gm.get_all_star_labels() if label != a and label not in neighbours)
+    (ax, ay), (cx, cy) = gm.get_star_pos(a), gm.get_star_pos(c)
+    assert calculator.segment_distance(a, c) == pytest.approx(math.hypot(ax - cx, ay - cy) / 4.0)
+
+
+def test_simulate_route_follows_the_donkey_until_it_dies(generated_map):
+    gm, _ = generated_map(60, seed=2)
+    calculator = RouteCalculator(gm)
+    route = gm.get_all_star_labels()[:30]
+    donkey = Donkey("buena", 60, 70, 40)
+
+    visited, food_log, research_log = calculator.simulate_route(route, donkey)
+
+    expected = Donkey.desde_estado(donkey)
+    expected.procesar_estrella(route[0], gm.star_effects.effect(route[0]))
+    reached = [route[0]]
+    for a, b in zip(route, route[1:]):
+        expected.viajar(calculator.segment_distance(a, b))
+        expected.procesar_estrella(b, gm.star_effects.effect(b))
+        reached.append(b)
+        if expected.vida_restante <= 0 or expected.energia <= 0:
+            break
+    assert len(reached) < len(route)  # la ruta es más larga de lo que aguanta este burro
+    assert visited == reached
+    assert food_log == expected.food_consumption_log
+    assert research_log == expected.research_log
+    # El burro original no se modifica
+    assert donkey.food_consumption_log == [] and donkey.research_log == []
@@ -0,0 +1,46 @@
+import random
+
+from core.spatial_index import SpatialIndex
+
+
+def _brute_stars(gm, x0, y0, x1, y1):
+    return sorted(label for label, data in gm.stars.items()
+                  if x0 <= data['pos'][0] <= x1 and y0 <= data['pos'][1] <= y1)
+
+
+def _brute_edges(gm, x0, y0, x1, y1):
+    found = []
+    for a, b, dist in gm.connections:
+        (ax, ay), (bx, by) = gm.stars[a]['pos'], gm.stars[b]['pos']
+        if min(ax, bx) <= x1 and max(ax, bx) >= x0 and min(ay, by) <= y1 and max(ay, by) >= y0:
+            found.append((a, b, dist))
+    return sorted(found)
+
+
+def test_rect_queries_match_brute_force(generated_map):
+    gm, _ = generated_map(300, seed=4)
+    index = SpatialIndex.from_graph(gm)
+    xs = [data['pos'][0] for data in gm.stars.values()]
+    ys = [data['pos'][1] for data in gm.stars.values()]
+    width, height = max(xs) - min(xs), max(ys) - min(ys)
+    rnd = random.Random(6)
+    for _ in range(200):
+        # Rectángulos chicos, grandes (poco zoom) y fuera del mapa
+        scale = rnd.choice([0.05, 0.3, 5.0])
+        x0 = rnd.uniform(min(xs) - 2 * width, max(xs) + width)
+        y0 = rnd.uniform(min(ys) - 2 * height, max(ys) + height)
+        x1, y1 = x0 + scale * width, y0 + scale * height
+        assert sorted(index.stars_in_rect(x0, y0, x1, y1)) == _brute_stars(gm, x0, y0, x1, y1)
+        assert sorted(index.edges_in_rect(x0, y0, x1, y1)) == _brute_edges(gm, x0, y0, x1, y1)
+
+
+def test_huge_rect_only_visits_occupied_cells():
+    index = SpatialIndex(cell_size=16)
+    index.add_star("A", 0, 0)
+    index.add_star("B", 100, 50)
+    index.add_edge("A", "B", 1.0, 0, 0, 100, 50)
+    cells = list(index._occupied_cell_range(-1e6, -1e6, 1e6, 1e6))
+    assert len(cells) == 7 * 4
+    assert list(index._occupied_cell_range(500, 500, 900, 900)) == []
+    assert index.stars_in_rect(-1e6, -1e6, 1e6, 1e6) == ["A", "B"]
+    assert index.edges_in_rect(-1e6, -1e6, 1e6, 1e6) == [("A", "B", 1.0)]
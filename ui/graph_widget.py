@@ -1,11 +1,15 @@
 # ui/graph_widget.py
 from PyQt6.QtWidgets import QWidget
 from PyQt6.QtGui import QPainter, QPen, QBrush, QColor, QPixmap
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QRect, QPoint, QLine, pyqtSignal
 from pathlib import Path
+import math
 import os
 
 class GraphWidget(QWidget):
+    # Clic sobre una estrella: (etiqueta, Shift presionado)
+    star_clicked = pyqtSignal(str, bool)
+
     def __init__(self, graph_manager, parent=None):
         super().__init__(parent)
         self.graph_manager = graph_manager
@@ -16,6 +20,17 @@ class GraphWidget(QWidget):
         self.donkey_pix_size = 70   # tamaño del sprite del burro en píxeles
         self.highlighted_route = []
         self.donkey_pos = None
+        # Cache de QColor por tupla (r, g, b): el núcleo guarda colores sin depender de Qt
+        self._color_cache = {}
+        # Mosaicos de la capa estática: (capa, tx, ty) -> QPixmap
+        self._tile_cache = {}
+        self._max_star_radius = None  # radio en píxeles de la estrella más grande (para consultas)
+        self._star_spacing = None     # separación media entre estrellas en píxeles del grafo
+        self._constellation_summary = None
+        # Vista: pantalla = posición del grafo * zoom + desplazamiento
+        self.zoom = 1.0
+        self.view_offset = QPoint(0, 0)
+        self._drag_origin = None
 
         # Intentar cargar sprite del burro; buscar en la carpeta assets del proyecto
         assets_candidate = Path(__file__).resolve().parents[1] / "assets" / "donkey.png"
@@ -47,80 +62,250 @@ class GraphWidget(QWidget):
                            Qt.TransformationMode.SmoothTransformation)
         self.donkey_pixmap = pm
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
-        # Fondo oscuro
-        painter.fillRect(self.rect(), QColor(10, 20, 30))
+    # ----------------------------------------------------
+    #        CAPA ESTÁTICA EN CACHÉ (por mosaicos)
+    # ----------------------------------------------------
+    # Conexiones y estrellas sólo cambian al cargar, bloquear/desbloquear, modificar estrellas o
+    # cambiar el zoom; se dibujan una vez en pixmaps de TILE_SIZE x TILE_SIZE (en coordenadas
+    # del grafo ya escaladas por el zoom) y cada cuadro sólo copia los mosaicos visibles,
+    # desplazados según la vista. Hay dos capas para conservar el orden de dibujo: "base"
+    # (conexiones) bajo la ruta y "stars" sobre ella. El fondo y los ejes se pintan directo.
+    TILE_SIZE = 512
+    MAX_TILES = 96     # al superar esta cantidad (p. ej. tras mucho desplazamiento) se vacía el caché
+    LABEL_WIDTH = 150  # ancho máximo estimado de la etiqueta de una estrella
+
+    # Nivel de detalle según la separación media entre estrellas en pantalla (píxeles)
+    LOD_LABELS_PX = 40   # desde aquí: estrellas con etiquetas y todas las conexiones
+    LOD_STARS_PX = 8     # desde aquí: estrellas sin etiquetas, conexiones cortas omitidas
+                         # por debajo: una marca por constelación
+    EDGE_MIN_PX = 4      # en el nivel intermedio no se dibujan conexiones más cortas que esto
+    CONSTELLATION_LABEL_LIMIT = 60
+    CONSTELLATION_LINK_LIMIT = 2000  # en la vista lejana sólo se dibujan los pares más conectados
+    MIN_ZOOM = 0.05
+    MAX_ZOOM = 64.0
+    ZOOM_STEP = 1.25     # factor por cada paso de la rueda del ratón
+
+    def invalidate_static_layer(self):
+        """Descarta la capa estática en caché (llamar tras cambios en el grafo) y repinta."""
+        self._tile_cache.clear()
+        self._max_star_radius = None
+        self._star_spacing = None
+        self._constellation_summary = None
+        self.update()
+
+    def reset_view(self):
+        """Vuelve al zoom 1 sin desplazamiento (p. ej. al cargar otro mapa)."""
+        self.zoom = 1.0
+        self.view_offset = QPoint(0, 0)
+        self.invalidate_static_layer()
+
+    def zoom_at(self, x, y, factor):
+        """Cambia el zoom manteniendo fijo el punto de pantalla (x, y)."""
+        new_zoom = max(self.MIN_ZOOM, min(self.MAX_ZOOM, self.zoom * factor))
+        if new_zoom == self.zoom:
+            return
+        ratio = new_zoom / self.zoom
+        self.view_offset = QPoint(round(x - (x - self.view_offset.x()) * ratio),
+                                  round(y - (y - self.view_offset.y()) * ratio))
+        self.zoom = new_zoom
+        self._tile_cache.clear()
+        self._max_star_radius = None
+        self.update()
+
+    def _label_font(self):
+        font = self.font()
+        font.setPointSize(8)
+        return font
+
+    def _get_tile(self, layer, tx, ty):
+        key = (layer, tx, ty)
+        pm = self._tile_cache.get(key)
+        if pm is None:
+            if len(self._tile_cache) >= self.MAX_TILES:
+                self._tile_cache.clear()
+            size = self.TILE_SIZE
+            dpr = self.devicePixelRatioF()
+            pm = QPixmap(int(size * dpr), int(size * dpr))
+            pm.setDevicePixelRatio(dpr)
+            pm.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pm)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setFont(self._label_font())
+            painter.translate(-tx * size, -ty * size)
+            tile_rect = QRect(tx * size, ty * size, size, size)
+            if layer == "base":
+                self._paint_base_layer(painter, tile_rect)
+            else:
+                self._paint_star_layer(painter, tile_rect)
+            painter.end()
+            self._tile_cache[key] = pm
+        return pm
+
+    def _draw_cached_layer(self, painter, layer, rect):
+        size = self.TILE_SIZE
+        ox, oy = self.view_offset.x(), self.view_offset.y()
+        view = rect.translated(-ox, -oy)
+        for ty in range(view.top() // size, view.bottom() // size + 1):
+            for tx in range(view.left() // size, view.right() // size + 1):
+                painter.drawPixmap(tx * size + ox, ty * size + oy, self._get_tile(layer, tx, ty))
+
+    # ----------------------------------------------------
+    #        VISTA (zoom / desplazamiento) Y NIVEL DE DETALLE
+    # ----------------------------------------------------
+    def _view_xy(self, pos):
+        """Posición del grafo -> coordenadas de los mosaicos (escaladas, sin desplazamiento)."""
+        return int(pos[0] * self.zoom), int(pos[1] * self.zoom)
+
+    def _screen_xy(self, pos):
+        x, y = self._view_xy(pos)
+        return x + self.view_offset.x(), y + self.view_offset.y()
+
+    def _graph_rect(self, rect, margin=0):
+        """Rectángulo de los mosaicos (+ margen en píxeles de pantalla) en coordenadas del grafo."""
+        z = self.zoom
+        return ((rect.left() - margin) / z, (rect.top() - margin) / z,
+                (rect.right() + 1 + margin) / z, (rect.bottom() + 1 + margin) / z)
+
+    def _star_radius_px(self, star_data):
+        radius = max(3, int(self.node_radius * self.star_scale * (star_data.get('radius', 0.5) or 0.5)))
+        # Al acercarse las estrellas conservan su tamaño en pantalla (se separan); al alejarse se achican
+        return radius if self.zoom >= 1 else max(2, int(radius * self.zoom))
+
+    def _max_radius_px(self):
+        if self._max_star_radius is None:
+            self._max_star_radius = max((self._star_radius_px(data) for data in self.graph_manager.stars.values()),
+                                        default=3)
+        return self._max_star_radius
 
+    def _lod(self):
+        """'labels', 'stars' o 'constellations' según la separación media entre estrellas en pantalla."""
+        if self._star_spacing is None:
+            points = self.graph_manager.spatial_index.star_points
+            if len(points) < 2:
+                self._star_spacing = float('inf')
+            else:
+                xs = [p[0] for p in points]
+                ys = [p[1] for p in points]
+                area = max(1.0, (max(xs) - min(xs)) * (max(ys) - min(ys)))
+                self._star_spacing = math.sqrt(area / len(points))
+        spacing = self._star_spacing * self.zoom
+        if spacing >= self.LOD_LABELS_PX:
+            return "labels"
+        if spacing >= self.LOD_STARS_PX:
+            return "stars"
+        return "constellations"
+
+    def _constellations(self):
+        """(centros [(nombre, x, y, cantidad)], pares de constelaciones conectadas), en caché."""
+        if self._constellation_summary is None:
+            sums = {}
+            for data in self.graph_manager.stars.values():
+                x, y = data.get('pos', (0, 0))
+                acc = sums.setdefault(data.get('constellation'), [0.0, 0.0, 0])
+                acc[0] += x
+                acc[1] += y
+                acc[2] += 1
+            centers = {name: (sx / n, sy / n) for name, (sx, sy, n) in sums.items()}
+            stars = self.graph_manager.stars
+            links = {}
+            for a, b, _ in self.graph_manager.connections:
+                if a in stars and b in stars:
+                    ca, cb = stars[a].get('constellation'), stars[b].get('constellation')
+                    if ca != cb:
+                        pair = (ca, cb) if str(ca) <= str(cb) else (cb, ca)
+                        links[pair] = links.get(pair, 0) + 1
+            strongest = sorted(links, key=lambda pair: (-links[pair], str(pair)))[:self.CONSTELLATION_LINK_LIMIT]
+            self._constellation_summary = (
+                [(name, centers[name][0], centers[name][1], n) for name, (_, _, n) in sums.items()],
+                [(centers[a], centers[b]) for a, b in strongest],
+            )
+        return self._constellation_summary
+
+    def _paint_axes(self, painter, rect):
         # --- Dibujar coordenadas en las laterales (izquierda y derecha) ---
         w = self.width()
         h = self.height()
         step = 50
         label_margin = 6
+        painter.setFont(self._label_font())
         painter.setPen(QPen(QColor(180, 180, 180), 1))
-        font = painter.font()
-        font.setPointSize(8)
-        painter.setFont(font)
 
         # Si el graph_manager tiene mapeo unidad->px, mostrar valores en cm;
         has_units = hasattr(self.graph_manager, 'um_scale') and self.graph_manager.um_scale > 0
         for y in range(0, h + 1, step):
+            if y < rect.top() - 10 or y > rect.bottom() + 10:
+                continue
+            graph_y = (y - self.view_offset.y()) / self.zoom
             painter.drawLine(label_margin, y, label_margin + 8, y)
             if has_units:
                 # convertir píxel -> unidad (ahora unidad = cm)
-                unit_y = self.graph_manager.um_min_y + (y - self.graph_manager.um_padding) / self.graph_manager.um_scale
+                unit_y = self.graph_manager.um_min_y + (graph_y - self.graph_manager.um_padding) / self.graph_manager.um_scale
                 label_text = f"{unit_y:.2f} cm"
             else:
-                label_text = str(y)
+                label_text = str(int(graph_y))
             painter.drawText(label_margin + 12, y + 4, label_text)
             painter.drawLine(w - label_margin, y, w - (label_margin + 8), y)
             text_w_offset = 60
             painter.drawText(w - (label_margin + text_w_offset), y + 4, label_text)
 
+    def _paint_base_layer(self, painter, rect):
         # --- Dibujar conexiones ---
-        pen = QPen(Qt.GlobalColor.white, 2)
-        painter.setPen(pen)
+        lod = self._lod()
+        if lod == "constellations":
+            # Una línea tenue por cada par de constelaciones conectadas (los más conectados)
+            lines = []
+            for (ax, ay), (bx, by) in self._constellations()[1]:
+                p1, p2 = QPoint(*self._view_xy((ax, ay))), QPoint(*self._view_xy((bx, by)))
+                if rect.intersects(QRect(p1, p2).normalized().adjusted(-1, -1, 1, 1)):
+                    lines.append(QLine(p1, p2))
+            painter.setPen(QPen(QColor(120, 120, 140), 1))
+            painter.drawLines(lines)
+            return
 
-        for star1, star2, distance in self.graph_manager.connections:
-            if star1 in self.graph_manager.stars and star2 in self.graph_manager.stars:
-                x1f, y1f = self.graph_manager.stars[star1]['pos']
-                x2f, y2f = self.graph_manager.stars[star2]['pos']
-                x1, y1, x2, y2 = int(x1f), int(y1f), int(x2f), int(y2f)
+        width = 2 if lod == "labels" else 1
+        stars = self.graph_manager.stars
+        blocked = self.graph_manager.blocked_connections
+        open_lines, blocked_lines = [], []
 
-                # Si la conexión está bloqueada, la pintamos en rojo punteado
-                if tuple(sorted((star1, star2))) in self.graph_manager.blocked_connections:
-                    pen = QPen(QColor(200, 50, 50), 2, Qt.PenStyle.DashLine)
-                else:
-                    pen = QPen(Qt.GlobalColor.white, 2)
+        # Sólo las conexiones cuya caja toca el mosaico (con margen por el grosor del trazo)
+        visible_edges = self.graph_manager.spatial_index.edges_in_rect(*self._graph_rect(rect, 2))
+        for star1, star2, distance in visible_edges:
+            if star1 in stars and star2 in stars:
+                x1, y1 = self._view_xy(stars[star1]['pos'])
+                x2, y2 = self._view_xy(stars[star2]['pos'])
+                if tuple(sorted((star1, star2))) in blocked:
+                    blocked_lines.append(QLine(x1, y1, x2, y2))
+                elif lod == "labels" or abs(x2 - x1) + abs(y2 - y1) >= self.EDGE_MIN_PX:
+                    # (en el nivel intermedio las muy cortas quedan tapadas por las propias estrellas)
+                    open_lines.append(QLine(x1, y1, x2, y2))
 
-                painter.setPen(pen)
-                painter.drawLine(x1, y1, x2, y2)
+        # Se dibujan por lotes; las bloqueadas (rojo punteado) encima para que siempre se vean
+        painter.setPen(QPen(Qt.GlobalColor.white, width))
+        painter.drawLines(open_lines)
+        painter.setPen(QPen(QColor(200, 50, 50), width, Qt.PenStyle.DashLine))
+        painter.drawLines(blocked_lines)
 
-        # --- Resaltar la ruta calculada ---
-        if len(self.highlighted_route) > 1:
-            pen = QPen(QColor(100, 220, 120), 3)
-            painter.setPen(pen)
-            for i in range(len(self.highlighted_route) - 1):
-                a = self.highlighted_route[i]
-                b = self.highlighted_route[i + 1]
-                if a in self.graph_manager.stars and b in self.graph_manager.stars:
-                    axf, ayf = self.graph_manager.stars[a]['pos']
-                    bxf, byf = self.graph_manager.stars[b]['pos']
-                    painter.drawLine(int(axf), int(ayf), int(bxf), int(byf))
+    def _paint_star_layer(self, painter, rect):
+        lod = self._lod()
+        if lod == "constellations":
+            self._paint_constellation_marks(painter, rect)
+            return
 
         # --- Dibujar estrellas ---
-        for star_name, star_data in self.graph_manager.stars.items():
-            xf, yf = star_data.get('pos', (0, 0))
-            x, y = int(xf), int(yf)
+        # La etiqueta va a la derecha del círculo, así que hacia la izquierda el margen es mayor
+        show_labels = lod == "labels"
+        margin = self._max_radius_px() + 4 + (self.LABEL_WIDTH if show_labels else 0)
+        visible = self.graph_manager.spatial_index.stars_in_rect(*self._graph_rect(rect, margin))
+        for star_name in visible:
+            star_data = self.graph_manager.stars[star_name]
+            x, y = self._view_xy(star_data.get('pos', (0, 0)))
             # aplicar escalado adicional para que las estrellas sean más visibles
-            radius = max(3, int(self.node_radius * self.star_scale * (star_data.get('radius', 0.5) or 0.5)))
+            radius = self._star_radius_px(star_data)
             # si overlap -> rojo, sino color de la constelación
             if star_data.get('overlap'):
                 color = QColor(220, 50, 50)
             else:
-                color = self.graph_manager.constellation_colors.get(star_data.get('constellation'), QColor(200, 200, 200))
+                color = self._qcolor(self.graph_manager.constellation_colors.get(star_data.get('constellation'), (200, 200, 200)))
             if star_data.get('hypergiant'):
                 painter.setBrush(QBrush(QColor(255, 200, 100)))
             else:
@@ -128,13 +313,59 @@ class GraphWidget(QWidget):
             painter.setPen(QPen(Qt.GlobalColor.black, 1))
             painter.drawEllipse(x - radius, y - radius, radius * 2, radius * 2)
             # label
-            painter.setPen(QPen(QColor(200, 200, 200)))
-            painter.drawText(x + radius + 4, y + 4, star_name)
+            if show_labels:
+                painter.setPen(QPen(QColor(200, 200, 200)))
+                painter.drawText(x + radius + 4, y + 4, star_name)
+
+    def _paint_constellation_marks(self, painter, rect):
+        """Vista lejana: un círculo por constelación (área según cantidad de estrellas)."""
+        centers = self._constellations()[0]
+        show_labels = len(centers) <= self.CONSTELLATION_LABEL_LIMIT
+        colors = self.graph_manager.constellation_colors
+        for name, cx, cy, count in centers:
+            x, y = self._view_xy((cx, cy))
+            radius = int(min(30, 3 + 2 * math.sqrt(count)))
+            extra = self.LABEL_WIDTH if show_labels else 0
+            if not rect.intersects(QRect(x - radius - extra, y - radius, 2 * (radius + extra), 2 * radius)):
+                continue
+            painter.setBrush(QBrush(self._qcolor(colors.get(name, (200, 200, 200)))))
+            painter.setPen(QPen(Qt.GlobalColor.black, 1))
+            painter.drawEllipse(x - radius, y - radius, radius * 2, radius * 2)
+            if show_labels:
+                painter.setPen(QPen(QColor(200, 200, 200)))
+                painter.drawText(x + radius + 4, y + 4, f"{name} ({count})")
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = event.rect()
+
+        # Fondo oscuro y ejes (en coordenadas de pantalla)
+        painter.fillRect(rect, QColor(10, 20, 30))
+        self._paint_axes(painter, rect)
+
+        # Conexiones (caché)
+        self._draw_cached_layer(painter, "base", rect)
+
+        # --- Resaltar la ruta calculada (sólo los tramos dentro del área a repintar) ---
+        if len(self.highlighted_route) > 1:
+            pen = QPen(QColor(100, 220, 120), 3)
+            painter.setPen(pen)
+            for i in range(len(self.highlighted_route) - 1):
+                a = self.highlighted_route[i]
+                b = self.highlighted_route[i + 1]
+                if a in self.graph_manager.stars and b in self.graph_manager.stars:
+                    p1 = QPoint(*self._screen_xy(self.graph_manager.stars[a]['pos']))
+                    p2 = QPoint(*self._screen_xy(self.graph_manager.stars[b]['pos']))
+                    if rect.intersects(QRect(p1, p2).normalized().adjusted(-3, -3, 3, 3)):
+                        painter.drawLine(p1, p2)
+
+        # Estrellas y etiquetas (caché)
+        self._draw_cached_layer(painter, "stars", rect)
 
         # --- Dibujar al burro ---
-        if self.donkey_pos:
-            dx_f, dy_f = self.donkey_pos
-            dx, dy = int(dx_f), int(dy_f)
+        if self.donkey_pos and rect.intersects(self._donkey_rect(self.donkey_pos)):
+            dx, dy = self._screen_xy(self.donkey_pos)
             if hasattr(self, 'donkey_pixmap') and not self.donkey_pixmap.isNull():
                 # centrar el sprite con el nuevo tamaño
                 painter.drawPixmap(int(dx - self.donkey_pixmap.width() / 2),
@@ -147,6 +378,78 @@ class GraphWidget(QWidget):
                 fallback_r = max(12, int(self.donkey_pix_size / 2))
                 painter.drawEllipse(dx - fallback_r, dy - fallback_r, fallback_r * 2, fallback_r * 2)
 
+    # ----------------------------------------------------
+    #        INTERACCIÓN
+    # ----------------------------------------------------
+    def _star_at(self, x, y):
+        """Estrella dibujada bajo el punto de pantalla (x, y), o None."""
+        if self._lod() == "constellations":
+            return None
+        gx = (x - self.view_offset.x()) / self.zoom
+        gy = (y - self.view_offset.y()) / self.zoom
+        label = self.graph_manager.spatial_index.nearest_star(gx, gy, self._max_radius_px() / self.zoom)
+        if label is None:
+            return None
+        star_data = self.graph_manager.stars[label]
+        sx, sy = self._screen_xy(star_data['pos'])
+        return label if math.hypot(sx - x, sy - y) <= self._star_radius_px(star_data) else None
+
+    def mousePressEvent(self, event):
+        """Clic en una estrella: la selecciona (Shift: como segunda estrella); si no, arrastra la vista."""
+        pos = event.position()
+        if event.button() == Qt.MouseButton.LeftButton:
+            label = self._star_at(pos.x(), pos.y())
+            if label is not None:
+                shift = bool(event.modifiers() & Qt.KeyboardModifier.ShiftModifier)
+                self.star_clicked.emit(label, shift)
+                return
+        if event.button() in (Qt.MouseButton.LeftButton, Qt.MouseButton.MiddleButton):
+            self._drag_origin = (pos, QPoint(self.view_offset))
+            return
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self._drag_origin is None:
+            super().mouseMoveEvent(event)
+            return
+        origin, offset = self._drag_origin
+        delta = event.position() - origin
+        self.view_offset = offset + QPoint(round(delta.x()), round(delta.y()))
+        self.update()
+
+    def mouseReleaseEvent(self, event):
+        self._drag_origin = None
+        super().mouseReleaseEvent(event)
+
+    def wheelEvent(self, event):
+        steps = event.angleDelta().y() / 120
+        if steps:
+            pos = event.position()
+            self.zoom_at(pos.x(), pos.y(), self.ZOOM_STEP ** steps)
+        event.accept()
+
+    def _qcolor(self, rgb):
+        """Convierte (perezosamente) una tupla (r, g, b) del GraphManager en QColor."""
+        color = self._color_cache.get(rgb)
+        if color is None:
+            color = QColor(*rgb)
+            self._color_cache[rgb] = color
+        return color
+
+    def _donkey_rect(self, pos):
+        """Rectángulo (con margen) que ocupa en pantalla el sprite del burro centrado en pos."""
+        half = max(self.donkey_pixmap.width(), self.donkey_pixmap.height(), self.donkey_pix_size) // 2 + 2
+        x, y = self._screen_xy(pos)
+        return QRect(x - half, y - half, 2 * half, 2 * half)
+
+    def set_donkey_pos(self, pos):
+        """Mueve el burro y repinta sólo las zonas que ocupaba y que ocupa ahora."""
+        if self.donkey_pos:
+            self.update(self._donkey_rect(self.donkey_pos))
+        self.donkey_pos = pos
+        if pos:
+            self.update(self._donkey_rect(pos))
+
     def set_highlighted_route(self, route):
         self.highlighted_route = route
         if route:
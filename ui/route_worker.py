@@ -0,0 +1,68 @@
+import time
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from core.route_calculator import RouteCancelled
+
+
+class RouteWorkerSignals(QObject):
+    # Estrellas visitadas hasta el momento en la ruta parcial
+    progress = pyqtSignal(int)
+    # Mejor ruta parcial (limitada a una cada PARTIAL_INTERVAL segundos)
+    partial_route = pyqtSignal(list)
+    # (resultado del calculador, generación del grafo y de los efectos con las que se calculó)
+    finished = pyqtSignal(object, int, int)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class RouteWorker(QRunnable):
+    """
+    Calcula una ruta en un hilo del QThreadPool para no congelar la ventana.
+
+    mode es el nombre de un método calculate_*_route de RouteCalculator; los resultados llegan por
+    las señales de self.signals (conexiones en cola hacia el hilo de la interfaz). El burro se
+    clona antes de lanzar el trabajo, así la animación puede seguir usando el original.
+    """
+
+    PARTIAL_INTERVAL = 0.1  # segundos entre rutas parciales emitidas
+
+    def __init__(self, route_calculator, mode, start_star, donkey, **kwargs):
+        super().__init__()
+        self.route_calculator = route_calculator
+        self.mode = mode
+        self.start_star = start_star
+        self.donkey = donkey.clonar()
+        self.kwargs = kwargs
+        self.generation = getattr(route_calculator.graph_manager, 'generation', 0)
+        self.effects_generation = getattr(route_calculator.graph_manager, 'effects_generation', 0)
+        self.setAutoDelete(False)  # MainWindow conserva la referencia hasta recibir el resultado
+        self.signals = RouteWorkerSignals()
+        self._cancel_requested = False
+        self._last_partial = 0.0
+
+    def cancel(self):
+        self._cancel_requested = True
+
+    def is_cancelled(self):
+        return self._cancel_requested
+
+    def _on_progress(self, route):
+        self.signals.progress.emit(len(route))
+        now = time.monotonic()
+        if now - self._last_partial >= self.PARTIAL_INTERVAL:
+            self._last_partial = now
+            self.signals.partial_route.emit(list(route))
+
+    def run(self):
+        calculate = getattr(self.route_calculator, self.mode)
+        try:
+            result = calculate(self.start_star, self.donkey, progress=self._on_progress,
+                               cancelled=self.is_cancelled, **self.kwargs)
+        except RouteCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            # Por ejemplo, si el grafo cambió a mitad del cálculo
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result, self.generation, self.effects_generation)